@@ -0,0 +1,8 @@
+"""pytest 配置：将 src 目录加入模块搜索路径（只添加一次），测试中可直接 import 各模块"""
+
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
@@ -1,15 +1,18 @@
 import streamlit as st
-import torch
 import time
 import os
-from pydub import AudioSegment
-import psutil
-
-torch.classes.__path__ = []
+import functools
+import hashlib
+import json
+import shutil
+import queue
+import mmap
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from download import download_podcast_audio, download_youtube_audio
-from transcribe import transcribe_audio
-from summarize import PodcastSummarizer
+from media_utils import probe_duration, prepare_local_media, trim_audio
+from transcript_cache import cache_path_for_digest, load_cached_transcript, save_cached_transcript
 
 st.title("xiaoyuzhou FM / YouTube 音频下载与转录工具")
 
@@ -20,8 +23,6 @@ if "audio_path" not in st.session_state:
     st.session_state.audio_path = None
 if "media_title" not in st.session_state:
     st.session_state.media_title = None
-if "transcript" not in st.session_state:
-    st.session_state.transcript = None
 if "source_type" not in st.session_state:
     st.session_state.source_type = "小宇宙播客"
 if "transcribe_completed" not in st.session_state:
@@ -48,16 +49,306 @@ if "summary_mode" not in st.session_state:
 @st.cache_resource
 def get_summarizer():
     """获取缓存的总结器实例"""
+    from summarize import PodcastSummarizer  # 延迟导入，只用下载功能时不加载 reportlab 等依赖
     return PodcastSummarizer()
 
+# 各类后台任务的线程池大小，不同类型的任务使用独立的线程池，互不阻塞：
+# io 为下载、上传文件处理等以网络和磁盘为主的短任务；transcribe 为可能持续数小时的转录任务，
+# 每个转录任务已占满 GPU 或全部 CPU 推理线程，同时运行过多只会互相争抢，超出的任务排队等待；
+# model 为 Whisper 模型预加载，同一时间只加载一个模型，避免同时占用多份内存或显存
+EXECUTOR_WORKERS = {"io": 4, "transcribe": 2, "model": 1}
+
+@st.cache_resource
+def get_executor(kind: str = "io"):
+    """获取进程内共享的指定类型的后台线程池，所有会话共用"""
+    return ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS[kind], thread_name_prefix=f"{kind}_job")
+
+def start_background_job(job_key: str, fn, *args, executor_kind: str = "io", **kwargs):
+    """在后台线程中执行 fn，进度通过队列回传，任务句柄保存在会话状态中
+
+    fn 需接受 progress_callback 关键字参数，回调的参数会打包成元组放入队列。
+    executor_kind 为使用的线程池类型（见 EXECUTOR_WORKERS），转录任务使用 transcribe。
+    """
+    progress_queue = queue.Queue()
+
+    def report_progress(*update):
+        progress_queue.put(update)
+
+    future = get_executor(executor_kind).submit(fn, *args, progress_callback=report_progress, **kwargs)
+    st.session_state[job_key] = (future, progress_queue)
+
+def wait_background_job(job_key: str, on_progress, poll_interval: float = 0.1):
+    """轮询后台任务直到完成，在脚本线程中调用 on_progress 更新界面，返回任务结果
+
+    页面重跑后再次调用可继续等待同一个任务；任务抛出的异常会在此处重新抛出。
+    """
+    future, progress_queue = st.session_state[job_key]
+    while True:
+        done = future.done()
+        # 一次取空队列，只把最新的进度交给界面，避免下载时逐块刷新控件
+        latest = None
+        while True:
+            try:
+                latest = progress_queue.get_nowait()
+            except queue.Empty:
+                break
+        if latest is not None:
+            on_progress(*latest)
+        if done:
+            break
+        time.sleep(poll_interval)
+    del st.session_state[job_key]
+    return future.result()
+
+@st.cache_data(show_spinner=False)
+def _audio_info(path: str, mtime: float, size: int):
+    """获取音频时长和文件大小，按 (路径, 修改时间, 大小) 缓存，避免每次重跑都重新探测"""
+    return probe_duration(path), size
+
+def get_audio_info(path: str):
+    """返回 (时长秒数, 文件字节数)"""
+    stat = os.stat(path)
+    return _audio_info(path, stat.st_mtime, stat.st_size)
+
+@functools.cache
+def _import_torch():
+    """延迟导入 torch，只在需要检测 GPU 时才加载 CUDA 运行时（进程内只导入并修补一次）"""
+    import torch
+    torch.classes.__path__ = []  # 避免 streamlit 文件监视器扫描 torch.classes 时报错
+    return torch
+
+@functools.cache
+def has_cuda() -> bool:
+    """CUDA 是否可用（进程内只检测一次）"""
+    return _import_torch().cuda.is_available()
+
+@functools.cache
+def has_mps() -> bool:
+    """MPS (Apple Silicon) 是否可用（进程内只检测一次）"""
+    try:
+        mps_backend = getattr(_import_torch().backends, "mps", None)
+        return bool(mps_backend and mps_backend.is_available())
+    except Exception:
+        return False
+
+def read_memory_info():
+    """读取 (总内存, 可用内存) 字节数
+
+    Linux 下直接解析 /proc/meminfo 的 MemTotal 和 MemAvailable，其它系统回退到 psutil。
+    """
+    try:
+        fields = {}
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                if key in ("MemTotal", "MemAvailable"):
+                    fields[key] = int(value.split()[0]) * 1024  # 单位为 kB
+                    if len(fields) == 2:
+                        return fields["MemTotal"], fields["MemAvailable"]
+    except (OSError, ValueError):
+        pass
+    import psutil
+    memory = psutil.virtual_memory()
+    return memory.total, memory.available
+
+@st.cache_data(ttl=5, show_spinner=False)
+def get_available_ram() -> float:
+    """当前可用内存（GB），缓存5秒，避免每次重跑都读取系统内存信息"""
+    return read_memory_info()[1] / (1024**3)
+
+@st.cache_resource
+def get_hardware_info():
+    """检测硬件信息（CPU核心数、总内存、GPU），硬件规格在进程内不会变化"""
+    hardware = {
+        "cpu_count": os.cpu_count(),
+        "total_ram": read_memory_info()[0] / (1024**3),
+        "cuda_devices": [],
+        "mps_available": False,
+        "gpu_error": None
+    }
+    try:
+        if has_cuda():
+            torch = _import_torch()
+            for i in range(torch.cuda.device_count()):
+                gpu_name = torch.cuda.get_device_name(i)
+                gpu_memory = torch.cuda.get_device_properties(i).total_memory / (1024**3)
+                hardware["cuda_devices"].append((i, gpu_name, gpu_memory))
+    except Exception as e:
+        hardware["gpu_error"] = str(e)
+    hardware["mps_available"] = has_mps()
+    return hardware
+
+@st.cache_resource
+def enumerate_devices():
+    """枚举可用的计算设备，返回 (显示名称, 设备字符串, 显存GB) 列表
+
+    每块 CUDA GPU 单独列出并映射为 cuda:N，便于多卡机器指定运行的 GPU。
+    """
+    hardware = get_hardware_info()
+    devices = [("CPU", "cpu", 0.0)]
+    for i, gpu_name, gpu_memory in hardware["cuda_devices"]:
+        devices.append((f"GPU {i} (CUDA) - {gpu_name}", f"cuda:{i}", gpu_memory))
+    if hardware["mps_available"]:
+        devices.append(("GPU (MPS) - Apple Silicon", "mps", 0.0))
+    return devices
+
+TRANSCRIPT_PREVIEW_BYTES = 100_000  # 转录预览最多读取的字节数
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _transcript_preview(path: str, mtime: float, limit: int) -> str:
+    """通过 mmap 只读取转录文件开头部分用于预览"""
+    if os.path.getsize(path) == 0:
+        return ""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # 截断处可能落在多字节字符中间，忽略不完整的字符
+            return mm[:limit].decode("utf-8", errors="ignore")
+
+def get_transcript_preview(path: str, limit: int = TRANSCRIPT_PREVIEW_BYTES) -> str:
+    """获取转录文件的预览文本，按 (路径, 修改时间) 缓存"""
+    return _transcript_preview(path, os.path.getmtime(path), limit)
+
+def read_transcript(path: str) -> str:
+    """读取完整转录文本（仅在需要全文时调用，例如AI总结）"""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+@st.cache_resource(max_entries=2, show_spinner="正在加载 Whisper 模型...")
+def get_whisper_model(model_size: str, device: str, compute_type: str):
+    """获取缓存的 Whisper 模型，按 (模型, 设备, 计算类型) 复用已加载的权重
+
+    最多保留2个模型，便于在 CPU/GPU 之间切换，同时避免多个大模型同时占用显存。
+    已在后台预加载了相同设置的模型时直接取用，不再重复加载。只在脚本线程中调用。
+    """
+    future = take_prewarmed_model(model_size, device, compute_type)
+    if future is not None:
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"预加载 Whisper 模型失败，重新加载: {e}")
+    from transcribe import load_model  # 延迟导入，只用下载功能时不加载 faster-whisper / CTranslate2
+    return load_model(model_size, device, compute_type)
+
+@st.cache_resource
+def get_prewarm_state():
+    """进程内共享的模型预加载状态
+
+    pending 为尚未被取用的预加载任务 {(模型, 设备, 计算类型): Future}，最多保留一个；
+    claimed 为已交给 get_whisper_model 缓存的设置，不再重复预加载。
+    """
+    return {"lock": threading.Lock(), "pending": {}, "claimed": set()}
+
+def take_prewarmed_model(model_size: str, device: str, compute_type: str):
+    """取走相同设置的预加载任务，没有时返回 None"""
+    state = get_prewarm_state()
+    key = (model_size, device, compute_type)
+    with state["lock"]:
+        state["claimed"].add(key)
+        return state["pending"].pop(key, None)
+
+def pick_compute_type(device: str) -> str:
+    """根据设备选择 faster-whisper 计算类型
+
+    CUDA 使用 int8_float16（int8 权重 + float16 计算，显存占用约为 float16 的一半，速度相当）；
+    CPU（以及回退到 CPU 的 MPS）使用 int8。
+    """
+    return "int8_float16" if device.startswith("cuda") else "int8"
+
+def default_batch_size(device: str, gpu_memory_gb: float = 0.0) -> int:
+    """根据设备和显存推荐批处理大小，显存不足4GB时不批处理"""
+    if device.startswith("cuda"):
+        if gpu_memory_gb >= 8:
+            return 16
+        if gpu_memory_gb >= 4:
+            return 8
+        return 1
+    return 4
+
+WHISPER_MODEL_OPTIONS = ["base", "small", "medium", "large-v3"]
+WHISPER_MODEL_DESCRIPTIONS = {
+    "base": "基础模型 (290MB) - 速度快，准确率一般",
+    "small": "小型模型 (967MB) - 平衡速度和准确率",
+    "medium": "中型模型 (3.1GB) - 准确率较高",
+    "large-v3": "大型模型v3 (6.2GB) - 最高准确率，推荐用于重要内容"
+}
+
+def recommend_model(device: str, available_ram: float) -> str:
+    """根据设备和可用内存推荐默认的 Whisper 模型"""
+    if device != "cpu" and available_ram >= 12:
+        return "large-v3"
+    if device != "cpu" and available_ram >= 8:
+        return "medium"
+    if available_ram >= 8:
+        return "small"
+    return "base"
+
+def prewarm_whisper_model(model_size: str, device: str, compute_type: str):
+    """在后台线程中预加载转录界面当前选中的 Whisper 模型，每个会话只预加载一次
+
+    用户确认转录参数期间模型即可加载完成，开始转录时由 get_whisper_model 取用；
+    若用户改选了其它设置，则在开始转录时再加载。后台线程中直接调用未缓存的 load_model，
+    不调用 Streamlit 的缓存函数，也不占用 get_whisper_model 的缓存位置。
+    """
+    if st.session_state.get("whisper_prewarmed"):
+        return
+    st.session_state.whisper_prewarmed = True
+    from transcribe import load_model
+    state = get_prewarm_state()
+    key = (model_size, device, compute_type)
+    with state["lock"]:
+        if key in state["claimed"] or key in state["pending"]:
+            return
+        # 只保留最新的预加载任务，未被取用的旧模型随之释放
+        state["pending"].clear()
+        state["pending"][key] = get_executor("model").submit(load_model, *key)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 上传文件分块读写的大小
+
+def save_upload(uploaded_file, upload_root: str) -> str:
+    """按内容哈希保存上传的文件，返回保存路径 upload_root/<哈希>/source<扩展名>
+
+    每个文件使用独立的目录，提取出的音频也保存在其中；同一文件再次上传时，
+    若已存在大小一致的文件则直接复用，不再重复写盘。
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    uploaded_file.seek(0)
+    for chunk in iter(lambda: uploaded_file.read(UPLOAD_CHUNK_SIZE), b""):
+        digest.update(chunk)
+
+    work_dir = os.path.join(upload_root, digest.hexdigest())
+    os.makedirs(work_dir, exist_ok=True)
+    file_path = os.path.join(work_dir, "source" + os.path.splitext(uploaded_file.name)[1])
+    if os.path.exists(file_path) and os.path.getsize(file_path) == uploaded_file.size:
+        return file_path
+
+    # 分块流式写入磁盘，避免将整个文件再复制一份到内存
+    uploaded_file.seek(0)
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(uploaded_file, f, length=UPLOAD_CHUNK_SIZE)
+    return file_path
+
+@st.cache_data(show_spinner=False)
+def _file_digest(path: str, mtime: float, size: int) -> str:
+    """计算文件内容的 BLAKE2b 哈希，按 (路径, 修改时间, 大小) 缓存"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def transcript_cache_path(audio_path: str, *settings) -> str:
+    """返回 (音频内容, 转录设置) 对应的转录结果缓存索引文件路径"""
+    stat = os.stat(audio_path)
+    return cache_path_for_digest(_file_digest(audio_path, stat.st_mtime, stat.st_size), *settings)
+
 def format_duration(seconds: float) -> str:
     """将秒数转换为可读的时分秒格式"""
-    seconds = round(seconds)  # 四舍五入到整数秒
-    
-    hours = seconds // 3600
-    remaining = seconds % 3600
-    minutes = remaining // 60
-    seconds = remaining % 60
+    return _format_duration(round(seconds))  # 四舍五入到整数秒，同时作为缓存键
+
+@functools.lru_cache(maxsize=256)
+def _format_duration(total_seconds: int) -> str:
+    hours, remaining = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remaining, 60)
     
     time_parts = []
     if hours > 0:
@@ -68,6 +359,93 @@ def format_duration(seconds: float) -> str:
     
     return "".join(time_parts)
 
+UPLOAD_FILE_TYPES = ['mp3', 'mp4', 'wav', 'm4a', 'flac', 'ogg', 'aac', 'mkv', 'avi', 'mov', 'wmv', 'webm']
+
+def transcribe_uploaded_files(uploads, devices, progress_callback=None, **options):
+    """后台任务：准备上传的媒体文件，再分配到多块 GPU 上并行转录
+
+    uploads 为 (保存路径, 输出文件名) 列表，返回 [(输出文件名, txt_path, pdf_path)] 列表。
+    重名的输出文件名由 transcribe_files 加上序号，返回的是实际写入的文件名。
+    """
+    from transcribe import transcribe_files
+    audio_files = []
+    for i, (file_path, output_file) in enumerate(uploads):
+        progress_callback(0.0, f"正在准备第 {i + 1}/{len(uploads)} 个文件...")
+        audio_path = prepare_local_media(file_path, os.path.dirname(file_path))["audio_path"]
+        if audio_path not in dict(audio_files):  # 同一文件重复上传时只转录一次
+            audio_files.append((audio_path, output_file))
+    results = transcribe_files(audio_files, devices, progress_callback=progress_callback, **options)
+    return [(os.path.basename(results[audio_path][0]), *results[audio_path]) for audio_path, _ in audio_files]
+
+def batch_transcribe_panel(cuda_devices):
+    """多 GPU 批量转录：上传多个文件，按 GPU 轮流分配，每块 GPU 各加载一份模型并行转录"""
+    uploaded_files = st.file_uploader(
+        "选择多个音频或视频文件",
+        type=UPLOAD_FILE_TYPES,
+        accept_multiple_files=True,
+        key="batch_uploader"
+    )
+    devices = [f"cuda:{i}" for i, _, _ in cuda_devices]
+    gpu_memory = min(memory for _, _, memory in cuda_devices)
+    model_size = st.selectbox(
+        "选择转录模型：",
+        WHISPER_MODEL_OPTIONS,
+        index=WHISPER_MODEL_OPTIONS.index(recommend_model("cuda", get_available_ram())),
+        format_func=lambda x: f"{x} - {WHISPER_MODEL_DESCRIPTIONS[x]}",
+        key="batch_model"
+    )
+    output_format = st.selectbox("选择输出格式：", ["txt", "srt"], key="batch_format")
+
+    if st.button("开始批量转录", disabled=not uploaded_files or "batch_job" in st.session_state):
+        try:
+            uploads = [
+                (save_upload(uploaded_file, "temp_uploads"), f"{os.path.splitext(uploaded_file.name)[0]}.{output_format}")
+                for uploaded_file in uploaded_files
+            ]
+            # 每块 GPU 的模型由 transcribe_files 在各自的工作线程中并行加载，任务结束后释放；
+            # 不经过 get_whisper_model，以免 GPU 数量超过其缓存上限时各 GPU 的模型互相淘汰
+            start_background_job(
+                "batch_job",
+                transcribe_uploaded_files,
+                uploads,
+                devices,
+                executor_kind="transcribe",
+                output_format=output_format,
+                model_size=model_size,
+                compute_type=pick_compute_type("cuda"),
+                batch_size=default_batch_size("cuda", gpu_memory)
+            )
+        except Exception as e:
+            st.error(f"批量转录失败：{str(e)}")
+
+    if "batch_job" in st.session_state:
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        status_text.text(f"正在使用 {len(devices)} 块 GPU 并行转录...")
+
+        def update_batch_progress(progress, message):
+            progress_bar.progress(int(progress * 100))
+            status_text.text(message)
+
+        try:
+            st.session_state.batch_results = wait_background_job("batch_job", update_batch_progress)
+            progress_bar.progress(100)
+            status_text.text("批量转录完成！")
+        except Exception as e:
+            st.error(f"批量转录失败：{str(e)}")
+
+    for output_file, txt_path, _ in st.session_state.get("batch_results", []):
+        if os.path.exists(txt_path):
+            with open(txt_path, "rb") as f:
+                st.download_button(
+                    f"📄 下载 {output_file}",
+                    f,
+                    file_name=os.path.basename(txt_path),
+                    on_click="ignore",
+                    mime="text/plain",
+                    key=f"batch_download_{txt_path}"
+                )
+
 # 下载部分
 download_expander = st.expander(
     "第一步：获取音频", expanded=not st.session_state.download_completed
@@ -79,12 +457,21 @@ with download_expander:
         key="source_radio"
     )
 
+    # 本机有多块 GPU 时，本地文件可批量上传并分配到各 GPU 并行转录
+    batch_mode = False
     if st.session_state.source_type == "本地文件上传":
+        cuda_devices = get_hardware_info()["cuda_devices"]
+        if len(cuda_devices) > 1:
+            batch_mode = st.checkbox(f"📚 多文件批量转录（{len(cuda_devices)} 块 GPU 并行）", key="batch_mode")
+
+    if batch_mode:
+        batch_transcribe_panel(cuda_devices)
+    elif st.session_state.source_type == "本地文件上传":
         st.info("📁 支持的文件格式：MP3, MP4, WAV, M4A, FLAC, OGG, AAC, MKV, AVI, MOV, WMV 等")
         
         uploaded_file = st.file_uploader(
             "选择音频或视频文件",
-            type=['mp3', 'mp4', 'wav', 'm4a', 'flac', 'ogg', 'aac', 'mkv', 'avi', 'mov', 'wmv', 'webm'],
+            type=UPLOAD_FILE_TYPES,
             help="支持常见的音频和视频格式，视频文件将自动提取音频进行转录"
         )
         
@@ -95,80 +482,62 @@ with download_expander:
                 "文件大小": f"{uploaded_file.size / 1024 / 1024:.2f} MB",
                 "文件类型": uploaded_file.type
             }
-            st.write("📄 **文件信息**：")
-            for key, value in file_details.items():
-                st.write(f"• {key}: {value}")
+            # 合并为一次输出，减少发送到浏览器的消息数
+            st.markdown("📄 **文件信息**：\n" + "\n".join(f"- **{key}**: {value}" for key, value in file_details.items()))
             
             if st.button("处理本地文件"):
                 try:
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
+                    # 按内容哈希保存上传的文件，同一文件重复上传时直接复用
+                    temp_file_path = save_upload(uploaded_file, "temp_uploads")
+                    work_dir = os.path.dirname(temp_file_path)
                     
-                    status_text.text("正在保存文件...")
-                    progress_bar.progress(20)
+                    # 音频提取和验证在后台线程中进行，避免阻塞界面
+                    start_background_job("upload_job", prepare_local_media, temp_file_path, work_dir)
+                    st.session_state.upload_file_name = uploaded_file.name
                     
-                    # 创建临时目录（如果不存在）
-                    temp_dir = "temp_uploads"
-                    os.makedirs(temp_dir, exist_ok=True)
-                    
-                    # 保存上传的文件
-                    file_extension = os.path.splitext(uploaded_file.name)[1]
-                    temp_file_path = os.path.join(temp_dir, f"uploaded_file{file_extension}")
-                    
-                    with open(temp_file_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-                    
-                    progress_bar.progress(50)
+                except Exception as e:
+                    st.error(f"保存文件时发生错误：{str(e)}")
+            
+            if "upload_job" in st.session_state:
+                upload_file_name = st.session_state.upload_file_name
+                try:
+                    progress_bar = st.progress(50)
+                    status_text = st.empty()
                     status_text.text("正在处理文件...")
                     
-                    # 检查是否是视频文件，如果是则转换为音频
-                    video_extensions = ['.mp4', '.mkv', '.avi', '.mov', '.wmv', '.webm']
-                    audio_path = temp_file_path
+                    def update_upload_progress(progress, message):
+                        progress_bar.progress(int(progress * 100))
+                        status_text.text(message)
                     
-                    if file_extension.lower() in video_extensions:
-                        status_text.text("检测到视频文件，正在提取音频...")
-                        progress_bar.progress(70)
-                        
-                        # 使用 pydub 从视频中提取音频
-                        try:
-                            video = AudioSegment.from_file(temp_file_path)
-                            audio_path = os.path.join(temp_dir, f"extracted_audio.wav")
-                            video.export(audio_path, format="wav")
-                            st.info("✅ 已从视频文件中提取音频")
-                        except Exception as e:
-                            st.error(f"提取音频失败：{e}")
-                            st.info("💡 提示：如果遇到视频格式问题，建议先将视频转换为常见格式（如MP4）或直接上传音频文件")
-                            raise e
-                    
-                    progress_bar.progress(90)
-                    status_text.text("验证音频文件...")
-                    
-                    # 验证音频文件是否可以正常读取
                     try:
-                        audio_test = AudioSegment.from_file(audio_path)
-                        duration = audio_test.duration_seconds
-                        
-                        # 检查文件大小限制（建议不超过100MB或1小时）
-                        file_size_mb = os.path.getsize(audio_path) / 1024 / 1024
-                        if file_size_mb > 100:
-                            st.warning(f"⚠️ 文件较大（{file_size_mb:.1f}MB），转录可能需要较长时间")
-                        
-                        if duration > 3600:  # 超过1小时
-                            st.warning(f"⚠️ 音频较长（{format_duration(duration)}），转录可能需要较长时间")
-                        
+                        media_info = wait_background_job("upload_job", update_upload_progress)
                     except Exception as e:
-                        st.error(f"音频文件验证失败：{e}")
+                        st.error(f"音频文件处理失败：{e}")
+                        st.info("💡 提示：如果遇到视频格式问题，建议先将视频转换为常见格式（如MP4）或直接上传音频文件")
                         raise e
                     
+                    audio_path = media_info["audio_path"]
+                    if media_info["extracted"]:
+                        st.info("✅ 已从视频文件中提取音频")
+                    
+                    # 检查文件大小限制（建议不超过100MB或1小时）
+                    duration = media_info["duration"]
+                    file_size_mb = media_info["file_size"] / 1024 / 1024
+                    if file_size_mb > 100:
+                        st.warning(f"⚠️ 文件较大（{file_size_mb:.1f}MB），转录可能需要较长时间")
+                    
+                    if duration > 3600:  # 超过1小时
+                        st.warning(f"⚠️ 音频较长（{format_duration(duration)}），转录可能需要较长时间")
+                    
                     progress_bar.progress(100)
                     status_text.text("文件处理完成！")
                     
                     # 设置会话状态
                     st.session_state.audio_path = audio_path
-                    st.session_state.media_title = os.path.splitext(uploaded_file.name)[0]
+                    st.session_state.media_title = os.path.splitext(upload_file_name)[0]
                     st.session_state.download_completed = True
                     
-                    st.success(f"✅ 文件上传成功：{uploaded_file.name}")
+                    st.success(f"✅ 文件上传成功：{upload_file_name}")
                     
                 except Exception as e:
                     st.error(f"处理文件时发生错误：{str(e)}")
@@ -193,116 +562,162 @@ with download_expander:
 
         if st.button("开始下载"):
             if url:
-                progress_bar = st.progress(0)
-                status_text = st.empty()
+                # 下载在后台线程中进行，进度通过队列回传到脚本线程
+                if st.session_state.source_type == "小宇宙播客":
+                    start_background_job("download_job", download_podcast_audio, url)
+                elif st.session_state.source_type == "YouTube 视频":
+                    start_background_job("download_job", download_youtube_audio, url, cookies_path=cookies_path)
+            else:
+                st.warning(f"请输入有效的{st.session_state.source_type}链接")
 
-                try:
-                    def update_progress(progress):
-                        # 根据 progress 的值更新状态
-                        # 0.0: 开始下载
-                        # 1.0: 下载完成
-                        # -1.0: 下载出错
-                        # 其他值: 播客下载时的百分比
-                        if progress == 0.0:
-                            progress_bar.progress(0)
-                            status_text.text(f"正在开始下载 {st.session_state.source_type} 音频...")
-                        elif progress == 1.0:
-                            progress_bar.progress(100)
-                            status_text.text("下载完成！")
-                        elif progress == -1.0:
-                            status_text.text("下载出错，请查看控制台日志。")
-                            # 可以考虑显示一个错误状态，或者清除进度条
-                            progress_bar.progress(0) # 或 progress_bar.empty()
-                        elif 0 < progress < 1:
-                            progress_percentage = int(progress * 100)
-                            progress_bar.progress(progress_percentage)
-                            status_text.text(f"下载进度：{progress_percentage}%")
-                        # 对于 yt-dlp，我们可能只收到 0.0 和 1.0 (或 -1.0)
-
-                    # 初始化状态
-                    status_text.text(f"准备下载 {st.session_state.source_type} 音频...")
-                    progress_bar.progress(0)
-
-                    audio_path = None
-                    media_title = None
-
-                    if st.session_state.source_type == "小宇宙播客":
-                        audio_path, media_title = download_podcast_audio(url, update_progress)
-                    elif st.session_state.source_type == "YouTube 视频":
-                        audio_path, media_title = download_youtube_audio(url, update_progress, cookies_path=cookies_path)
-
-                    if audio_path and media_title:
-                        st.session_state.audio_path = audio_path
-                        st.session_state.media_title = media_title
-                        st.session_state.download_completed = True
+        if "download_job" in st.session_state:
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+
+            try:
+                def update_progress(progress):
+                    # 根据 progress 的值更新状态
+                    # 0.0: 开始下载
+                    # 1.0: 下载完成
+                    # -1.0: 下载出错
+                    # 其他值: 播客下载时的百分比
+                    if progress == 0.0:
+                        progress_bar.progress(0)
+                        status_text.text(f"正在开始下载 {st.session_state.source_type} 音频...")
+                    elif progress == 1.0:
+                        progress_bar.progress(100)
                         status_text.text("下载完成！")
-                        st.success(f"成功下载音频：{st.session_state.media_title}")
-                    else:
-                        st.error(f"下载失败，请检查链接或查看控制台输出。")
-                        st.session_state.download_completed = False
-                        st.session_state.audio_path = None
-                        st.session_state.media_title = None
+                    elif progress == -1.0:
+                        status_text.text("下载出错，请查看控制台日志。")
+                        # 可以考虑显示一个错误状态，或者清除进度条
+                        progress_bar.progress(0) # 或 progress_bar.empty()
+                    elif 0 < progress < 1:
+                        progress_percentage = int(progress * 100)
+                        progress_bar.progress(progress_percentage)
+                        status_text.text(f"下载进度：{progress_percentage}%")
+                    # 对于 yt-dlp，我们可能只收到 0.0 和 1.0 (或 -1.0)
 
-                except Exception as e:
-                    st.error(f"下载过程中发生错误：{str(e)}")
+                # 初始化状态
+                status_text.text(f"准备下载 {st.session_state.source_type} 音频...")
+
+                audio_path, media_title = wait_background_job("download_job", update_progress)
+
+                if audio_path and media_title:
+                    st.session_state.audio_path = audio_path
+                    st.session_state.media_title = media_title
+                    st.session_state.download_completed = True
+                    status_text.text("下载完成！")
+                    st.success(f"成功下载音频：{st.session_state.media_title}")
+                else:
+                    st.error(f"下载失败，请检查链接或查看控制台输出。")
                     st.session_state.download_completed = False
                     st.session_state.audio_path = None
                     st.session_state.media_title = None
-            else:
-                st.warning(f"请输入有效的{st.session_state.source_type}链接")
+
+            except Exception as e:
+                st.error(f"下载过程中发生错误：{str(e)}")
+                st.session_state.download_completed = False
+                st.session_state.audio_path = None
+                st.session_state.media_title = None
 
 # 常驻显示下载后的音频播放器
-if st.session_state.download_completed:
-    st.text(st.session_state.media_title)
+TRIAL_CLIP_SECONDS = 30 * 60  # 超长音频试转录截取的时长
+
+@st.fragment
+def audio_info_panel(audio_path: str, media_title: str):
+    """音频信息和播放器面板，作为独立片段渲染"""
+    st.text(media_title)
     # 获取音频时长
     try:
-        audio = AudioSegment.from_file(st.session_state.audio_path)
-        duration = audio.duration_seconds
+        duration, file_size = get_audio_info(audio_path)
+        st.session_state.audio_duration = duration  # 供转录预估时间复用
         readable_duration = format_duration(duration)
         st.text(f"音频长度：{readable_duration}")
-        st.text(f"音频大小：{os.path.getsize(st.session_state.audio_path) / 1024 / 1024:.2f} MB")
-        st.audio(st.session_state.audio_path)
+        st.text(f"音频大小：{file_size / 1024 / 1024:.2f} MB")
+        st.audio(audio_path)
     except Exception as e:
         st.error(f"加载音频信息时出错: {e}")
         st.session_state.download_completed = False 
+        return
+
+    # 超长音频可先截取前30分钟试转录，确认效果后再转录全文
+    if duration > 3600:
+        if st.button("🎬 仅转录前 30 分钟", help="使用 ffmpeg 流复制截取开头30分钟（不重新编码），便于快速试听和检验转录效果"):
+            try:
+                st.session_state.audio_path = trim_audio(audio_path, TRIAL_CLIP_SECONDS)
+                st.session_state.media_title = f"{media_title}_前30分钟"
+                st.rerun()
+            except Exception as e:
+                st.error(f"截取音频失败：{e}")
+
+if st.session_state.download_completed:
+    audio_info_panel(st.session_state.audio_path, st.session_state.media_title)
 
 # 转录部分
 transcribe_expander = st.expander(
     "第二步：转录音频", expanded=st.session_state.download_completed and not st.session_state.transcribe_completed
 )
 with transcribe_expander:
-    if st.session_state.download_completed:
+    if "transcribe_job" in st.session_state:
+        # 转录进行中：只渲染进度，跳过设备检测等界面，页面重跑后继续等待同一个任务
+        st.info("⏳ 转录中，请勿关闭页面")
+        st.info(st.session_state.get("transcribe_estimate", ""))
+        progress_bar = st.progress(0)
+        status_text_transcribe = st.empty()
+        status_text_transcribe.text("转录中...")
+
+        def update_transcribe_progress(progress, message):
+            progress_bar.progress(int(progress * 100))
+            status_text_transcribe.text(message)
+
+        try:
+            txt_path, pdf_path = wait_background_job("transcribe_job", update_transcribe_progress)
+
+            # 保存文件路径到会话状态
+            st.session_state.txt_path = txt_path
+            st.session_state.pdf_path = pdf_path
+            st.session_state.transcribe_completed = True
+            try:
+                save_cached_transcript(st.session_state.transcript_cache_path, txt_path, pdf_path)
+            except Exception as e:
+                print(f"保存转录缓存失败: {e}")
+
+            # 计算耗时
+            elapsed_time = time.time() - st.session_state.transcribe_start_time
+            progress_bar.progress(100)
+            status_text_transcribe.text("转录完成！")
+
+            st.success(f"转录完成！耗时：{elapsed_time:.2f}秒")
+
+        except Exception as e:
+            st.error(f"转录失败：{str(e)}")
+
+    elif st.session_state.download_completed:
         st.info("提示: 一分钟的音频大约需要10秒钟转录时间(不同设备转录时间不同)")
 
-        # 详细的设备检测和信息显示
-        device_options = ["CPU"]
+        # 详细的设备检测和信息显示（设备列表每个进程只枚举一次）
+        devices = enumerate_devices()
+        device_options = [label for label, _, _ in devices]
+        device_map = {label: device for label, device, _ in devices}
+        gpu_memory_map = {label: gpu_memory for label, _, gpu_memory in devices}
         device_info = {}
         
-        # 检测CPU信息
-        cpu_count = psutil.cpu_count()
-        available_ram = psutil.virtual_memory().available / (1024**3)
-        total_ram = psutil.virtual_memory().total / (1024**3)
+        # 检测CPU信息（硬件规格已缓存，只有可用内存需要实时读取）
+        hardware = get_hardware_info()
+        cpu_count = hardware["cpu_count"]
+        available_ram = get_available_ram()
+        total_ram = hardware["total_ram"]
         device_info["CPU"] = f"CPU ({cpu_count}核心, {available_ram:.1f}GB可用/{total_ram:.1f}GB总内存)"
         
         # 检测GPU信息
-        try:
-            if torch.cuda.is_available():
-                gpu_count = torch.cuda.device_count()
-                for i in range(gpu_count):
-                    gpu_name = torch.cuda.get_device_name(i)
-                    gpu_memory = torch.cuda.get_device_properties(i).total_memory / (1024**3)
-                    device_options.append(f"GPU (CUDA) - {gpu_name}")
-                    device_info[f"GPU (CUDA) - {gpu_name}"] = f"GPU {i}: {gpu_name} ({gpu_memory:.1f}GB显存)"
-        except Exception as e:
-            st.warning(f"检测GPU时出错: {e}")
+        if hardware["gpu_error"]:
+            st.warning(f"检测GPU时出错: {hardware['gpu_error']}")
+        for i, gpu_name, gpu_memory in hardware["cuda_devices"]:
+            device_info[f"GPU {i} (CUDA) - {gpu_name}"] = f"GPU {i}: {gpu_name} ({gpu_memory:.1f}GB显存)"
         
         # 检测 MPS (Apple Silicon)
-        try:
-            if torch.backends.mps.is_available():
-                device_options.append("GPU (MPS) - Apple Silicon")
-                device_info["GPU (MPS) - Apple Silicon"] = "Apple Silicon GPU (Metal Performance Shaders)"
-        except Exception:
-            pass
+        if hardware["mps_available"]:
+            device_info["GPU (MPS) - Apple Silicon"] = "Apple Silicon GPU (Metal Performance Shaders)"
             
         selected_device_display = st.selectbox("选择运行设备：", device_options)
         
@@ -318,13 +733,26 @@ with transcribe_expander:
         else:
             st.warning("⚠️ CPU模式转录速度较慢，建议使用较小的音频文件")
 
-        # 转换设备选择为程序可用的格式
-        device_map = {
-            "CPU": "cpu",
-            **{opt: "cuda" for opt in device_options if "CUDA" in opt},
-            **{opt: "mps" for opt in device_options if "MPS" in opt}
-        }
+        # 转换设备选择为程序可用的格式（cpu / cuda:N / mps）
         selected_device = device_map.get(selected_device_display, "cpu")
+        compute_type = pick_compute_type(selected_device)
+
+        # 快速模式：按 VAD 切分语音片段后批量送入模型
+        batched = st.checkbox(
+            "⚡ 快速模式 (VAD+批处理)",
+            value=True,
+            help="先用语音活动检测切分出不超过30秒的语音片段，再成批推理，长音频可显著缩短转录时间"
+        )
+        if batched:
+            batch_size = st.slider(
+                "批处理大小：",
+                min_value=1,
+                max_value=24,
+                value=default_batch_size(selected_device, gpu_memory_map.get(selected_device_display, 0.0)),
+                help="每批同时推理的语音片段数，越大吞吐越高但占用显存/内存越多"
+            )
+        else:
+            batch_size = 1
 
         # 格式选择
         output_format = st.selectbox("选择输出格式：", ["txt", "srt"], 
@@ -332,23 +760,11 @@ with transcribe_expander:
         st.session_state.output_format = output_format
 
         # 模型大小选择
-        model_options = ["base", "small", "medium", "large-v3"]
-        model_descriptions = {
-            "base": "基础模型 (290MB) - 速度快，准确率一般",
-            "small": "小型模型 (967MB) - 平衡速度和准确率", 
-            "medium": "中型模型 (3.1GB) - 准确率较高",
-            "large-v3": "大型模型v3 (6.2GB) - 最高准确率，推荐用于重要内容"
-        }
+        model_options = WHISPER_MODEL_OPTIONS
+        model_descriptions = WHISPER_MODEL_DESCRIPTIONS
         
         # 根据设备推荐默认模型
-        if "GPU" in selected_device_display and available_ram >= 12:
-            default_model = "large-v3"
-        elif "GPU" in selected_device_display and available_ram >= 8:
-            default_model = "medium"
-        elif available_ram >= 8:
-            default_model = "small"
-        else:
-            default_model = "base"
+        default_model = recommend_model(selected_device, available_ram)
             
         selected_model = st.selectbox(
             "选择转录模型：",
@@ -357,6 +773,8 @@ with transcribe_expander:
             format_func=lambda x: f"{x} - {model_descriptions[x]}"
         )
         
+        prewarm_whisper_model(selected_model, selected_device, compute_type)
+
         # 显示模型兼容性提示
         if selected_model == "large-v3":
             if available_ram < 12:
@@ -366,61 +784,331 @@ with transcribe_expander:
             else:
                 st.success("✅ 配置充足，可以使用 large-v3 模型")
 
-        if st.button("开始转录", disabled=st.session_state.get('is_transcribing', False)):
+        if st.button("开始转录", disabled="transcribe_job" in st.session_state):
+            from transcribe import transcribe_audio
             try:
-                status_text_transcribe = st.empty()
-                st.session_state.is_transcribing = True
-                status_text_transcribe.text("转录中...")
-
-                # 设置输出文件名
-                output_file = f"{st.session_state.media_title}.{output_format}"
-
-                # 记录开始时间
-                start_time = time.time()
-
-                try:
-                    audio = AudioSegment.from_file(st.session_state.audio_path)
-                    duration = audio.duration_seconds
-                    audio_length_minutes = duration / 60
-                    estimated_time_factor = 10 if selected_device == "cpu" else 3
-                    estimated_time = audio_length_minutes * estimated_time_factor
-                    st.info(f"预计转录时间：约 {estimated_time/60:.1f} 分钟")
-                except Exception as e:
-                     st.warning(f"无法计算预计时间: {e}")
-
-                # 开始转录 - 传递模型参数
-                txt_path, pdf_path = transcribe_audio(
-                    st.session_state.audio_path,
-                    output_file,
-                    output_format,
-                    selected_device,
-                    selected_model  # 新增模型参数
+                # 相同音频和相同设置已转录过时，直接复用之前的结果
+                cache_path = transcript_cache_path(
+                    st.session_state.audio_path, selected_model, selected_device, compute_type, batch_size, output_format
                 )
+                st.session_state.transcript_cache_path = cache_path
+                cached = load_cached_transcript(cache_path)
+                if cached:
+                    st.session_state.txt_path, st.session_state.pdf_path = cached
+                    st.session_state.transcribe_completed = True
+                    st.success("✅ 已复用相同音频和设置的转录结果")
+                else:
+                    # 设置输出文件名
+                    output_file = f"{st.session_state.media_title}.{output_format}"
 
-                # 保存文件路径到会话状态
-                st.session_state.txt_path = txt_path
-                st.session_state.pdf_path = pdf_path
-                st.session_state.transcribe_completed = True
+                    # 复用音频信息面板中已探测到的时长，不再重新读取音频
+                    duration = st.session_state.get("audio_duration")
+                    if duration:
+                        audio_length_minutes = duration / 60
+                        estimated_time_factor = 10 if selected_device == "cpu" else 3
+                        estimated_time = audio_length_minutes * estimated_time_factor
+                        st.session_state.transcribe_estimate = f"预计转录时间：约 {estimated_time/60:.1f} 分钟"
+                    else:
+                        st.session_state.transcribe_estimate = "无法计算预计时间：未获取到音频时长"
 
-                # 计算耗时
-                elapsed_time = time.time() - start_time
-                status_text_transcribe.text("转录完成！")
+                    # 在脚本线程中加载（或取出缓存的）模型，转录本身在后台线程中执行
+                    model = get_whisper_model(selected_model, selected_device, compute_type)
 
-                # 读取并显示转录结果
-                with open(txt_path, "r", encoding="utf-8") as f:
-                    st.session_state.transcript = f.read()
+                    # 记录开始时间
+                    st.session_state.transcribe_start_time = time.time()
 
-                st.success(f"转录完成！耗时：{elapsed_time:.2f}秒")
-                st.session_state.is_transcribing = False
+                    # 开始转录 - 传递模型参数
+                    start_background_job(
+                        "transcribe_job",
+                        transcribe_audio,
+                        st.session_state.audio_path,
+                        output_file,
+                        output_format,
+                        selected_device,
+                        selected_model,  # 新增模型参数
+                        compute_type=compute_type,
+                        batch_size=batch_size,
+                        model=model,
+                        executor_kind="transcribe"
+                    )
+                    st.rerun()
 
             except Exception as e:
                 st.error(f"转录失败：{str(e)}")
-                st.session_state.is_transcribing = False
     else:
         st.info("请先成功完成音频下载")
 
+def task_dir_signature(progress_dir: str) -> tuple:
+    """任务目录中各任务文件的 (文件名, 修改时间)，任务新增、保存或删除时随之变化"""
+    try:
+        with os.scandir(progress_dir) as entries:
+            return tuple(sorted(
+                (entry.name, entry.stat().st_mtime_ns) for entry in entries if entry.name.endswith((".json", ".jsonl"))
+            ))
+    except OSError:
+        return ()
+
+@st.cache_data(show_spinner=False)
+def get_task_options(progress_dir: str, signature: tuple) -> dict:
+    """未完成任务的 {显示文本: 任务ID}，按任务文件签名缓存，只切换界面选项时不重新读取任务文件"""
+    summarizer = get_summarizer()
+    task_options = {}
+    list_limit = summarizer.config.get("progress", {}).get("ui_list_limit", 20)
+    for task in summarizer.list_incomplete_tasks(limit=list_limit):
+        info = summarizer.progress_manager.format_task_display_info(task)
+        display_text = f"📄 {info['title'][:30]}... | {info['progress']} | {info['status']} | {info['updated']}"
+        task_options[display_text] = task.task_id
+    return task_options
+
+@st.fragment
+def task_management_panel():
+    """未完成任务管理面板，清理和删除任务只重跑本片段"""
+    progress_manager = st.session_state.summarizer.progress_manager
+    progress_dir = progress_manager.progress_dir
+    # 先写出合并保存中暂存的进度，否则签名看不到这些变化，会一直返回过期的缓存选项
+    progress_manager.flush()
+    task_options = get_task_options(progress_dir, task_dir_signature(progress_dir))
+    # 显示进度管理器暂存的错误（包括上一次总结过程中保存进度失败的错误）
+    for message in progress_manager.drain_errors():
+        st.error(message)
+
+    # 任务管理界面
+    if task_options:
+        st.subheader("📋 任务管理")
+
+        # 显示未完成任务
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.write(f"发现 {len(task_options)} 个未完成的任务：")
+        with col2:
+            if st.button("🗑️ 清理所有任务", help="删除所有未完成的任务"):
+                for task_id in task_options.values():
+                    st.session_state.summarizer.delete_task(task_id)
+                st.success("已清理所有任务")
+                st.rerun(scope="fragment")
+
+        # 选择任务
+        selected_task_display = st.selectbox(
+            "选择要恢复的任务：",
+            ["创建新任务"] + list(task_options.keys()),
+            help="选择一个未完成的任务继续执行，或创建新任务"
+        )
+
+        if selected_task_display != "创建新任务":
+            selected_task_id = task_options[selected_task_display]
+            selected_task = st.session_state.summarizer.resume_task(selected_task_id)
+
+            if selected_task:
+                # 显示任务详情
+                with st.container():
+                    st.write("**任务详情：**")
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("完成进度", f"{selected_task.get_progress_percentage():.1f}%")
+                    with col2:
+                        st.metric("完成分段", f"{len(selected_task.completed_segments)}/{selected_task.total_segments}")
+                    with col3:
+                        st.metric("失败分段", len(selected_task.failed_segments))
+
+                    if selected_task.failed_segments:
+                        st.warning(f"有 {len(selected_task.failed_segments)} 个分段失败，将尝试重新处理")
+
+                # 继续任务按钮
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("🔄 继续任务", key="continue_task"):
+                        try:
+                            progress_bar = st.progress(selected_task.get_progress_percentage() / 100)
+                            status_text = st.empty()
+
+                            def update_progress(progress, message):
+                                progress_bar.progress(progress)
+                                status_text.text(message)
+
+                            # 继续执行任务
+                            summary_result = st.session_state.summarizer.summarize_transcript(
+                                read_transcript(st.session_state.txt_path),
+                                selected_task.model_key,
+                                progress_callback=update_progress,
+                                task=selected_task
+                            )
+
+                            st.session_state.summary_data = summary_result
+                            st.session_state.summarize_completed = True
+
+                            status_text.text("任务完成！")
+                            st.success("✅ 任务继续执行完成")
+                            st.rerun()  # 总结结果在片段之外显示，需要重跑整个页面
+
+                        except Exception as e:
+                            st.error(f"继续任务失败：{str(e)}")
+
+                with col2:
+                    if st.button("🗑️ 删除任务", key="delete_selected_task"):
+                        if st.session_state.summarizer.delete_task(selected_task.task_id):
+                            st.success("任务已删除")
+                            st.rerun(scope="fragment")
+                        else:
+                            st.error("删除任务失败")
+
+            # 分隔线
+            st.divider()
+
+EXPORT_FORMATS = {  # 导出格式 -> (显示名称, MIME 类型)
+    "txt": ("TXT", "text/plain"),
+    "markdown": ("Markdown", "text/markdown"),
+    "pdf": ("PDF", "application/pdf"),
+}
+
+def export_summary_file(summary: dict, export_format: str, title: str) -> str:
+    """导出结构化总结，按 (总结内容, 格式, 标题) 复用本会话中已生成且仍存在的文件"""
+    summary_key = hashlib.blake2b(
+        json.dumps(summary, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"), digest_size=16
+    ).hexdigest()
+    exported = st.session_state.setdefault("exported_summaries", {})
+    cache_key = (summary_key, export_format, title)
+    if cache_key in exported and os.path.exists(exported[cache_key]):
+        return exported[cache_key]
+    exported[cache_key] = st.session_state.summarizer.export_summary(summary, export_format, title)
+    return exported[cache_key]
+
+KEYWORD_BADGE_TEMPLATE = '<span style="background-color: #f0f2f6; color: #262730; padding: 2px 8px; margin: 2px; border-radius: 12px; font-size: 12px; display: inline-block;">{kw}</span> '
+
+@st.fragment
+def summary_results_panel():
+    """总结结果面板，导出和清空结果只重跑本片段"""
+    if st.session_state.summary_data or st.session_state.deep_analysis_result:
+        results_expander = st.expander("📋 总结结果", expanded=True)
+        with results_expander:
+            # 根据不同的结果类型显示不同的内容
+            if st.session_state.summary_data:
+                # 显示结构化总结结果
+                st.subheader("📊 结构化总结结果")
+                summary = st.session_state.summary_data
+
+                # 显示总体总结
+                st.subheader("📝 总体总结")
+                st.write(summary['overall_summary'])
+
+                # 显示主题分析
+                if summary['topics']:
+                    st.subheader("🏷️ 主要主题")
+                    for i, topic in enumerate(summary['topics'], 1):
+                        st.write(f"{i}. {topic}")
+
+                # 显示分段总结
+                st.subheader("📑 分段总结")
+                for segment in summary['segments']:
+                    with st.container():
+                        col1, col2 = st.columns([3, 1])
+                        with col1:
+                            st.write(f"**第{segment['index']}段**")
+                            if segment['start_time']:
+                                st.caption(f"时间: {segment['start_time']}")
+                            st.write(segment['summary'])
+                        with col2:
+                            if segment['keywords']:
+                                st.write("**关键词:**")
+                                keywords_html = "".join(KEYWORD_BADGE_TEMPLATE.format(kw=kw) for kw in segment['keywords'])
+                                st.markdown(keywords_html, unsafe_allow_html=True)
+                        st.divider()
+
+                # 结构化总结的导出选项
+                st.subheader("💾 导出结构化总结")
+                col1, col2 = st.columns([2, 1])
+                with col1:
+                    export_format = st.selectbox(
+                        "导出格式：",
+                        list(EXPORT_FORMATS.keys()),
+                        format_func=lambda x: EXPORT_FORMATS[x][0],
+                        key="export_structured_format"
+                    )
+                with col2:
+                    export_clicked = st.button("💾 导出", key="export_structured")
+
+                if export_clicked:
+                    label, mime = EXPORT_FORMATS[export_format]
+                    try:
+                        with st.spinner(f"正在生成{label}文件..."):
+                            export_path = export_summary_file(summary, export_format, st.session_state.media_title)
+                        with open(export_path, 'rb') as f:
+                            st.download_button(
+                                f"下载{label}文件",
+                                f,
+                                file_name=os.path.basename(export_path),
+                                on_click="ignore",
+                                mime=mime
+                            )
+                        st.success(f"{label}文件已生成")
+                    except Exception as e:
+                        st.error(f"导出{label}失败：{str(e)}")
+
+            elif st.session_state.deep_analysis_result:
+                # 显示深度分析结果
+                st.subheader("🧠 深度分析结果")
+                st.write(st.session_state.deep_analysis_result)
+
+                # 深度分析的导出选项
+                st.subheader("💾 导出深度分析")
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    # 下载为TXT格式
+                    st.download_button(
+                        "📄 下载深度分析报告 (TXT)",
+                        st.session_state.deep_analysis_result,
+                        file_name=f"{st.session_state.media_title}_深度分析.txt",
+                        on_click="ignore",
+                        mime="text/plain",
+                        key="download_deep_analysis_txt"
+                    )
+
+                with col2:
+                    # 下载为Markdown格式（适合公众号使用）
+                    st.download_button(
+                        "📝 下载深度分析报告 (Markdown)",
+                        st.session_state.deep_analysis_result,
+                        file_name=f"{st.session_state.media_title}_深度分析.md",
+                        on_click="ignore",
+                        mime="text/markdown",
+                        key="download_deep_analysis_md"
+                    )
+
+                # 添加清空结果的选项
+                st.divider()
+                if st.button("🗑️ 清空当前结果", key="clear_deep_analysis", help="清空当前显示的深度分析结果"):
+                    st.session_state.deep_analysis_result = None
+                    st.success("已清空深度分析结果")
+                    st.rerun(scope="fragment")
+
+            # 通用功能：重新选择总结模式
+            st.divider()
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("🔄 重新选择总结模式", key="change_summary_mode"):
+                    # 清空所有结果，让用户重新选择
+                    st.session_state.summary_data = None
+                    st.session_state.deep_analysis_result = None
+                    st.session_state.summarize_completed = False
+                    st.success("已重置，请重新选择总结模式")
+                    st.rerun(scope="fragment")
+
+            with col2:
+                if st.button("📊 切换到另一种总结模式", key="switch_summary_mode"):
+                    # 切换到另一种模式（但保留当前结果）
+                    current_mode = st.session_state.summary_mode
+                    new_mode = "deep_analysis" if current_mode == "structured" else "structured"
+                    st.session_state.summary_mode = new_mode
+
+                    mode_names = {
+                        "structured": "结构化总结",
+                        "deep_analysis": "深度分析"
+                    }
+                    st.info(f"已切换到 {mode_names[new_mode]} 模式，您可以对同一份内容进行不同类型的分析")
+                    st.rerun()  # 总结模式选择在片段之外，需要重跑整个页面
+
 # 下载文件部分（独立显示，不会因为页面刷新而消失）
-if st.session_state.transcribe_completed and st.session_state.transcript:
+if st.session_state.transcribe_completed and st.session_state.txt_path:
     # 第三步：AI总结功能
     summarize_expander = st.expander(
         "第三步：AI智能总结", expanded=st.session_state.transcribe_completed and not st.session_state.summarize_completed
@@ -457,96 +1145,8 @@ ai_models:
                 """)
         else:
             # 检查是否有未完成的任务
-            incomplete_tasks = st.session_state.summarizer.list_incomplete_tasks()
-            
-            # 任务管理界面
-            if incomplete_tasks:
-                st.subheader("📋 任务管理")
-                
-                # 显示未完成任务
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(f"发现 {len(incomplete_tasks)} 个未完成的任务：")
-                with col2:
-                    if st.button("🗑️ 清理所有任务", help="删除所有未完成的任务"):
-                        for task in incomplete_tasks:
-                            st.session_state.summarizer.delete_task(task.task_id)
-                        st.success("已清理所有任务")
-                        st.rerun()
-                
-                # 选择任务
-                task_options = {}
-                for task in incomplete_tasks:
-                    info = st.session_state.summarizer.progress_manager.format_task_display_info(task)
-                    display_text = f"📄 {info['title'][:30]}... | {info['progress']} | {info['status']} | {info['updated']}"
-                    task_options[display_text] = task.task_id
-                
-                selected_task_display = st.selectbox(
-                    "选择要恢复的任务：",
-                    ["创建新任务"] + list(task_options.keys()),
-                    help="选择一个未完成的任务继续执行，或创建新任务"
-                )
-                
-                if selected_task_display != "创建新任务":
-                    selected_task_id = task_options[selected_task_display]
-                    selected_task = st.session_state.summarizer.resume_task(selected_task_id)
-                    
-                    if selected_task:
-                        # 显示任务详情
-                        with st.container():
-                            st.write("**任务详情：**")
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.metric("完成进度", f"{selected_task.get_progress_percentage():.1f}%")
-                            with col2:
-                                st.metric("完成分段", f"{len(selected_task.completed_segments)}/{selected_task.total_segments}")
-                            with col3:
-                                st.metric("失败分段", len(selected_task.failed_segments))
-                            
-                            if selected_task.failed_segments:
-                                st.warning(f"有 {len(selected_task.failed_segments)} 个分段失败，将尝试重新处理")
-                        
-                        # 继续任务按钮
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            if st.button("🔄 继续任务", key="continue_task"):
-                                try:
-                                    progress_bar = st.progress(selected_task.get_progress_percentage() / 100)
-                                    status_text = st.empty()
-                                    
-                                    def update_progress(progress, message):
-                                        progress_bar.progress(progress)
-                                        status_text.text(message)
-                                    
-                                    # 继续执行任务
-                                    summary_result = st.session_state.summarizer.summarize_transcript(
-                                        st.session_state.transcript,
-                                        selected_task.model_key,
-                                        progress_callback=update_progress,
-                                        task=selected_task
-                                    )
-                                    
-                                    st.session_state.summary_data = summary_result
-                                    st.session_state.summarize_completed = True
-                                    
-                                    status_text.text("任务完成！")
-                                    st.success("✅ 任务继续执行完成")
-                                    st.rerun()
-                                    
-                                except Exception as e:
-                                    st.error(f"继续任务失败：{str(e)}")
-                        
-                        with col2:
-                            if st.button("🗑️ 删除任务", key="delete_selected_task"):
-                                if st.session_state.summarizer.delete_task(selected_task.task_id):
-                                    st.success("任务已删除")
-                                    st.rerun()
-                                else:
-                                    st.error("删除任务失败")
-                    
-                    # 分隔线
-                    st.divider()
-            
+            task_management_panel()
+
             # AI模型选择
             selected_model = st.selectbox(
                 "选择AI模型：",
@@ -575,12 +1175,14 @@ ai_models:
             # 根据选择的模式显示不同的配置选项和说明
             if summary_mode == "structured":
                 with st.container():
-                    st.write("**结构化总结功能：**")
-                    st.write("• 🎯 智能主题分段，自动识别内容转折点")
-                    st.write("• 📝 每段1-2句话精准总结")
-                    st.write("• 🔍 自动提取关键词和主要主题")
-                    st.write("• 📊 生成完整的内容概览")
-                    st.write("• 💾 支持断点续传，任务管理")
+                    st.markdown(
+                        "**结构化总结功能：**\n"
+                        "- 🎯 智能主题分段，自动识别内容转折点\n"
+                        "- 📝 每段1-2句话精准总结\n"
+                        "- 🔍 自动提取关键词和主要主题\n"
+                        "- 📊 生成完整的内容概览\n"
+                        "- 💾 支持断点续传，任务管理"
+                    )
                     
                     # 结构化总结的配置选项
                     col1, col2 = st.columns(2)
@@ -594,12 +1196,14 @@ ai_models:
                     
             else:  # deep_analysis
                 with st.container():
-                    st.write("**深度分析功能：**")
-                    st.write("• 📋 基于专业模板的结构化输出")
-                    st.write("• 🎨 生成适合微信公众号的格式化内容")
-                    st.write("• 📊 包含思维导图和可视化元素")
-                    st.write("• 🔬 深度挖掘内容价值和见解")
-                    st.write("• ✅ 内容质量控制和专业术语处理")
+                    st.markdown(
+                        "**深度分析功能：**\n"
+                        "- 📋 基于专业模板的结构化输出\n"
+                        "- 🎨 生成适合微信公众号的格式化内容\n"
+                        "- 📊 包含思维导图和可视化元素\n"
+                        "- 🔬 深度挖掘内容价值和见解\n"
+                        "- ✅ 内容质量控制和专业术语处理"
+                    )
                     
                     # 检查prompt.txt文件
                     if os.path.exists("prompt.txt"):
@@ -625,8 +1229,18 @@ ai_models:
                 button_text = "🧠 开始深度分析"
                 button_key = "start_deep_analysis"
             
+            # 启用了AI响应缓存时，可选择忽略缓存重新生成；同一份转录已经总结过时默认勾选，
+            # 避免"重新选择总结模式"后再次总结直接返回缓存中的相同结果
+            refresh_cache = False
+            if st.session_state.summarizer.retry_config.get('response_cache_dir'):
+                refresh_cache = st.checkbox(
+                    "🔄 忽略缓存，重新调用模型生成",
+                    value=st.session_state.get('summarized_txt_path') == st.session_state.txt_path,
+                    help="已开启AI响应缓存（retry.response_cache_dir），相同请求默认直接复用缓存结果"
+                )
+            
             if st.button(button_text, key=button_key, type="primary"):
-                if not st.session_state.transcript:
+                if not st.session_state.txt_path or not os.path.exists(st.session_state.txt_path):
                     st.error("未找到转录文本")
                     st.stop()
                 
@@ -648,15 +1262,17 @@ ai_models:
                         
                         # 执行结构化总结
                         summary_result = st.session_state.summarizer.summarize_transcript(
-                            st.session_state.transcript,
+                            read_transcript(st.session_state.txt_path),
                             selected_model,
                             progress_callback=update_progress,
-                            task=new_task
+                            task=new_task,
+                            refresh_cache=refresh_cache
                         )
                         
                         st.session_state.summary_data = summary_result
                         st.session_state.summarize_completed = True
                         st.session_state.deep_analysis_result = None  # 清除深度分析结果
+                        st.session_state.summarized_txt_path = st.session_state.txt_path
                         
                         status_text.text("结构化总结完成！")
                         st.success("✅ 结构化总结已完成")
@@ -666,11 +1282,13 @@ ai_models:
                         # 深度分析流程
                         with st.spinner("正在进行深度分析，这可能需要较长时间..."):
                             deep_result = st.session_state.summarizer.deep_analysis(
-                                st.session_state.transcript,
-                                selected_model
+                                read_transcript(st.session_state.txt_path),
+                                selected_model,
+                                refresh_cache=refresh_cache
                             )
                             
                             st.session_state.deep_analysis_result = deep_result
+                            st.session_state.summarized_txt_path = st.session_state.txt_path
                             st.session_state.summarize_completed = False  # 深度分析使用不同的完成标记
                             st.session_state.summary_data = None  # 清除结构化总结结果
                             
@@ -692,163 +1310,7 @@ ai_models:
                         st.info("💡 请检查网络连接和模型配置，或稍后重试")
     
     # 显示总结结果
-    if st.session_state.summary_data or st.session_state.deep_analysis_result:
-        results_expander = st.expander("📋 总结结果", expanded=True)
-        with results_expander:
-            # 根据不同的结果类型显示不同的内容
-            if st.session_state.summary_data:
-                # 显示结构化总结结果
-                st.subheader("📊 结构化总结结果")
-                summary = st.session_state.summary_data
-                
-                # 显示总体总结
-                st.subheader("📝 总体总结")
-                st.write(summary['overall_summary'])
-                
-                # 显示主题分析
-                if summary['topics']:
-                    st.subheader("🏷️ 主要主题")
-                    for i, topic in enumerate(summary['topics'], 1):
-                        st.write(f"{i}. {topic}")
-                
-                # 显示分段总结
-                st.subheader("📑 分段总结")
-                for segment in summary['segments']:
-                    with st.container():
-                        col1, col2 = st.columns([3, 1])
-                        with col1:
-                            st.write(f"**第{segment['index']}段**")
-                            if segment['start_time']:
-                                st.caption(f"时间: {segment['start_time']}")
-                            st.write(segment['summary'])
-                        with col2:
-                            if segment['keywords']:
-                                st.write("**关键词:**")
-                                keywords_html = ""
-                                for kw in segment['keywords']:
-                                    keywords_html += f'<span style="background-color: #f0f2f6; color: #262730; padding: 2px 8px; margin: 2px; border-radius: 12px; font-size: 12px; display: inline-block;">{kw}</span> '
-                                st.markdown(keywords_html, unsafe_allow_html=True)
-                        st.divider()
-                
-                # 结构化总结的导出选项
-                st.subheader("💾 导出结构化总结")
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    if st.button("📄 导出为TXT", key="export_structured_txt"):
-                        try:
-                            txt_path = st.session_state.summarizer.export_summary(
-                                summary, "txt", st.session_state.media_title
-                            )
-                            with open(txt_path, 'r', encoding='utf-8') as f:
-                                txt_content = f.read()
-                            st.download_button(
-                                "下载TXT文件",
-                                txt_content,
-                                file_name=os.path.basename(txt_path),
-                                mime="text/plain"
-                            )
-                            st.success("TXT文件已生成")
-                        except Exception as e:
-                            st.error(f"导出TXT失败：{str(e)}")
-                
-                with col2:
-                    if st.button("📝 导出为Markdown", key="export_structured_md"):
-                        try:
-                            md_path = st.session_state.summarizer.export_summary(
-                                summary, "markdown", st.session_state.media_title
-                            )
-                            with open(md_path, 'r', encoding='utf-8') as f:
-                                md_content = f.read()
-                            st.download_button(
-                                "下载Markdown文件",
-                                md_content,
-                                file_name=os.path.basename(md_path),
-                                mime="text/markdown"
-                            )
-                            st.success("Markdown文件已生成")
-                        except Exception as e:
-                            st.error(f"导出Markdown失败：{str(e)}")
-                
-                with col3:
-                    if st.button("📑 导出为PDF", key="export_structured_pdf"):
-                        try:
-                            pdf_path = st.session_state.summarizer.export_summary(
-                                summary, "pdf", st.session_state.media_title
-                            )
-                            with open(pdf_path, 'rb') as f:
-                                pdf_content = f.read()
-                            st.download_button(
-                                "下载PDF文件",
-                                pdf_content,
-                                file_name=os.path.basename(pdf_path),
-                                mime="application/pdf"
-                            )
-                            st.success("PDF文件已生成")
-                        except Exception as e:
-                            st.error(f"导出PDF失败：{str(e)}")
-            
-            elif st.session_state.deep_analysis_result:
-                # 显示深度分析结果
-                st.subheader("🧠 深度分析结果")
-                st.write(st.session_state.deep_analysis_result)
-                
-                # 深度分析的导出选项
-                st.subheader("💾 导出深度分析")
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # 下载为TXT格式
-                    st.download_button(
-                        "📄 下载深度分析报告 (TXT)",
-                        st.session_state.deep_analysis_result,
-                        file_name=f"{st.session_state.media_title}_深度分析.txt",
-                        mime="text/plain",
-                        key="download_deep_analysis_txt"
-                    )
-                
-                with col2:
-                    # 下载为Markdown格式（适合公众号使用）
-                    st.download_button(
-                        "📝 下载深度分析报告 (Markdown)",
-                        st.session_state.deep_analysis_result,
-                        file_name=f"{st.session_state.media_title}_深度分析.md",
-                        mime="text/markdown",
-                        key="download_deep_analysis_md"
-                    )
-                
-                # 添加清空结果的选项
-                st.divider()
-                if st.button("🗑️ 清空当前结果", key="clear_deep_analysis", help="清空当前显示的深度分析结果"):
-                    st.session_state.deep_analysis_result = None
-                    st.success("已清空深度分析结果")
-                    st.rerun()
-            
-            # 通用功能：重新选择总结模式
-            st.divider()
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("🔄 重新选择总结模式", key="change_summary_mode"):
-                    # 清空所有结果，让用户重新选择
-                    st.session_state.summary_data = None
-                    st.session_state.deep_analysis_result = None
-                    st.session_state.summarize_completed = False
-                    st.success("已重置，请重新选择总结模式")
-                    st.rerun()
-            
-            with col2:
-                if st.button("📊 切换到另一种总结模式", key="switch_summary_mode"):
-                    # 切换到另一种模式（但保留当前结果）
-                    current_mode = st.session_state.summary_mode
-                    new_mode = "deep_analysis" if current_mode == "structured" else "structured"
-                    st.session_state.summary_mode = new_mode
-                    
-                    mode_names = {
-                        "structured": "结构化总结",
-                        "deep_analysis": "深度分析"
-                    }
-                    st.info(f"已切换到 {mode_names[new_mode]} 模式，您可以对同一份内容进行不同类型的分析")
-                    st.rerun()
+    summary_results_panel()
 
     # 第四步：下载转录文件功能
     download_expander = st.expander("第四步：下载原始转录文件", expanded=False)
@@ -860,43 +1322,59 @@ ai_models:
         
         with col1:
             if st.session_state.txt_path and os.path.exists(st.session_state.txt_path):
-                st.download_button(
-                    label="📄 下载转录文件 (TXT)",
-                    data=st.session_state.transcript,
-                    file_name=os.path.basename(st.session_state.txt_path),
-                    mime="text/plain",
-                    key="download_original_txt"
-                )
+                with open(st.session_state.txt_path, "rb") as txt_file:
+                    st.download_button(
+                        label="📄 下载转录文件 (TXT)",
+                        data=txt_file,
+                        file_name=os.path.basename(st.session_state.txt_path),
+                        on_click="ignore",
+                        mime="text/plain",
+                        key="download_original_txt"
+                    )
             else:
                 st.warning("TXT 文件不可用")
         
         with col2:
+            # PDF 在转录时不再自动生成（长转录排版较慢），需要时点击按钮生成
+            if (st.session_state.output_format == "txt" and
+                not (st.session_state.pdf_path and os.path.exists(st.session_state.pdf_path)) and
+                st.session_state.txt_path and os.path.exists(st.session_state.txt_path)):
+                if st.button("📑 生成 PDF 文件", key="generate_original_pdf"):
+                    from transcribe import save_transcript_pdf
+                    with st.spinner("正在生成 PDF..."):
+                        st.session_state.pdf_path = save_transcript_pdf(st.session_state.txt_path)
+                    if st.session_state.pdf_path and "transcript_cache_path" in st.session_state:
+                        try:
+                            save_cached_transcript(st.session_state.transcript_cache_path,
+                                                   st.session_state.txt_path, st.session_state.pdf_path)
+                        except Exception as e:
+                            print(f"保存转录缓存失败: {e}")
+                    if not st.session_state.pdf_path:
+                        st.error("PDF 生成失败")
+
             # PDF下载按钮
             if (st.session_state.output_format == "txt" and 
                 st.session_state.pdf_path and 
                 os.path.exists(st.session_state.pdf_path)):
                 try:
                     with open(st.session_state.pdf_path, "rb") as pdf_file:
-                        pdf_data = pdf_file.read()
-                    st.download_button(
-                        label="📑 下载转录文件 (PDF)",
-                        data=pdf_data,
-                        file_name=os.path.basename(st.session_state.pdf_path),
-                        mime="application/pdf",
-                        key="download_original_pdf"
-                    )
+                        st.download_button(
+                            label="📑 下载转录文件 (PDF)",
+                            data=pdf_file,
+                            file_name=os.path.basename(st.session_state.pdf_path),
+                            on_click="ignore",
+                            mime="application/pdf",
+                            key="download_original_pdf"
+                        )
                 except Exception as e:
                     st.error(f"读取PDF文件失败: {e}")
             elif st.session_state.output_format == "srt":
                 st.info("SRT格式不生成PDF文件")
-            else:
-                st.warning("PDF 文件不可用")
         
         # 添加重新转录选项
         st.divider()
         if st.button("🔄 重新转录", key="retranscribe"):
             st.session_state.transcribe_completed = False
-            st.session_state.transcript = None
             st.session_state.txt_path = None
             st.session_state.pdf_path = None
             # 同时重置总结相关状态
@@ -907,22 +1385,33 @@ ai_models:
             st.rerun()
 
 # 转录结果显示
-if st.session_state.transcript:
+if st.session_state.transcribe_completed and st.session_state.txt_path and os.path.exists(st.session_state.txt_path):
     st.subheader("转录文稿预览")
-    st.text_area("转录内容", st.session_state.transcript, height=300, key="transcript_preview")
+    st.text_area("转录内容", get_transcript_preview(st.session_state.txt_path), height=300, key="transcript_preview")
+    if os.path.getsize(st.session_state.txt_path) > TRANSCRIPT_PREVIEW_BYTES:
+        st.caption("转录内容较长，仅预览开头部分，完整内容请下载转录文件")
 
 # 清理功能和侧边栏工具
 def cleanup_temp_files():
-    """清理临时上传文件"""
+    """清理临时上传文件（保留临时目录本身）"""
     temp_dir = "temp_uploads"
-    if os.path.exists(temp_dir):
-        try:
-            import shutil
-            shutil.rmtree(temp_dir)
-            return True
-        except Exception as e:
-            st.warning(f"清理临时文件时出错：{e}")
-            return False
+    if not os.path.exists(temp_dir):
+        return True
+    
+    failed = []
+    with os.scandir(temp_dir) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+            except OSError as e:
+                failed.append(f"{entry.name}: {e}")
+    
+    if failed:
+        st.warning(f"清理临时文件时出错：{'; '.join(failed)}")
+        return False
     return True
 
 # 侧边栏工具
@@ -945,9 +1434,7 @@ with st.sidebar:
         progress_info.append("✅ 深度分析")
     
     if progress_info:
-        st.write("**当前进度：**")
-        for info in progress_info:
-            st.write(info)
+        st.markdown("**当前进度：**  \n" + "  \n".join(progress_info))
     
     st.divider()
     
@@ -1000,12 +1487,14 @@ with st.sidebar:
     
     # 显示支持的文件格式
     with st.expander("📋 支持的文件格式"):
-        st.write("**音频格式：**")
-        st.write("MP3, WAV, M4A, FLAC, OGG, AAC")
-        st.write("**视频格式：**")
-        st.write("MP4, MKV, AVI, MOV, WMV, WebM")
-        st.write("**导出格式：**")
-        st.write("TXT, SRT, PDF, Markdown")
+        st.markdown(
+            "**音频格式：**\n\n"
+            "MP3, WAV, M4A, FLAC, OGG, AAC\n\n"
+            "**视频格式：**\n\n"
+            "MP4, MKV, AVI, MOV, WMV, WebM\n\n"
+            "**导出格式：**\n\n"
+            "TXT, SRT, PDF, Markdown"
+        )
     
     # 帮助信息
     with st.expander("❓ 使用帮助"):
@@ -1,211 +1,445 @@
+import atexit
+import hashlib
+import json
+import logging
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 import os
-from tqdm import tqdm
+import shutil
 # from pytube import YouTube # 移除 pytube 导入
-import re
-import subprocess # 新增导入 subprocess
-import json # 新增导入 json 用于获取元数据
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
 
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_BLOCK_SIZE = 1 << 20  # 流式下载每次读取 1MB，减少 Python 层循环和写入次数
+PROGRESS_POLL_INTERVAL = 0.2  # 单连接下载时轮询写入进度的间隔（秒）
+RANGE_DOWNLOAD_CONNECTIONS = 4  # 分段并发下载的连接数
+RANGE_DOWNLOAD_MIN_SIZE = 8 << 20  # 小于 8MB 的文件直接单连接下载
+DOWNLOAD_CACHE_DIR = os.path.join("audio_files", ".cache")  # 链接 -> 已下载文件的索引目录
+ILLEGAL_FILENAME_CHARS = str.maketrans("", "", '\\/*?:"<>|')  # 文件名中需要移除的非法字符
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+
+def _create_http_session():
+    """创建复用连接的 HTTP 会话：连接池供分段并发下载使用，网关错误和连接失败时自动重试"""
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=["HEAD", "GET"])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=RANGE_DOWNLOAD_CONNECTIONS * 2, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+http_session = _create_http_session()
+
+
+def _url_hash(url):
+    """链接的短哈希，用于下载缓存索引和音频文件名"""
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _download_cache_path(url):
+    """链接对应的下载缓存索引文件路径"""
+    return os.path.join(DOWNLOAD_CACHE_DIR, f"{_url_hash(url)}.json")
+
+
+def load_cached_download(url):
+    """返回该链接之前下载的 (audio_path, title)，没有记录或文件已被删除时返回 None"""
+    try:
+        with open(_download_cache_path(url), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(cached.get("path", "")):
+        return None
+    logger.info("使用已下载的音频文件: %s", cached['path'])
+    return cached["path"], cached["title"]
+
+
+def save_cached_download(url, audio_path, title):
+    """记录链接对应的下载结果，再次下载同一链接时直接复用"""
+    try:
+        os.makedirs(DOWNLOAD_CACHE_DIR, exist_ok=True)
+        with open(_download_cache_path(url), "w", encoding="utf-8") as f:
+            json.dump({"url": url, "path": audio_path, "title": title}, f, ensure_ascii=False)
+    except OSError as e:
+        logger.warning("保存下载缓存记录失败: %s", e)
+
+
+def _progress_reporter(total_size, progress_callback):
+    """返回线程安全的 advance(字节数) 函数，每累计下载约 1% 才回报一次进度"""
+    state = {"downloaded": 0, "last_reported": 0}
+    lock = threading.Lock()
+    report_step = total_size / 100
+
+    def advance(size):
+        with lock:
+            state["downloaded"] += size
+            downloaded = state["downloaded"]
+            if progress_callback and total_size > 0 and (downloaded - state["last_reported"] >= report_step or downloaded >= total_size):
+                state["last_reported"] = downloaded
+                progress_callback(downloaded / total_size)
+
+    return advance
+
+
+def _probe_remote_file(url):
+    """发送 HEAD 请求，返回 (重定向后的地址, 文件大小, 是否支持 Range 请求)，失败时视为不支持"""
+    try:
+        response = http_session.head(url, allow_redirects=True, timeout=15)
+        response.raise_for_status()
+        total_size = int(response.headers.get('content-length', 0))
+        accepts_ranges = response.headers.get('accept-ranges', '').lower() == 'bytes'
+        return response.url, total_size, accepts_ranges
+    except Exception as e:
+        logger.warning("获取音频文件信息失败: %s", e)
+        return url, 0, False
 
-def download_podcast_audio(url, progress_callback=None):
-    print(f"downloading podcast from {url}")
-    # 设置Selenium的Chrome浏览器选项
-    start_time = time.time()
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")  # 无头模式，不显示浏览器界面
-    chrome_options.add_argument("--disable-gpu")  # 禁用GPU加速
-    chrome_options.add_argument("--no-sandbox")  # 禁用沙盒模式
-    # 添加新的选项以提高稳定性
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--window-size=1920,1080")
-
-    # 不指定Service，让Selenium自动查找chromedriver（需确保chromedriver在环境变量中）
-    driver = webdriver.Chrome(options=chrome_options)
-    end_time = time.time()
-    print(f"driver init time: {end_time - start_time} seconds")
-    # # 设置页面加载超时时间
-    # driver.set_page_load_timeout(30)
-    # # 设置脚本执行超时时间
-    # driver.set_script_timeout(60)
 
+def _preallocate(audio_file, total_size):
+    """按已知大小一次性为文件分配磁盘空间，避免边写边扩展文件；仅 POSIX 系统支持，返回是否成功"""
+    if total_size <= 0 or not hasattr(os, "posix_fallocate"):
+        return False
     try:
-        # 加载目标网页
-        print("正在加载播客页面...")
-        driver.get(url)
+        os.posix_fallocate(audio_file.fileno(), 0, total_size)
+        return True
+    except OSError:
+        return False
+
+
+def _watch_file_progress(audio_file, total_size, progress_callback, stop_event):
+    """在单独的线程中定期读取文件写入位置并回报进度，直到 stop_event 被设置"""
+    while not stop_event.wait(PROGRESS_POLL_INTERVAL):
+        progress_callback(min(audio_file.tell() / total_size, 1.0))
+
+
+def _download_stream(url, audio_path, progress_callback):
+    """单连接流式下载
+
+    用 shutil.copyfileobj 以大块直接从响应流拷贝到文件，进度由单独的线程轮询文件写入位置回报，
+    拷贝循环中不再逐块调用进度回调。服务器返回错误状态时抛出异常，不把错误页面当作音频写入。
+    """
+    with http_session.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        total_size = int(response.headers.get('content-length', 0))
+        response.raw.decode_content = True  # 与 iter_content 一致，按 Content-Encoding 解压
+        with open(audio_path, 'wb') as audio_file:
+            _preallocate(audio_file, total_size)
+            watcher = None
+            stop_event = threading.Event()
+            if progress_callback and total_size > 0:
+                watcher = threading.Thread(
+                    target=_watch_file_progress, args=(audio_file, total_size, progress_callback, stop_event), daemon=True
+                )
+                watcher.start()
+            try:
+                shutil.copyfileobj(response.raw, audio_file, length=DOWNLOAD_BLOCK_SIZE)
+            finally:
+                stop_event.set()
+                if watcher:
+                    watcher.join()
+            audio_file.truncate()  # 实际内容与 Content-Length 不一致时去掉预分配多出的部分
+    if progress_callback and total_size > 0:
+        progress_callback(1.0)
+
+
+def _download_range(url, audio_path, start, end, advance):
+    """下载 [start, end] 字节区间并写入文件的对应位置"""
+    with http_session.get(url, headers={"Range": f"bytes={start}-{end}"}, stream=True, timeout=30) as response:
+        if response.status_code != 206:
+            raise ValueError(f"服务器未返回分段内容 (HTTP {response.status_code})")
+        written = 0
+        with open(audio_path, 'r+b') as audio_file:
+            audio_file.seek(start)
+            for data in response.iter_content(DOWNLOAD_BLOCK_SIZE):
+                audio_file.write(data)
+                written += len(data)
+                advance(len(data))
+    if written != end - start + 1:
+        raise ValueError(f"分段 {start}-{end} 下载不完整")
+
+
+def _download_ranges(url, audio_path, total_size, progress_callback):
+    """将文件按字节区间切分，多个连接并发下载，写入预先分配好大小的文件"""
+    with open(audio_path, 'wb') as audio_file:
+        if not _preallocate(audio_file, total_size):
+            audio_file.truncate(total_size)
+    part_size = -(-total_size // RANGE_DOWNLOAD_CONNECTIONS)
+    ranges = [(start, min(start + part_size, total_size) - 1) for start in range(0, total_size, part_size)]
+    advance = _progress_reporter(total_size, progress_callback)
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(_download_range, url, audio_path, start, end, advance) for start, end in ranges]
+        for future in futures:
+            future.result()
+
+
+def download_audio_file(url, audio_path, progress_callback=None):
+    """下载音频文件到 audio_path
+
+    服务器支持 Range 请求且文件较大时，分多个连接并发下载，绕过 CDN 的单连接限速；
+    否则（或并发下载失败时）回退到单连接流式下载。
+    """
+    final_url, total_size, accepts_ranges = _probe_remote_file(url)
+    if accepts_ranges and total_size >= RANGE_DOWNLOAD_MIN_SIZE:
+        try:
+            _download_ranges(final_url, audio_path, total_size, progress_callback)
+            return
+        except Exception as e:
+            logger.warning("分段并发下载失败，改为单连接下载: %s", e)
+    _download_stream(url, audio_path, progress_callback)
+
+
+class PodcastPageParser(HTMLParser):
+    """从播客页面 HTML 中提取标题和音频地址
+
+    优先使用 <h1 class="...title..."> 和 <audio src>，缺失时回退到 og:title / og:audio 元数据。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.title = None
+        self.audio_url = None
+        self.og_title = None
+        self.og_audio = None
+        self._title_parts = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "h1" and self.title is None and "title" in (attrs.get("class") or ""):
+            self._title_parts = []
+        elif tag == "audio" and self.audio_url is None and attrs.get("src"):
+            self.audio_url = attrs["src"]
+        elif tag == "meta":
+            if attrs.get("property") == "og:title":
+                self.og_title = attrs.get("content")
+            elif attrs.get("property") == "og:audio":
+                self.og_audio = attrs.get("content")
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "h1" and self._title_parts is not None:
+            self.title = "".join(self._title_parts).strip() or None
+            self._title_parts = None
+
+
+def fetch_podcast_page(url):
+    """直接请求播客页面并解析 HTML，返回 (标题, 音频地址)，解析不到时对应项为 None"""
+    response = http_session.get(url, timeout=15)
+    response.raise_for_status()
+    parser = PodcastPageParser()
+    parser.feed(response.text)
+    return parser.title or parser.og_title, parser.audio_url or parser.og_audio
+
+
+PODCAST_PAGE_SCRIPT = """
+const title = document.querySelector("h1[class*='title']");
+const audio = document.querySelector("audio");
+return {title: title ? title.innerText : null, src: audio ? audio.src : null};
+"""
+
+
+_driver = None
+_driver_lock = threading.Lock()  # 同一浏览器实例同时只服务一个页面请求
+
+
+def _get_driver():
+    """获取进程内复用的无头 Chrome 实例，首次调用时启动（调用方需持有 _driver_lock）"""
+    global _driver
+    if _driver is None:
+        # 设置Selenium的Chrome浏览器选项
+        start_time = time.time()
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")  # 无头模式，不显示浏览器界面
+        chrome_options.add_argument("--disable-gpu")  # 禁用GPU加速
+        chrome_options.add_argument("--no-sandbox")  # 禁用沙盒模式
+        # 添加新的选项以提高稳定性
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--window-size=1920,1080")
+
+        # 不指定Service，让Selenium自动查找chromedriver（需确保chromedriver在环境变量中）
+        _driver = webdriver.Chrome(options=chrome_options)
         end_time = time.time()
-        print(f"page load time: {end_time - start_time} seconds")
-
-        # 1. 获取播客标题
-        #   - 如果 class 名称中包含较多动态信息（如 "jsx-399326063 title"），
-        #     建议用 XPATH 的方式做部分匹配，避免以后 class 变化导致抓取失败。
-        #   - 例如: //h1[contains(@class,'title')]
-        title_element = driver.find_element(By.XPATH, "//h1[contains(@class,'title')]")
-        podcast_title = title_element.text
-        print("播客标题:", podcast_title)
-
-        # 2. 查找网页中的 <audio> 标签，获取音频 URL
-        audio_element = driver.find_element(By.TAG_NAME, "audio")
-        audio_url = audio_element.get_attribute("src")
+        logger.debug("driver init time: %.2f seconds", end_time - start_time)
+        # # 设置页面加载超时时间
+        # _driver.set_page_load_timeout(30)
+        # # 设置脚本执行超时时间
+        # _driver.set_script_timeout(60)
+    return _driver
+
+
+def _quit_driver():
+    """关闭浏览器实例（调用方需持有 _driver_lock）"""
+    global _driver
+    if _driver is not None:
+        try:
+            _driver.quit()
+        except Exception as e:
+            logger.warning("关闭浏览器时出错: %s", e)
+        _driver = None
+
+
+def close_driver():
+    """关闭复用的浏览器实例，进程退出时自动调用"""
+    with _driver_lock:
+        _quit_driver()
+
+
+atexit.register(close_driver)
+
+
+def scrape_podcast_page_with_browser(url):
+    """使用无头 Chrome 加载播客页面，返回 (标题, 音频地址)，用于页面需要 JavaScript 渲染的情况
+
+    浏览器实例在多次下载之间复用，只在首次使用时承担启动开销。
+    """
+    with _driver_lock:
+        driver = _get_driver()
+        try:
+            # 加载目标网页
+            logger.info("正在加载播客页面...")
+            start_time = time.time()
+            driver.get(url)
+            end_time = time.time()
+            logger.debug("page load time: %.2f seconds", end_time - start_time)
+
+            # 一次脚本调用同时取出播客标题和 <audio> 标签的音频 URL，减少与浏览器的往返
+            #   - class 名称中包含较多动态信息（如 "jsx-399326063 title"），
+            #     用 [class*='title'] 做部分匹配，避免以后 class 变化导致抓取失败。
+            page_data = driver.execute_script(PODCAST_PAGE_SCRIPT)
+            return page_data.get("title"), page_data.get("src")
+        except Exception:
+            # 出错后清理会话状态继续复用；浏览器已无法响应时丢弃实例，下次重新启动
+            try:
+                driver.delete_all_cookies()
+            except Exception:
+                _quit_driver()
+            raise
+
+
+def download_podcast_audio(url, progress_callback=None):
+    logger.info("downloading podcast from %s", url)
+    cached = load_cached_download(url)
+    if cached:
+        if progress_callback:
+            progress_callback(1.0)
+        return cached
+    try:
+        # 页面由服务端渲染，先直接请求 HTML 解析，省去启动浏览器的开销；解析不到时再回退到 Selenium
+        podcast_title, audio_url = None, None
+        try:
+            podcast_title, audio_url = fetch_podcast_page(url)
+        except Exception as e:
+            logger.warning("直接解析播客页面失败: %s", e)
+        if not podcast_title or not audio_url:
+            logger.info("未能从页面 HTML 中解析出标题或音频地址，改用浏览器加载页面...")
+            podcast_title, audio_url = scrape_podcast_page_with_browser(url)
+        logger.info("播客标题: %s", podcast_title)
+
         if not audio_url:
-            print("网页中未找到音频文件。")
+            logger.error("网页中未找到音频文件。")
             return None, None # 返回 None 表示失败
 
         # 3. 下载音频文件
-        response = requests.get(audio_url, stream=True, verify=False)
-        total_size = int(response.headers.get('content-length', 0))
-        block_size = 1024
-        
         os.makedirs("audio_files", exist_ok=True)
-        # 清理标题中的非法字符，用于文件名
-        safe_title = re.sub(r'[\/*?:"<>|]', "", podcast_title)
-        audio_path = os.path.join("audio_files", f"{safe_title}-podcast_audio.mp3") # 调整文件名
+        # 清理标题中的非法字符，用于文件名；文件名带上链接哈希，不同链接的同名播客不会互相覆盖
+        safe_title = podcast_title.translate(ILLEGAL_FILENAME_CHARS)
+        audio_path = os.path.join("audio_files", f"{safe_title}-{_url_hash(url)}-podcast_audio.mp3")
 
-        downloaded = 0
-        print(f"开始下载音频文件到 {audio_path}...")
-        with open(audio_path, 'wb') as audio_file:
-            for data in response.iter_content(block_size):
-                downloaded += len(data)
-                audio_file.write(data)
-                if progress_callback and total_size > 0:
-                    progress = (downloaded / total_size)
-                    progress_callback(progress)
-        
-        print(f"播客音频文件已保存到 {audio_path}")
+        logger.info("开始下载音频文件到 %s...", audio_path)
+        download_audio_file(audio_url, audio_path, progress_callback)
+        logger.info("播客音频文件已保存到 %s", audio_path)
+        save_cached_download(url, audio_path, podcast_title)
         return audio_path, podcast_title
 
     except Exception as e:
-        print(f"下载播客时出错: {e}")
+        logger.error("下载播客时出错: %s", e)
         return None, None # 返回 None 表示失败
-    finally:
-        driver.quit()
 
 
-# 重写 YouTube 音频下载函数，使用 yt-dlp
+# YouTube 音频下载，在进程内调用 yt-dlp
 def download_youtube_audio(url, progress_callback=None, cookies_path=None): # 添加 cookies_path 参数
-    print(f"downloading youtube audio from {url} using yt-dlp")
+    logger.info("downloading youtube audio from %s using yt-dlp", url)
+    cached = load_cached_download(url)
+    if cached:
+        if progress_callback:
+            progress_callback(1.0)
+        return cached
+    try:
+        from yt_dlp import YoutubeDL
+        from yt_dlp.utils import DownloadError
+    except ImportError:
+        logger.error("未安装 yt-dlp。请运行 pip install yt-dlp 安装。")
+        if progress_callback:
+            progress_callback(-1.0)
+        return None, None
+
+    def report_progress(status):
+        # yt-dlp 下载进度钩子：按已下载字节数换算为 0-1 的进度
+        if progress_callback and status.get("status") == "downloading":
+            total = status.get("total_bytes") or status.get("total_bytes_estimate")
+            if total:
+                progress_callback(min(status.get("downloaded_bytes", 0) / total, 0.99))
+
+    # 下载选项：
+    #   format ba: 选择最佳质量的纯音频流
+    #   outtmpl: 输出模板，标题由 yt-dlp 清理为合法文件名，扩展名由 yt-dlp 决定；
+    #            文件名带上链接哈希，不同链接的同名视频不会互相覆盖
+    #   noplaylist: 如果是播放列表链接，只下载单个视频
+    ydl_options = {
+        'format': 'ba',
+        'outtmpl': os.path.join("audio_files", f"%(title)s-{_url_hash(url)}-youtube_audio.%(ext)s"),
+        'noplaylist': True,
+        'quiet': True,
+        'no_warnings': True,
+        'progress_hooks': [report_progress],
+    }
     if cookies_path and os.path.exists(cookies_path):
-        print(f"使用 Cookies 文件: {cookies_path}")
-        cookies_arg = ["--cookies", cookies_path]
-    else:
-        if cookies_path:
-             print(f"警告: 提供的 Cookies 文件路径无效或不存在: {cookies_path}")
-        cookies_arg = []
+        logger.info("使用 Cookies 文件: %s", cookies_path)
+        ydl_options['cookiefile'] = cookies_path
+    elif cookies_path:
+        logger.warning("提供的 Cookies 文件路径无效或不存在: %s", cookies_path)
 
     try:
-        # 1. 获取视频标题和清理文件名
-        # 优先尝试使用 --get-title 获取标题，更简单稳定
-        video_title = None
-        try:
-            # 在获取标题时也使用 cookies
-            info_command = ['yt-dlp', '--get-title'] + cookies_arg + [url]
-            result = subprocess.run(info_command, capture_output=True, text=True, check=True, encoding='utf-8', errors='ignore')
-            video_title = result.stdout.strip()
-        except subprocess.CalledProcessError as e:
-            print(f"使用 --get-title 获取标题失败: {e}")
-            # 如果 --get-title 失败，尝试回退到 --print
-            try:
-                # 在备选方案中也使用 cookies
-                info_command = [
-                    'yt-dlp',
-                    '--print', '%(.{title})j' # 只打印标题的 JSON 格式
-                ] + cookies_arg + [url]
-                result = subprocess.run(info_command, capture_output=True, text=True, check=True, encoding='utf-8', errors='ignore')
-                # 输出可能是 JSON 字符串 (带引号)，需要解析或清理
-                raw_title = result.stdout.strip()
-                if raw_title.startswith('"') and raw_title.endswith('"'):
-                    video_title = raw_title[1:-1]
-                else:
-                     video_title = raw_title # 直接使用，以防不是预期的JSON
-            except subprocess.CalledProcessError as e_print:
-                 print(f"使用 --print 获取标题也失败: {e_print}")
-                 print("Stderr:", e_print.stderr) # 尝试打印原始 stderr
-                 return None, None # 两种方法都失败
-            except Exception as e_fallback:
-                 print(f"尝试 --print 时发生其他错误: {e_fallback}")
-                 return None, None
-        except Exception as e_get_title:
-            print(f"尝试 --get-title 时发生其他错误: {e_get_title}")
-            return None, None
-
-        if not video_title:
-            print("无法获取视频标题。")
-            return None, None
-        
-        print(f"YouTube 视频标题: {video_title}")
-        safe_title = re.sub(r'[\/*?:"<>|]', "", video_title)
-        output_filename = f"{safe_title}-youtube_audio.mp3" # 指定输出为 mp3
-        audio_path = os.path.join("audio_files", output_filename)
-
-        # 2. 构建 yt-dlp 下载命令
-        #    -f ba: 选择最佳质量的纯音频流
-        #    -o: 指定输出模板 (使用 %(ext)s 让 yt-dlp 决定扩展名)
-        #    --progress: 显示进度
-        #    --no-playlist: 如果是播放列表链接，只下载单个视频
-        #    --no-warnings: 减少不必要的输出
-        download_command = [
-            'yt-dlp',
-            '-f', 'ba', # 请求最佳音频 (bestaudio)
-            '-o', os.path.join("audio_files", f"{safe_title}-youtube_audio.%(ext)s"), # 输出模板，扩展名由 yt-dlp 决定
-            '--progress',
-            '--no-playlist',
-            '--no-warnings',
-        ] + cookies_arg + [url] # 添加 cookies 参数到下载命令
-
-        print(f"执行 yt-dlp 命令: {' '.join(download_command)}")
-        
-        # 使用 progress_callback 更新状态，但不显示具体百分比
         if progress_callback:
             progress_callback(0.0) # 表示开始
 
-        # 3. 执行下载命令
-        process = subprocess.Popen(download_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        stdout, stderr = process.communicate()
-
-        if process.returncode == 0:
-            print(f"yt-dlp 下载成功。音频文件已保存到 {audio_path}")
-            # 确保最终路径是 mp3 后缀
-            if not os.path.exists(audio_path):
-                expected_prefix = os.path.join("audio_files", f"{safe_title}-youtube_audio")
-                found_files = [f for f in os.listdir("audio_files") if f.startswith(f"{safe_title}-youtube_audio")]
-                if found_files:
-                     actual_filename = found_files[0]
-                     audio_path = os.path.join("audio_files", actual_filename) # 使用实际找到的文件名
-                     print(f"实际文件路径为: {audio_path}")
-                else:
-                     print("警告：yt-dlp 运行成功，但未找到预期的输出文件！")
-                     return None, None
-                     
-            if progress_callback:
-                progress_callback(1.0) # 表示完成
-            return audio_path, video_title
-        else:
-            print("yt-dlp 下载失败。")
-            # 在打印 stdout 和 stderr 时使用 errors='ignore'
-            print("yt-dlp stdout:", stdout.decode('utf-8', errors='ignore'))
-            print("yt-dlp stderr:", stderr.decode('utf-8', errors='ignore'))
+        # 一次调用同时获取元数据并下载，标题直接取自返回的信息
+        with YoutubeDL(ydl_options) as ydl:
+            info = ydl.extract_info(url, download=True)
+
+        video_title = info.get("title")
+        logger.info("YouTube 视频标题: %s", video_title)
+        downloads = info.get("requested_downloads") or []
+        audio_path = downloads[0].get("filepath") if downloads else None
+        if not audio_path or not os.path.exists(audio_path):
+            logger.warning("yt-dlp 运行成功，但未找到预期的输出文件！")
             if progress_callback:
-                 progress_callback(-1.0) # 使用负数表示错误
+                progress_callback(-1.0)
             return None, None
 
-    except subprocess.CalledProcessError as e: # 这个顶层 except 可能不会被触发了，因为内部处理了
-        print(f"执行 yt-dlp 时出错: {e}")
-        # 尝试用 ignore 解码 stderr
-        stderr_decoded = e.stderr.decode('utf-8', errors='ignore') if e.stderr else "None"
-        print("Stderr:", stderr_decoded)
+        logger.info("yt-dlp 下载成功。音频文件已保存到 %s", audio_path)
         if progress_callback:
-            progress_callback(-1.0)
-        return None, None
-    except FileNotFoundError:
-        print("错误: 找不到 'yt-dlp' 命令。请确保 yt-dlp 已安装并添加到系统 PATH 中。")
+            progress_callback(1.0) # 表示完成
+        save_cached_download(url, audio_path, video_title)
+        return audio_path, video_title
+
+    except DownloadError as e:
+        logger.error("yt-dlp 下载失败: %s", e)
         if progress_callback:
-            progress_callback(-1.0)
+            progress_callback(-1.0) # 使用负数表示错误
         return None, None
     except Exception as e:
-        print(f"下载 YouTube 音频时发生未知错误: {e}")
+        logger.error("下载 YouTube 音频时发生未知错误: %s", e)
         if progress_callback:
             progress_callback(-1.0)
         return None, None
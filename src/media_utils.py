@@ -0,0 +1,185 @@
+import os
+import subprocess
+from typing import Optional
+
+WHISPER_SAMPLE_RATE = 16000  # Whisper 模型输入的采样率
+
+# 可直接流复制（不重新编码）的音频编码及其对应的容器扩展名
+PASSTHROUGH_CONTAINERS = {
+    'aac': '.m4a',
+    'alac': '.m4a',
+    'mp3': '.mp3',
+    'opus': '.ogg',
+    'vorbis': '.ogg',
+    'flac': '.flac',
+}
+
+
+def probe_duration(path: str) -> float:
+    """读取媒体时长（秒），只读取容器元数据，不解码音频
+
+    优先使用 PyAV（faster-whisper 的依赖）在进程内读取，失败时回退到 ffprobe 子进程。
+    """
+    try:
+        return _probe_duration_av(path)
+    except Exception as e:
+        print(f"PyAV 读取时长失败，回退到 ffprobe: {e}")
+    return _probe_duration_ffprobe(path)
+
+
+def _probe_duration_av(path: str) -> float:
+    import av
+    with av.open(path) as container:
+        if container.duration is not None:
+            return container.duration / av.time_base
+        # 部分容器没有总时长，退而读取音频流的时长
+        stream = container.streams.audio[0]
+        if stream.duration is None:
+            raise ValueError(f"PyAV 无法读取媒体时长: {path}")
+        return float(stream.duration * stream.time_base)
+
+
+def _probe_duration_ffprobe(path: str) -> float:
+    command = [
+        'ffprobe',
+        '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        path
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, check=True, encoding='utf-8', errors='ignore')
+    output = result.stdout.strip()
+    if not output or output == "N/A":
+        raise ValueError(f"ffprobe 无法读取媒体时长: {path}")
+    return float(output)
+
+
+def probe_audio_codec(path: str) -> Optional[str]:
+    """使用 ffprobe 读取第一条音轨的编码名称，没有音轨时返回 None"""
+    command = [
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', 'a:0',
+        '-show_entries', 'stream=codec_name',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        path
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, check=True, encoding='utf-8', errors='ignore')
+    return result.stdout.strip() or None
+
+
+def _run_ffmpeg(args: list, output_path: str) -> subprocess.CompletedProcess:
+    """运行 ffmpeg 并输出到 output_path
+
+    先写入同目录下的临时文件，成功后再重命名，避免中断时留下不完整的文件被当作已提取的结果复用。
+    """
+    base, extension = os.path.splitext(output_path)
+    partial_path = f"{base}.partial{extension}"
+    result = subprocess.run(['ffmpeg', '-y', '-v', 'error', *args, partial_path], capture_output=True)
+    if result.returncode == 0:
+        os.replace(partial_path, output_path)
+    elif os.path.exists(partial_path):
+        os.remove(partial_path)
+    return result
+
+
+def extract_audio(video_path: str, output_dir: str) -> str:
+    """从视频中提取音轨
+
+    优先使用 ffmpeg 流复制（-acodec copy）直接拷贝原始音轨，无需解码和重新编码；
+    编码不在 PASSTHROUGH_CONTAINERS 中或流复制失败时，回退为一次性转码成
+    Whisper 所需的 16kHz 单声道 16 位 PCM WAV，转录时无需再重采样。
+    output_dir 中已有提取结果时直接复用。返回提取出的音频文件路径。
+    """
+    base_path = os.path.join(output_dir, "extracted_audio")
+
+    codec = probe_audio_codec(video_path)
+    if codec is None:
+        raise ValueError(f"文件中未找到音轨: {video_path}")
+
+    extension = PASSTHROUGH_CONTAINERS.get(codec)
+    if extension:
+        audio_path = base_path + extension
+        if os.path.exists(audio_path):
+            return audio_path
+        result = _run_ffmpeg(['-i', video_path, '-map', '0:a:0', '-vn', '-acodec', 'copy'], audio_path)
+        if result.returncode == 0:
+            return audio_path
+        print(f"音轨流复制失败，回退为 WAV 转码: {result.stderr.decode('utf-8', errors='ignore')}")
+
+    audio_path = base_path + ".wav"
+    if os.path.exists(audio_path):
+        return audio_path
+    _run_ffmpeg(['-i', video_path, '-map', '0:a:0', '-vn',
+                 '-ac', '1', '-ar', str(WHISPER_SAMPLE_RATE), '-acodec', 'pcm_s16le'], audio_path).check_returncode()
+    return audio_path
+
+
+def probe_audio_format(path: str) -> tuple:
+    """使用 PyAV 读取第一条音轨的 (编码名称, 采样率, 声道数)"""
+    import av
+    with av.open(path) as container:
+        codec_context = container.streams.audio[0].codec_context
+        return codec_context.name, codec_context.sample_rate, len(codec_context.layout.channels)
+
+
+def normalize_pcm_audio(audio_path: str, work_dir: str) -> str:
+    """将非 16kHz 单声道的未压缩 PCM 音频一次性转换为 16kHz 单声道 WAV
+
+    压缩格式（MP3、AAC 等）保持原样：转成 WAV 会使文件变大，而 faster-whisper 解码时本身会重采样。
+    已经是 16kHz 单声道或探测失败时返回原路径；work_dir 中已有转换结果时直接复用。
+    """
+    try:
+        codec, sample_rate, channels = probe_audio_format(audio_path)
+    except Exception as e:
+        print(f"读取音频格式失败，跳过重采样: {e}")
+        return audio_path
+
+    if not codec.startswith("pcm_") or (sample_rate == WHISPER_SAMPLE_RATE and channels == 1):
+        return audio_path
+
+    normalized_path = os.path.join(work_dir, "normalized.wav")
+    if os.path.exists(normalized_path):
+        return normalized_path
+    _run_ffmpeg(['-i', audio_path, '-vn',
+                 '-ac', '1', '-ar', str(WHISPER_SAMPLE_RATE), '-acodec', 'pcm_s16le'], normalized_path).check_returncode()
+    return normalized_path
+
+
+def prepare_local_media(file_path: str, work_dir: str, progress_callback=None) -> dict:
+    """处理本地上传的媒体文件：视频提取音轨，并探测时长和大小
+
+    progress_callback(progress, message) 用于报告进度（progress 为 0-1 的小数）。
+    返回包含 audio_path、extracted、duration、file_size 的字典。
+    """
+    video_extensions = ['.mp4', '.mkv', '.avi', '.mov', '.wmv', '.webm']
+    audio_path = file_path
+    extracted = False
+
+    if os.path.splitext(file_path)[1].lower() in video_extensions:
+        if progress_callback:
+            progress_callback(0.7, "检测到视频文件，正在提取音频...")
+        audio_path = extract_audio(file_path, work_dir)
+        extracted = True
+    else:
+        if progress_callback:
+            progress_callback(0.7, "正在检查音频格式...")
+        audio_path = normalize_pcm_audio(file_path, work_dir)
+
+    if progress_callback:
+        progress_callback(0.9, "验证音频文件...")
+
+    return {
+        "audio_path": audio_path,
+        "extracted": extracted,
+        "duration": probe_duration(audio_path),
+        "file_size": os.path.getsize(audio_path)
+    }
+
+
+def trim_audio(audio_path: str, max_seconds: float) -> str:
+    """使用 ffmpeg 流复制截取音频开头 max_seconds 秒（不重新编码），返回截取后的文件路径"""
+    base, extension = os.path.splitext(audio_path)
+    clip_path = f"{base}.clip{extension}"
+    _run_ffmpeg(['-ss', '0', '-t', str(max_seconds), '-i', audio_path, '-vn', '-c', 'copy'], clip_path).check_returncode()
+    return clip_path
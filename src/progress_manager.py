@@ -1,11 +1,132 @@
 import os
+import re
 import json
+import copy
+import atexit
+import logging
+import weakref
 import uuid
+import heapq
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
-import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson  # Rust 实现的 JSON 编解码，比标准库 json 快数倍
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard  # 用于压缩归档已完成的任务
+except ImportError:
+    zstandard = None
+
+
+def _dump_json(data: Dict) -> bytes:
+    """将任务数据编码为单行紧凑格式的 UTF-8 JSON 字节串"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _load_json(payload: bytes) -> Dict:
+    """解码 JSON 字节串"""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+# 任务ID中不允许出现的字符：\w 与 str.isalnum() 一样按 Unicode 判断字母数字，另外保留空格、- 和 _
+TASK_ID_DISALLOWED_PATTERN = re.compile(r"[^\w \-]")
+
+# 任务文件数超过该值时，列出任务改用线程池并行读取
+PARALLEL_LOAD_MIN_TASKS = 16
+PARALLEL_LOAD_WORKERS = 8
+
+# 进度文件读写缓冲区大小，大任务文件读写时减少系统调用次数
+PROGRESS_IO_BUFFER_SIZE = 1 << 20
+
+
+def _open_for_read(path: str):
+    """以大缓冲区打开进度文件读取，并提示内核按顺序预读"""
+    f = open(path, 'rb', buffering=PROGRESS_IO_BUFFER_SIZE)
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return f
+
+
+def _write_json_streaming(f, data: Dict, list_key: str):
+    """逐项编码写入 JSON 对象，list_key 对应的列表逐个元素写入，不在内存中生成完整的 JSON 字节串"""
+    f.write(b'{')
+    for i, (key, value) in enumerate(data.items()):
+        if i:
+            f.write(b',')
+        f.write(_dump_json(key) + b':')
+        if key == list_key:
+            f.write(b'[')
+            for j, item in enumerate(value):
+                if j:
+                    f.write(b',')
+                f.write(_dump_json(item))
+            f.write(b']')
+        else:
+            f.write(_dump_json(value))
+    f.write(b'}')
+
+
+# 分段总结文本合计超过该字符数时，快照改为逐段流式写入
+SNAPSHOT_STREAM_THRESHOLD = 8 << 20
+
+def _to_timestamp(value) -> float:
+    """将 updated_at 统一为 Unix 时间戳，兼容旧版进度文件中的 ISO 字符串"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+# 进度日志中以 task_updated 事件记录的任务字段
+TASK_STATE_FIELDS = ("media_title", "model_key", "created_at", "updated_at", "total_segments",
+                     "overall_summary", "topics", "status", "error_info")
+
+
+def _task_state(task: 'TaskProgress') -> Dict:
+    """记录任务当前状态的副本，用于与下一次保存时的状态比较出增量事件"""
+    return {
+        "completed": {s["index"] for s in task.completed_segments},
+        "failed": {s["index"]: dict(s) for s in task.failed_segments},
+        "fields": copy.deepcopy({name: getattr(task, name) for name in TASK_STATE_FIELDS}),
+    }
+
+
+def _diff_task_state(previous: Dict, current: Dict, task: 'TaskProgress') -> List[Dict]:
+    """比较两次保存之间的任务状态，生成需要追加到进度日志的事件"""
+    events = []
+    for segment in task.completed_segments:
+        if segment["index"] not in previous["completed"]:
+            events.append({"event": "segment_completed", "segment": segment})
+    for index, segment in current["failed"].items():
+        if previous["failed"].get(index) != segment:
+            events.append({"event": "segment_failed", "segment": segment})
+    for index in previous["failed"].keys() - current["failed"].keys():
+        events.append({"event": "segment_recovered", "index": index})
+    changed = {name: value for name, value in current["fields"].items() if previous["fields"].get(name) != value}
+    if changed:
+        events.append({"event": "task_updated", "fields": changed})
+    return events
+
+
+# 所有存活的 ProgressManager，进程退出时统一写出尚未落盘的进度
+_managers = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_managers():
+    for manager in list(_managers):
+        manager.flush()
 
 
 class TaskProgress:
@@ -15,11 +136,15 @@ class TaskProgress:
         self.task_id = task_id
         self.media_title = media_title
         self.model_key = model_key
-        self.created_at = datetime.now().isoformat()
-        self.updated_at = self.created_at
+        now = datetime.now()
+        self.created_at = now.isoformat()
+        self.updated_at = now.timestamp()  # Unix 时间戳，仅在显示时格式化
         self.total_segments = 0
         self.completed_segments = []
         self.failed_segments = []
+        # 已完成/失败分段的索引集合，用于 O(1) 查重
+        self._completed_idx = set()
+        self._failed_idx = set()
         self.overall_summary = None
         self.topics = None
         self.status = "initialized"  # initialized, segments_in_progress, segments_completed, overall_completed, failed
@@ -47,10 +172,12 @@ class TaskProgress:
         """从字典创建TaskProgress实例"""
         task = cls(data["task_id"], data["media_title"], data["model_key"])
         task.created_at = data.get("created_at", task.created_at)
-        task.updated_at = data.get("updated_at", task.updated_at)
+        task.updated_at = _to_timestamp(data.get("updated_at", task.updated_at))
         task.total_segments = data.get("total_segments", 0)
-        task.completed_segments = data.get("completed_segments", [])
-        task.failed_segments = data.get("failed_segments", [])
+        task.completed_segments = list(data.get("completed_segments", []))
+        task.failed_segments = list(data.get("failed_segments", []))
+        task._completed_idx = {s["index"] for s in task.completed_segments}
+        task._failed_idx = {s["index"] for s in task.failed_segments}
         task.overall_summary = data.get("overall_summary")
         task.topics = data.get("topics")
         task.status = data.get("status", "initialized")
@@ -65,27 +192,59 @@ class TaskProgress:
     
     def is_segment_completed(self, segment_index: int) -> bool:
         """检查指定分段是否已完成"""
-        return any(s["index"] == segment_index for s in self.completed_segments)
+        return segment_index in self._completed_idx
     
     def add_completed_segment(self, segment_data: Dict):
         """添加已完成的分段"""
-        segment_data["completed_at"] = datetime.now().isoformat()
-        # 避免重复添加
-        if not self.is_segment_completed(segment_data["index"]):
+        now = datetime.now()
+        segment_data["completed_at"] = now.isoformat()
+        # 避免重复添加：索引集合判重后直接追加，均为 O(1)
+        segment_index = segment_data["index"]
+        if segment_index not in self._completed_idx:
+            self._completed_idx.add(segment_index)
             self.completed_segments.append(segment_data)
-        self.updated_at = datetime.now().isoformat()
+        self.updated_at = now.timestamp()
     
     def add_failed_segment(self, segment_index: int, error: str):
         """添加失败的分段"""
+        now = datetime.now()
         failed_info = {
             "index": segment_index,
             "error": error,
-            "failed_at": datetime.now().isoformat()
+            "failed_at": now.isoformat()
         }
         # 避免重复添加
-        if not any(s["index"] == segment_index for s in self.failed_segments):
+        if segment_index not in self._failed_idx:
+            self._failed_idx.add(segment_index)
             self.failed_segments.append(failed_info)
-        self.updated_at = datetime.now().isoformat()
+        self.updated_at = now.timestamp()
+    
+    def remove_failed_segment(self, segment_index: int):
+        """从失败列表中移除指定分段（重试成功后调用）"""
+        if segment_index in self._failed_idx:
+            self._failed_idx.discard(segment_index)
+            self.failed_segments = [s for s in self.failed_segments if s["index"] != segment_index]
+            self.updated_at = time.time()
+    
+    def apply_event(self, event: Dict):
+        """重放进度日志中的一条事件"""
+        kind = event["event"]
+        if kind == "segment_completed":
+            segment = event["segment"]
+            if not self.is_segment_completed(segment["index"]):
+                self._completed_idx.add(segment["index"])
+                self.completed_segments.append(segment)
+        elif kind == "segment_failed":
+            segment = event["segment"]
+            self.failed_segments = [s for s in self.failed_segments if s["index"] != segment["index"]]
+            self.failed_segments.append(segment)
+            self._failed_idx.add(segment["index"])
+        elif kind == "segment_recovered":
+            self._failed_idx.discard(event["index"])
+            self.failed_segments = [s for s in self.failed_segments if s["index"] != event["index"]]
+        elif kind == "task_updated":
+            for name, value in event["fields"].items():
+                setattr(self, name, value)
 
 
 class ProgressManager:
@@ -97,14 +256,42 @@ class ProgressManager:
         self.auto_save = config.get("progress", {}).get("auto_save", True)
         self.keep_days = config.get("progress", {}).get("keep_completed_tasks", 7)
         self.cleanup_enabled = config.get("progress", {}).get("task_cleanup_enabled", True)
+        # 进度以「快照 + 追加日志」保存：快照 {task_id}.json 为完整状态，日志 {task_id}.jsonl
+        # 逐行记录此后的增量事件，每次保存只追加变化部分；日志超过快照 2 倍大小时重新写快照
+        self._saved_states: Dict[str, Dict] = {}
+        self._log_ids: Dict[str, str] = {}
+        self._snapshot_sizes: Dict[str, int] = {}
+        self._log_sizes: Dict[str, int] = {}
+        # 合并保存：同一任务在 save_interval 秒内的多次保存只记录为待保存，到期或强制保存时再写盘
+        self.save_interval = config.get("progress", {}).get("save_interval_s", 2)
+        self._pending_tasks: Dict[str, TaskProgress] = {}
+        self._last_save_ts: Dict[str, float] = {}
+        # 未完成任务列表缓存，进度目录中文件数量和最新修改时间不变时直接复用
+        self._list_cache: Optional[List[TaskProgress]] = None
+        self._list_cache_key: Optional[Tuple[int, int]] = None
+        # 已解析任务的缓存 {task_id: (任务文件签名, TaskProgress)}，文件未变化时不重复读取解析
+        self._task_cache: Dict[str, Tuple[tuple, TaskProgress]] = {}
+        # 暂存的错误信息，由界面通过 drain_errors 取出显示
+        self._errors: List[str] = []
+        _managers.add(self)
         
         # 确保进度目录存在
         Path(self.progress_dir).mkdir(exist_ok=True)
     
+    def _record_error(self, message: str, error: Exception):
+        """记录错误到日志，并暂存供界面显示"""
+        logger.error("%s: %s", message, error, exc_info=error)
+        self._errors.append(f"{message}: {error}")
+    
+    def drain_errors(self) -> List[str]:
+        """取出并清空暂存的错误信息"""
+        errors, self._errors = self._errors, []
+        return errors
+    
     def generate_task_id(self, media_title: str) -> str:
         """生成任务ID: 媒体标题 + UUID"""
         # 清理标题中的特殊字符
-        clean_title = "".join(c for c in media_title if c.isalnum() or c in (' ', '-', '_')).strip()
+        clean_title = TASK_ID_DISALLOWED_PATTERN.sub("", media_title).strip()
         clean_title = clean_title.replace(' ', '_')[:50]  # 限制长度
         task_uuid = str(uuid.uuid4())[:8]  # 使用前8位UUID
         return f"{clean_title}_{task_uuid}"
@@ -113,66 +300,264 @@ class ProgressManager:
         """获取任务文件路径"""
         return os.path.join(self.progress_dir, f"{task_id}.json")
     
-    def save_task(self, task: TaskProgress) -> bool:
-        """保存任务进度"""
+    def get_task_log_path(self, task_id: str) -> str:
+        """获取任务进度日志路径"""
+        return os.path.join(self.progress_dir, f"{task_id}.jsonl")
+    
+    def get_task_archive_path(self, task_id: str) -> str:
+        """获取已完成任务的压缩归档路径"""
+        return os.path.join(self.progress_dir, f"{task_id}.json.zst")
+    
+    def _write_archive(self, task: TaskProgress):
+        """将已完成的任务压缩为 zstd 归档，并删除快照和进度日志"""
+        payload = zstandard.ZstdCompressor(level=3).compress(_dump_json(task.to_dict()))
+        archive_path = self.get_task_archive_path(task.task_id)
+        tmp_path = archive_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, archive_path)
+        for file_path in (self.get_task_file_path(task.task_id), self.get_task_log_path(task.task_id)):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+        for saved in (self._log_ids, self._snapshot_sizes, self._log_sizes):
+            saved.pop(task.task_id, None)
+    
+    def _write_snapshot(self, task: TaskProgress):
+        """写入任务完整快照并开始新的进度日志
+        
+        快照中的 log_id 标识与之对应的日志，旧日志中残留的事件因 log_id 不同会在重放时被忽略。
+        """
+        log_id = uuid.uuid4().hex[:8]
+        data = {**task.to_dict(), "log_id": log_id}
+        summary_chars = sum(len(s.get("summary") or "") for s in task.completed_segments)
+        # 先写临时文件再原子替换，避免写入中断时留下损坏的进度文件
+        file_path = self.get_task_file_path(task.task_id)
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, 'wb', buffering=PROGRESS_IO_BUFFER_SIZE) as f:
+            if summary_chars > SNAPSHOT_STREAM_THRESHOLD:
+                _write_json_streaming(f, data, "completed_segments")
+            else:
+                f.write(_dump_json(data))
+            snapshot_size = f.tell()
+        os.replace(tmp_path, file_path)
+        for stale_path in (self.get_task_log_path(task.task_id), self.get_task_archive_path(task.task_id)):
+            try:
+                os.remove(stale_path)
+            except FileNotFoundError:
+                pass
+        self._log_ids[task.task_id] = log_id
+        self._snapshot_sizes[task.task_id] = snapshot_size
+        self._log_sizes[task.task_id] = 0
+    
+    def _append_events(self, task_id: str, events: List[Dict]):
+        """将事件追加到任务进度日志，每个事件一行"""
+        log_id = self._log_ids[task_id]
+        payload = b"".join(_dump_json({**event, "log": log_id}) + b"\n" for event in events)
+        with open(self.get_task_log_path(task_id), 'ab') as f:
+            f.write(payload)
+        self._log_sizes[task_id] += len(payload)
+    
+    def save_task(self, task: TaskProgress, force: bool = False) -> bool:
+        """保存任务进度
+        
+        距该任务上次写盘不足 save_interval 秒时只标记为待保存，由下一次保存或 flush 写出；
+        状态切换等关键节点应传入 force=True 立即写盘。
+        """
         try:
             if not self.auto_save:
                 return True
             
-            file_path = self.get_task_file_path(task.task_id)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(task.to_dict(), f, ensure_ascii=False, indent=2)
+            now = time.monotonic()
+            last_save_ts = self._last_save_ts.get(task.task_id)
+            if not force and last_save_ts is not None and now - last_save_ts < self.save_interval:
+                self._pending_tasks[task.task_id] = task
+                return True
+            self._pending_tasks.pop(task.task_id, None)
+            self._last_save_ts[task.task_id] = now
+            self._task_cache.pop(task.task_id, None)
+            
+            state = _task_state(task)
+            previous = self._saved_states.get(task.task_id)
+            if task.status == "overall_completed" and zstandard is not None:
+                # 已完成的任务很少再读取，压缩归档以节省空间
+                if previous is None or _diff_task_state(previous, state, task):
+                    self._write_archive(task)
+            elif previous is None or task.task_id not in self._log_ids:
+                # 本进程内首次保存该任务（或任务已归档），写完整快照
+                self._write_snapshot(task)
+            else:
+                events = _diff_task_state(previous, state, task)
+                if not events:
+                    return True
+                self._append_events(task.task_id, events)
+                if self._log_sizes[task.task_id] > 2 * self._snapshot_sizes[task.task_id]:
+                    self._write_snapshot(task)
+            self._saved_states[task.task_id] = state
             return True
         except Exception as e:
-            st.error(f"保存任务进度失败: {str(e)}")
+            self._record_error("保存任务进度失败", e)
             return False
     
+    def flush(self):
+        """立即写出所有待保存的任务进度"""
+        for task in list(self._pending_tasks.values()):
+            self.save_task(task, force=True)
+    
     def load_task(self, task_id: str) -> Optional[TaskProgress]:
         """加载任务进度"""
         try:
-            file_path = self.get_task_file_path(task_id)
-            if not os.path.exists(file_path):
-                return None
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return TaskProgress.from_dict(data)
+            if task_id in self._pending_tasks:
+                self.save_task(self._pending_tasks[task_id], force=True)
+            return self._read_task(task_id)
         except Exception as e:
-            st.error(f"加载任务进度失败: {str(e)}")
+            self._record_error("加载任务进度失败", e)
             return None
     
-    def list_incomplete_tasks(self) -> List[TaskProgress]:
-        """列出所有未完成的任务"""
+    def _read_snapshot(self, task_id: str) -> Optional[Dict]:
+        """读取任务快照，快照不存在时读取压缩归档，都不存在时返回 None"""
+        try:
+            with _open_for_read(self.get_task_file_path(task_id)) as f:
+                return _load_json(f.read())
+        except FileNotFoundError:
+            if zstandard is None:
+                return None
+        try:
+            with _open_for_read(self.get_task_archive_path(task_id)) as f:
+                return _load_json(zstandard.ZstdDecompressor().decompress(f.read()))
+        except FileNotFoundError:
+            return None
+    
+    def _task_file_signature(self, task_id: str) -> tuple:
+        """任务快照、归档和进度日志的 (修改时间, 大小)，文件不存在时对应项为 None"""
+        signature = []
+        for file_path in (self.get_task_file_path(task_id), self.get_task_archive_path(task_id),
+                          self.get_task_log_path(task_id)):
+            try:
+                stat = os.stat(file_path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def _read_task(self, task_id: str) -> Optional[TaskProgress]:
+        """读取任务快照并重放进度日志，任务不存在时返回 None，其他错误直接抛出
+        
+        任务文件自上次读取后没有变化时复用缓存的解析结果。每次都返回新的副本，
+        调用方修改返回的任务不会影响缓存。
+        """
+        signature = self._task_file_signature(task_id)
+        cached = self._task_cache.get(task_id)
+        if cached is not None and cached[0] == signature:
+            return TaskProgress.from_dict(cached[1].to_dict())
+        
+        data = self._read_snapshot(task_id)
+        if data is None:
+            self._task_cache.pop(task_id, None)
+            return None
+        task = TaskProgress.from_dict(data)
+        
+        # 重放快照之后追加的事件
+        for event in self._read_events(task_id, data.get("log_id")):
+            task.apply_event(event)
+        self._task_cache[task_id] = (signature, task)
+        return TaskProgress.from_dict(task.to_dict())
+    
+    def _read_events(self, task_id: str, log_id: Optional[str]):
+        """逐个读取进度日志中属于 log_id 对应快照的事件，日志不存在时不产生任何事件"""
+        try:
+            with _open_for_read(self.get_task_log_path(task_id)) as f:
+                for line in f:
+                    try:
+                        event = _load_json(line)
+                    except ValueError:
+                        return  # 写入中断留下的不完整末行
+                    if event.get("log") == log_id:
+                        yield event
+        except FileNotFoundError:
+            return
+    
+    def compact_task(self, task_id: str) -> bool:
+        """将任务的快照与进度日志合并为新的快照"""
+        task = self.load_task(task_id)
+        if task is None:
+            return False
+        try:
+            self._write_snapshot(task)
+            self._saved_states[task_id] = _task_state(task)
+            return True
+        except Exception as e:
+            self._record_error("合并任务进度失败", e)
+            return False
+    
+    def _task_dir_signature(self) -> Tuple[int, int]:
+        """进度目录中任务文件的 (数量, 最新修改时间)，任务新增、保存或删除时随之变化"""
+        with os.scandir(self.progress_dir) as entries:
+            mtimes = [entry.stat().st_mtime_ns for entry in entries if entry.name.endswith(('.json', '.jsonl'))]
+        return len(mtimes), max(mtimes, default=0)
+    
+    def _load_tasks(self, task_ids: List[str]) -> List[Optional[TaskProgress]]:
+        """批量加载任务，任务较多时用线程池并行读取文件"""
+        if len(task_ids) <= PARALLEL_LOAD_MIN_TASKS:
+            return [self.load_task(task_id) for task_id in task_ids]
+        
+        self.flush()
+        with ThreadPoolExecutor(max_workers=PARALLEL_LOAD_WORKERS) as executor:
+            futures = [executor.submit(self._read_task, task_id) for task_id in task_ids]
+        tasks = []
+        for future in futures:
+            try:
+                tasks.append(future.result())
+            except Exception as e:
+                self._record_error("加载任务进度失败", e)
+                tasks.append(None)
+        return tasks
+    
+    def list_incomplete_tasks(self, limit: Optional[int] = None) -> List[TaskProgress]:
+        """列出所有未完成的任务，按更新时间从新到旧排列；指定 limit 时只返回最近的 limit 个"""
         incomplete_tasks = []
+        self.flush()
         
         if not os.path.exists(self.progress_dir):
             return incomplete_tasks
         
         try:
-            for filename in os.listdir(self.progress_dir):
-                if filename.endswith('.json'):
-                    task_id = filename[:-5]  # 去掉.json后缀
-                    task = self.load_task(task_id)
-                    if task and task.status not in ["overall_completed"]:
-                        incomplete_tasks.append(task)
+            signature = self._task_dir_signature()
+            if self._list_cache is None or signature != self._list_cache_key:
+                with os.scandir(self.progress_dir) as entries:
+                    task_ids = [entry.name[:-5] for entry in entries if entry.name.endswith('.json')]  # 去掉.json后缀
+                self._list_cache = [
+                    task for task in self._load_tasks(task_ids)
+                    if task and task.status not in ["overall_completed"]
+                ]
+                self._list_cache_key = signature
             
-            # 按更新时间排序，最新的在前
-            incomplete_tasks.sort(key=lambda x: x.updated_at, reverse=True)
+            # 按更新时间排序，最新的在前；只需前 limit 个时用堆选取，不必整体排序
+            if limit is not None:
+                incomplete_tasks = heapq.nlargest(limit, self._list_cache, key=lambda x: x.updated_at)
+            else:
+                incomplete_tasks = sorted(self._list_cache, key=lambda x: x.updated_at, reverse=True)
             
         except Exception as e:
-            st.error(f"列出未完成任务失败: {str(e)}")
+            self._record_error("列出未完成任务失败", e)
         
         return incomplete_tasks
     
     def delete_task(self, task_id: str) -> bool:
         """删除任务文件"""
         try:
-            file_path = self.get_task_file_path(task_id)
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            for file_path in (self.get_task_file_path(task_id), self.get_task_log_path(task_id),
+                              self.get_task_archive_path(task_id)):
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            for saved in (self._saved_states, self._log_ids, self._snapshot_sizes, self._log_sizes, self._task_cache):
+                saved.pop(task_id, None)
+            self._pending_tasks.pop(task_id, None)
+            self._last_save_ts.pop(task_id, None)
             return True
         except Exception as e:
-            st.error(f"删除任务失败: {str(e)}")
+            self._record_error("删除任务失败", e)
             return False
     
     def cleanup_old_tasks(self) -> int:
@@ -181,25 +566,50 @@ class ProgressManager:
             return 0
         
         cleaned_count = 0
-        cutoff_date = datetime.now() - timedelta(days=self.keep_days)
+        cutoff_ts = time.time() - self.keep_days * 86400
         
         try:
             if not os.path.exists(self.progress_dir):
                 return 0
             
-            for filename in os.listdir(self.progress_dir):
-                if filename.endswith('.json'):
-                    task_id = filename[:-5]
-                    task = self.load_task(task_id)
-                    
-                    if task and task.status == "overall_completed":
-                        updated_time = datetime.fromisoformat(task.updated_at)
-                        if updated_time < cutoff_date:
-                            if self.delete_task(task_id):
-                                cleaned_count += 1
+            # 一次 scandir 取得各任务快照和日志的最新修改时间；任务的更新时间不会晚于文件写入时间，
+            # 文件在截止时间之后修改过的任务一定未过期，无需解析
+            snapshot_ids = set()
+            log_ids = set()
+            latest_mtimes = {}
+            with os.scandir(self.progress_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.json.zst'):
+                        task_id, extension = entry.name[:-9], '.json'  # 归档与快照同样视为任务状态文件
+                    else:
+                        task_id, extension = os.path.splitext(entry.name)
+                    if extension not in ('.json', '.jsonl'):
+                        continue
+                    (snapshot_ids if extension == '.json' else log_ids).add(task_id)
+                    latest_mtimes[task_id] = max(latest_mtimes.get(task_id, 0), entry.stat().st_mtime)
+            
+            for task_id in snapshot_ids:
+                if latest_mtimes[task_id] >= cutoff_ts:
+                    continue
+                
+                # 只读出状态和更新时间，不构造 TaskProgress；有进度日志时只重放其中的字段更新事件
+                data = self._read_snapshot(task_id)
+                if data is None:
+                    continue
+                status, updated_at = data.get("status"), data.get("updated_at")
+                if task_id in log_ids:
+                    for event in self._read_events(task_id, data.get("log_id")):
+                        if event["event"] == "task_updated":
+                            status = event["fields"].get("status", status)
+                            updated_at = event["fields"].get("updated_at", updated_at)
+                
+                if status == "overall_completed" and updated_at is not None:
+                    if _to_timestamp(updated_at) < cutoff_ts:
+                        if self.delete_task(task_id):
+                            cleaned_count += 1
             
         except Exception as e:
-            st.error(f"清理任务失败: {str(e)}")
+            self._record_error("清理任务失败", e)
         
         return cleaned_count
     
@@ -230,7 +640,7 @@ class ProgressManager:
                 'completed_segments_count': len(task.completed_segments),
                 'original_length': 0,  # 这个值需要从原始文本获取
                 'model_used': task.model_key,
-                'generated_at': task.updated_at,
+                'generated_at': datetime.fromtimestamp(task.updated_at).isoformat(),
                 'task_id': task.task_id,
                 'progress_percentage': task.get_progress_percentage()
             }
@@ -254,6 +664,6 @@ class ProgressManager:
             "title": task.media_title,
             "progress": f"{completed_count}/{total_count} 段 ({progress_pct:.1f}%)",
             "status": status_map.get(task.status, task.status),
-            "updated": datetime.fromisoformat(task.updated_at).strftime("%Y-%m-%d %H:%M"),
+            "updated": datetime.fromtimestamp(task.updated_at).strftime("%Y-%m-%d %H:%M"),
             "model": task.model_key
         } 
\ No newline at end of file
@@ -1,8 +1,14 @@
 import os
 import re
+import copy
+import hashlib
+import functools
+import threading
 import yaml
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import logging
 import time
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
@@ -15,14 +21,118 @@ from reportlab.lib.units import inch
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from progress_manager import ProgressManager, TaskProgress
 
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson  # C/Rust 实现的 JSON 编解码，长中文分段的请求体序列化更快
+except ImportError:
+    orjson = None
+
+
+# 批量请求的响应中每段结果的标题行：### 第X段
+BATCH_SECTION_PATTERN = re.compile(r'^#{2,4}\s*第\s*(\d+)\s*段[^\n]*$', re.MULTILINE)
+
+# 转录文本中的时间戳：[HH:MM:SS]
+TIMESTAMP_PATTERN = re.compile(r'\[(\d{1,2}):(\d{2}):(\d{2})\]')
+
+# 主题转换指示词
+TOPIC_INDICATORS = [
+    '接下来', '然后', '另外', '此外', '换个话题', '说到', 
+    '谈到', '关于', '我们再来看', '下面', '现在', '最后',
+    '总结', '总的来说', '综上'
+]
+TOPIC_INDICATOR_PATTERN = re.compile('|'.join(re.escape(indicator) for indicator in TOPIC_INDICATORS))
+
+# 问答模式检测，合并为一个正则，每个段落只扫描一次
+QA_PATTERNS = [
+    r'^[问题|提问|主持人|嘉宾][:：]',
+    r'^Q[:：]',
+    r'^A[:：]',
+    r'那么.*问题是',
+    r'你觉得.*吗[？?]',
+    r'怎么.*看.*[？?]'
+]
+QA_PATTERN = re.compile('|'.join(f'(?:{pattern})' for pattern in QA_PATTERNS))
+
+# 各类请求的系统提示词：固定不变，同一任务的各次请求前缀完全相同，便于命中提示词缓存
+BATCH_SUMMARY_PROMPT = """你是一个专业的文本总结专家。请对给定的多个播客转录片段分别进行简洁总结。
+要求：
+1. 每段用1-2句话概括主要内容
+2. 保留关键信息和观点
+3. 语言简洁明了
+4. 保持中文输出
+5. 严格按“### 第X段”的标题逐段输出，X为片段编号，不要输出其他内容"""
+
+BATCH_KEYWORDS_PROMPT = """你是一个关键词提取专家。请从给定的多段文本中分别提取3-5个最重要的关键词。
+要求：
+1. 严格按“### 第X段”的标题逐段输出，X为文本编号
+2. 每个标题下一行只输出该段的关键词，用逗号分隔
+3. 关键词应该是名词或专业术语，按重要性排序"""
+
+SEGMENT_SUMMARY_PROMPT = """你是一个专业的文本总结专家。请对给定的播客转录片段进行简洁总结。
+要求：
+1. 用1-2句话概括主要内容
+2. 保留关键信息和观点
+3. 语言简洁明了
+4. 保持中文输出"""
+
+KEYWORDS_PROMPT = """你是一个关键词提取专家。请从给定文本中提取3-5个最重要的关键词。
+要求：
+1. 只输出关键词，用逗号分隔
+2. 关键词应该是名词或专业术语
+3. 按重要性排序"""
+
+OVERALL_SUMMARY_PROMPT = """你是一个专业的内容总结专家。基于各个分段的总结，生成一个整体的综合总结。
+要求：
+1. 200-300字的总结
+2. 概括全文的主要主题和观点
+3. 保持逻辑清晰，结构完整
+4. 突出最重要的见解和结论
+5. 使用中文输出"""
+
+TOPICS_PROMPT = """你是一个主题分析专家。请分析给定文本的主要主题。
+要求：
+1. 识别3-5个主要主题
+2. 每个主题用简短的词组表示
+3. 按重要性排序
+4. 只输出主题列表，用换行符分隔"""
+
+DEEP_ANALYSIS_PROMPT = "你是一个专业的内容分析专家，请严格按照给定的指导原则进行分析。"
+DEEP_ANALYSIS_CHUNK_PROMPT = "你是一个专业的内容分析专家。这是多段内容中的第{index}段，请按照指导原则进行分析。"
+DEEP_ANALYSIS_MERGE_PROMPT = "你是一个专业的内容整合专家，请将分段分析整合为一篇连贯的完整文章。"
+
+# PDF 排版（ReportLab）是 CPU 密集操作，放到独立线程池中执行，限制所有会话同时生成的数量
+PDF_EXPORT_WORKERS = 2
+_PDF_POOL = ThreadPoolExecutor(max_workers=PDF_EXPORT_WORKERS, thread_name_prefix="pdf-export")
+
+
+def _encode_request_body(data: Dict) -> bytes:
+    """将请求数据编码为 UTF-8 JSON 字节串，中文直接输出而不转义为 \\uXXXX"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _decode_response_body(payload: bytes) -> Dict:
+    """解码 API 响应的 JSON 字节串"""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
 
 class AIModelClient:
     """统一的AI模型客户端，支持OpenAI API风格的多种模型"""
     
-    def __init__(self, model_config: Dict, retry_config: Dict = None):
+    # 所有客户端实例共享的限流状态：接口地址 -> 恢复发送请求的时刻（time.monotonic）。
+    # 任一并发请求收到 429 后，同一接口的其它请求都暂停到该时刻，避免各自重试再次触发限流
+    _backoff_until: Dict[str, float] = {}
+    _backoff_lock = threading.Lock()
+    
+    def __init__(self, model_config: Dict, retry_config: Dict = None, refresh_cache: bool = False):
         self.config = model_config
         self.base_url = model_config['base_url'].rstrip('/')
         self.api_key = model_config['api_key']
@@ -36,10 +146,47 @@ class AIModelClient:
         self.delay_seconds = self.retry_config.get('delay_seconds', 5)
         self.exponential_backoff = self.retry_config.get('exponential_backoff', True)
         self.timeout_seconds = self.retry_config.get('timeout_seconds', 60)
+        # 连接超时单独设置：服务不可达时尽快失败并重试，不必等满整个读取超时
+        self.connect_timeout_seconds = self.retry_config.get('connect_timeout_seconds', 5)
+        # 提示词缓存：同一任务各次调用的系统提示词完全相同，可复用已缓存的前缀
+        self.enable_prompt_cache = self.retry_config.get('enable_prompt_cache', True)
+        # 响应缓存：相同模型和提示词的请求直接返回磁盘上保存的结果，默认不缓存，配置目录后启用。
+        # refresh_cache 为 True 时（用户主动重新生成）不读取缓存，重新请求并覆盖缓存中的结果
+        self.response_cache_dir = self.retry_config.get('response_cache_dir') or None
+        self.response_cache_ttl = self.retry_config.get('response_cache_ttl_days', 7) * 86400
+        self.refresh_cache = refresh_cache
+        if self.response_cache_dir:
+            self._prune_response_cache()
+        
+        # 复用连接的会话：同一任务的所有请求共享 TCP/TLS 连接，避免每次请求重新握手；
+        # 连接池大小与分段总结的并发数一致。重试由 call_api 自行处理，适配器不再重试
+        pool_size = max(1, self.retry_config.get('max_concurrency', 4))
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        
+        # 接口类型在构造时确定一次，之后每次调用直接使用对应的请求头、构建和解析方法
+        self.is_anthropic = 'anthropic.com' in self.base_url
+        if self.is_anthropic:
+            self._headers = {
+                'Content-Type': 'application/json',
+                'x-api-key': self.api_key,
+                'anthropic-version': '2023-06-01'
+            }
+            self._build_request = self._build_claude_request
+            self._parse_response = self._parse_claude_response
+        else:
+            self._headers = {
+                'Content-Type': 'application/json',
+                'Authorization': f'Bearer {self.api_key}'
+            }
+            self._build_request = self._build_openai_request
+            self._parse_response = self._parse_openai_response
     
-    def _is_anthropic_api(self) -> bool:
-        """检查是否为Anthropic Claude API"""
-        return 'anthropic.com' in self.base_url
+    def close(self):
+        """关闭会话，释放连接池中的连接"""
+        self._session.close()
     
     def _calculate_delay(self, attempt: int) -> float:
         """计算重试延迟时间"""
@@ -47,61 +194,160 @@ class AIModelClient:
             return self.delay_seconds * (2 ** (attempt - 1))
         return self.delay_seconds
     
+    def _wait_for_backoff(self):
+        """等待同一接口共享的限流暂停结束"""
+        delay = self._backoff_until.get(self.base_url, 0) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    
+    def _set_backoff(self, seconds: float):
+        """让同一接口的所有请求暂停 seconds 秒，已有更晚的恢复时刻时保持不变"""
+        until = time.monotonic() + seconds
+        with self._backoff_lock:
+            if until > self._backoff_until.get(self.base_url, 0):
+                self._backoff_until[self.base_url] = until
+    
+    @staticmethod
+    def _parse_retry_after(response) -> Optional[float]:
+        """读取响应头 Retry-After 中的秒数，缺失或为日期格式时返回 None"""
+        try:
+            return max(0.0, float(response.headers.get('Retry-After')))
+        except (TypeError, ValueError):
+            return None
+    
+    def _response_cache_path(self, messages: List[Dict], system_prompt: str) -> Optional[str]:
+        """请求对应的响应缓存文件路径，由接口地址、模型参数和完整提示词的哈希决定"""
+        if not self.response_cache_dir:
+            return None
+        request_key = json.dumps({
+            'url': self.base_url,
+            'model': self.model,
+            'max_tokens': self.max_tokens,
+            'temperature': self.temperature,
+            'system': system_prompt,
+            'messages': messages
+        }, sort_keys=True, ensure_ascii=False)
+        cache_key = hashlib.blake2b(request_key.encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.response_cache_dir, f"{cache_key}.json")
+    
+    def _prune_response_cache(self):
+        """删除缓存目录中已过期的响应文件（按修改时间判断），避免缓存目录无限增长"""
+        expire_before = time.time() - self.response_cache_ttl
+        try:
+            with os.scandir(self.response_cache_dir) as entries:
+                for entry in entries:
+                    try:
+                        if entry.name.endswith('.json') and entry.stat().st_mtime < expire_before:
+                            os.remove(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    
+    def _load_cached_response(self, cache_path: Optional[str]) -> Optional[str]:
+        """读取未过期的缓存响应，没有缓存、缓存已过期或要求刷新缓存时返回 None"""
+        if cache_path is None or self.refresh_cache:
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - cached.get('created_at', 0) > self.response_cache_ttl:
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+            return None
+        return cached.get('response')
+    
+    def _save_cached_response(self, cache_path: Optional[str], response: str):
+        """保存响应到缓存，写入失败时忽略"""
+        if cache_path is None:
+            return
+        try:
+            os.makedirs(self.response_cache_dir, exist_ok=True)
+            # 多个线程可能同时写同一请求的缓存，各自写独立的临时文件再替换
+            tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'created_at': time.time(), 'response': response}, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    
     def call_api(self, messages: List[Dict], system_prompt: str = "") -> str:
+        """调用AI API进行文本生成，相同请求优先使用磁盘缓存的响应"""
+        cache_path = self._response_cache_path(messages, system_prompt)
+        cached = self._load_cached_response(cache_path)
+        if cached is not None:
+            return cached
+        
+        response = self._call_api_uncached(messages, system_prompt)
+        self._save_cached_response(cache_path, response)
+        return response
+    
+    def _build_claude_request(self, messages: List[Dict], system_prompt: str) -> Tuple[str, Dict]:
+        """构建 Claude API 的请求地址和请求数据"""
+        data = {
+            'model': self.model,
+            'max_tokens': self.max_tokens,
+            'temperature': self.temperature,
+            'messages': messages
+        }
+        if system_prompt:
+            if self.enable_prompt_cache:
+                data['system'] = [{
+                    'type': 'text',
+                    'text': system_prompt,
+                    'cache_control': {'type': 'ephemeral'}
+                }]
+            else:
+                data['system'] = system_prompt
+        
+        return f"{self.base_url}/messages", data
+    
+    def _build_openai_request(self, messages: List[Dict], system_prompt: str) -> Tuple[str, Dict]:
+        """构建 OpenAI 风格 API 的请求地址和请求数据"""
+        # 构建消息列表；系统提示词固定放在最前，便于服务端自动命中前缀缓存
+        api_messages = []
+        if system_prompt:
+            api_messages.append({"role": "system", "content": system_prompt})
+        api_messages.extend(messages)
+        
+        data = {
+            'model': self.model,
+            'messages': api_messages,
+            'max_tokens': self.max_tokens,
+            'temperature': self.temperature
+        }
+        
+        return f"{self.base_url}/chat/completions", data
+    
+    @staticmethod
+    def _parse_claude_response(result: Dict) -> str:
+        """取出 Claude API 响应中的生成文本"""
+        return result['content'][0]['text']
+    
+    @staticmethod
+    def _parse_openai_response(result: Dict) -> str:
+        """取出 OpenAI 风格 API 响应中的生成文本"""
+        return result['choices'][0]['message']['content']
+    
+    def _call_api_uncached(self, messages: List[Dict], system_prompt: str = "") -> str:
         """调用AI API进行文本生成，包含重试机制"""
         last_error = None
+        # 请求内容在各次重试间不变，只构建和编码一次
+        url, data = self._build_request(messages, system_prompt)
+        body = _encode_request_body(data)
         
         for attempt in range(1, self.max_attempts + 1):
             try:
-                headers = {
-                    'Content-Type': 'application/json'
-                }
-                
-                # 根据不同API设置认证头
-                if self._is_anthropic_api():
-                    headers['x-api-key'] = self.api_key
-                    headers['anthropic-version'] = '2023-06-01'
-                    
-                    # Claude API格式
-                    data = {
-                        'model': self.model,
-                        'max_tokens': self.max_tokens,
-                        'temperature': self.temperature,
-                        'messages': messages
-                    }
-                    if system_prompt:
-                        data['system'] = system_prompt
-                    
-                    url = f"{self.base_url}/messages"
-                else:
-                    # OpenAI API格式
-                    headers['Authorization'] = f'Bearer {self.api_key}'
-                    
-                    # 构建消息列表
-                    api_messages = []
-                    if system_prompt:
-                        api_messages.append({"role": "system", "content": system_prompt})
-                    api_messages.extend(messages)
-                    
-                    data = {
-                        'model': self.model,
-                        'messages': api_messages,
-                        'max_tokens': self.max_tokens,
-                        'temperature': self.temperature
-                    }
-                    
-                    url = f"{self.base_url}/chat/completions"
-                
-                response = requests.post(url, headers=headers, json=data, timeout=self.timeout_seconds)
+                self._wait_for_backoff()
+                response = self._session.post(url, headers=self._headers, data=body,
+                                              timeout=(self.connect_timeout_seconds, self.timeout_seconds))
                 response.raise_for_status()
                 
-                result = response.json()
-                
-                # 解析不同API的响应格式
-                if self._is_anthropic_api():
-                    return result['content'][0]['text']
-                else:
-                    return result['choices'][0]['message']['content']
+                return self._parse_response(_decode_response_body(response.content))
                     
             except requests.exceptions.Timeout as e:
                 last_error = f"请求超时 (第{attempt}次尝试): {str(e)}"
@@ -111,6 +357,8 @@ class AIModelClient:
                 if hasattr(e, 'response') and e.response is not None:
                     if e.response.status_code == 429:  # 速率限制
                         last_error = f"API速率限制 (第{attempt}次尝试): {str(e)}"
+                        retry_after = self._parse_retry_after(e.response)
+                        self._set_backoff(retry_after if retry_after is not None else self._calculate_delay(attempt))
                     elif e.response.status_code >= 500:  # 服务器错误
                         last_error = f"服务器错误 (第{attempt}次尝试): {str(e)}"
                     else:
@@ -128,7 +376,8 @@ class AIModelClient:
             # 如果不是最后一次尝试，则等待后重试
             if attempt < self.max_attempts:
                 delay = self._calculate_delay(attempt)
-                st.info(f"第{attempt}次尝试失败，{delay:.1f}秒后重试... ({last_error})")
+                # 分段总结在线程池中调用，没有 Streamlit 运行上下文，重试信息写入日志而不是界面
+                logger.warning("第%d次尝试失败，%.1f秒后重试... (%s)", attempt, delay, last_error)
                 time.sleep(delay)
         
         # 所有重试都失败了
@@ -138,6 +387,8 @@ class AIModelClient:
 class TextSegmenter:
     """智能文本分段器，基于主题进行分段"""
     
+    BATCH_ITEM_OVERHEAD = 16  # 批量请求中每段附加的标题（### 第X段）及分隔符长度
+    
     def __init__(self, min_length: int = 300, max_length: int = 1500, overlap_ratio: float = 0.1):
         self.min_length = min_length
         self.max_length = max_length
@@ -146,18 +397,20 @@ class TextSegmenter:
     def segment_by_topic(self, text: str) -> List[Dict]:
         """基于主题智能分段"""
         # 首先按段落分割
-        paragraphs = [p.strip() for p in text.split('\n') if p.strip()]
+        paragraphs = [p for p in (line.strip() for line in text.splitlines()) if p]
         
         segments = []
-        current_segment = ""
-        current_length = 0
+        # 当前分段的段落缓冲区及其以换行连接后的长度，只在生成分段时才拼接字符串
+        buffer = []
+        buffer_length = 0
         segment_start_time = None
         
         for i, paragraph in enumerate(paragraphs):
-            # 检测时间戳（用于播客转录）
-            time_match = re.search(r'\[(\d{1,2}):(\d{2}):(\d{2})\]', paragraph)
-            if time_match and not segment_start_time:
-                segment_start_time = f"{time_match.group(1)}:{time_match.group(2)}:{time_match.group(3)}"
+            # 检测时间戳（用于播客转录），当前分段已有起始时间时不再扫描
+            if not segment_start_time:
+                time_match = TIMESTAMP_PATTERN.search(paragraph)
+                if time_match:
+                    segment_start_time = f"{time_match.group(1)}:{time_match.group(2)}:{time_match.group(3)}"
             
             paragraph_length = len(paragraph)
             
@@ -168,17 +421,17 @@ class TextSegmenter:
             # 1. 达到最大长度
             # 2. 检测到主题转换且已达到最小长度
             # 3. 是最后一个段落
+            is_last = i == len(paragraphs) - 1
             should_split = (
-                current_length + paragraph_length > self.max_length or
-                (is_topic_change and current_length >= self.min_length) or
-                i == len(paragraphs) - 1
+                buffer_length + paragraph_length > self.max_length or
+                (is_topic_change and buffer_length >= self.min_length) or
+                is_last
             )
             
-            if should_split and current_segment:
+            if should_split and buffer:
                 # 添加当前段落到分段中
-                if i < len(paragraphs) - 1:  # 不是最后一个段落
-                    current_segment += "\n" + paragraph
-                
+                buffer.append(paragraph)
+                current_segment = "\n".join(buffer)
                 segments.append({
                     'content': current_segment.strip(),
                     'start_time': segment_start_time,
@@ -186,27 +439,21 @@ class TextSegmenter:
                     'index': len(segments) + 1
                 })
                 
-                # 重置并开始新分段
-                if i < len(paragraphs) - 1:  # 不是最后一个段落
+                # 重置并开始新分段，保留上一分段末尾的一部分作为重叠上下文
+                if not is_last:
                     overlap_length = int(len(current_segment) * self.overlap_ratio)
-                    current_segment = current_segment[-overlap_length:] + "\n" + paragraph
-                    current_length = len(current_segment)
+                    overlap = current_segment[-overlap_length:]
+                    buffer = [overlap, paragraph]
+                    buffer_length = len(overlap) + 1 + paragraph_length
                     segment_start_time = None
-                else:
-                    # 最后一个段落，添加到当前段落
-                    current_segment += "\n" + paragraph
-                    segments[-1]['content'] = current_segment.strip()
-                    segments[-1]['length'] = len(current_segment)
             else:
                 # 继续添加到当前分段
-                if current_segment:
-                    current_segment += "\n" + paragraph
-                else:
-                    current_segment = paragraph
-                current_length = len(current_segment)
+                buffer_length += paragraph_length + 1 if buffer else paragraph_length
+                buffer.append(paragraph)
         
         # 处理剩余内容
-        if current_segment and not segments:
+        if buffer and not segments:
+            current_segment = "\n".join(buffer)
             segments.append({
                 'content': current_segment.strip(),
                 'start_time': segment_start_time,
@@ -216,38 +463,48 @@ class TextSegmenter:
         
         return segments
     
+    def pack_for_batch(self, segments: List[Dict], context_limit_chars: int) -> List[List[Dict]]:
+        """将连续的分段贪心地打包成批，每批内容（含每段标题）总长度不超过 context_limit_chars
+        
+        超过上限的单个分段单独成批；context_limit_chars 不大于 0 时每段各自成批。
+        """
+        if context_limit_chars <= 0:
+            return [[segment] for segment in segments]
+        
+        batches = []
+        current_batch = []
+        current_length = 0
+        for segment in segments:
+            item_length = len(segment['content']) + self.BATCH_ITEM_OVERHEAD
+            if current_batch and current_length + item_length > context_limit_chars:
+                batches.append(current_batch)
+                current_batch = []
+                current_length = 0
+            current_batch.append(segment)
+            current_length += item_length
+        if current_batch:
+            batches.append(current_batch)
+        return batches
+    
     def _detect_topic_change(self, paragraph: str) -> bool:
-        """检测主题转换的简单规则"""
-        # 主题转换指示词
-        topic_indicators = [
-            '接下来', '然后', '另外', '此外', '换个话题', '说到', 
-            '谈到', '关于', '我们再来看', '下面', '现在', '最后',
-            '总结', '总的来说', '综上'
-        ]
-        
-        # 问答模式检测
-        qa_patterns = [
-            r'^[问题|提问|主持人|嘉宾][:：]',
-            r'^Q[:：]',
-            r'^A[:：]',
-            r'那么.*问题是',
-            r'你觉得.*吗[？?]',
-            r'怎么.*看.*[？?]'
-        ]
-        
-        paragraph_lower = paragraph.lower()
-        
-        # 检查主题指示词
-        for indicator in topic_indicators:
-            if indicator in paragraph_lower:
-                return True
-        
-        # 检查问答模式
-        for pattern in qa_patterns:
-            if re.search(pattern, paragraph):
-                return True
-        
-        return False
+        """检测主题转换的简单规则：命中主题指示词或问答模式即返回"""
+        # 主题指示词和问答模式各合并为一个正则，一次扫描；指示词均为中文，无需转小写
+        return bool(TOPIC_INDICATOR_PATTERN.search(paragraph) or QA_PATTERN.search(paragraph))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_yaml(path: str, mtime: float) -> Dict:
+    """解析 YAML 配置文件，按 (路径, 修改时间) 缓存；优先使用 libyaml 实现的 CSafeLoader"""
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=loader)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_prompt(path: str, mtime: float) -> str:
+    """读取提示词模板文件，按 (路径, 修改时间) 缓存"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
 
 
 class PodcastSummarizer:
@@ -286,8 +543,8 @@ class PodcastSummarizer:
     def _load_config(self, config_path: str) -> Dict:
         """加载配置文件"""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+            # 返回副本，避免修改配置影响缓存中的解析结果
+            return copy.deepcopy(_load_yaml(config_path, os.path.getmtime(config_path)))
         except FileNotFoundError:
             st.error(f"配置文件 {config_path} 不存在，请先创建配置文件")
             return {}
@@ -303,15 +560,15 @@ class PodcastSummarizer:
                 models[key] = model_config['name']
         return models
     
-    def list_incomplete_tasks(self) -> List[TaskProgress]:
-        """获取未完成的任务列表"""
-        return self.progress_manager.list_incomplete_tasks()
+    def list_incomplete_tasks(self, limit: Optional[int] = None) -> List[TaskProgress]:
+        """获取未完成的任务列表，指定 limit 时只返回最近更新的 limit 个"""
+        return self.progress_manager.list_incomplete_tasks(limit=limit)
     
     def create_new_task(self, media_title: str, model_key: str) -> TaskProgress:
         """创建新的总结任务"""
         task_id = self.progress_manager.generate_task_id(media_title)
         task = TaskProgress(task_id, media_title, model_key)
-        self.progress_manager.save_task(task)
+        self.progress_manager.save_task(task, force=True)
         return task
     
     def resume_task(self, task_id: str) -> Optional[TaskProgress]:
@@ -400,7 +657,7 @@ class PodcastSummarizer:
                 
                 task.add_completed_segment(segment_data)
                 # 从失败列表中移除
-                task.failed_segments.remove(failed_segment)
+                task.remove_failed_segment(segment_index)
                 self.progress_manager.save_task(task)
                 
                 if progress_callback:
@@ -416,8 +673,12 @@ class PodcastSummarizer:
                 if progress_callback:
                     progress_callback(0.8, f"第 {segment_index} 段重试失败: {str(e)}")
 
-    def summarize_transcript(self, text: str, model_key: str, progress_callback=None, task: TaskProgress = None) -> Dict:
-        """对转录文本进行总结，支持断点续传"""
+    def summarize_transcript(self, text: str, model_key: str, progress_callback=None, task: TaskProgress = None,
+                             refresh_cache: bool = False) -> Dict:
+        """对转录文本进行总结，支持断点续传
+
+        refresh_cache 为 True 时不使用已缓存的AI响应，重新调用模型生成。
+        """
         if not self.config:
             raise Exception("配置文件加载失败")
         
@@ -428,7 +689,7 @@ class PodcastSummarizer:
         if not model_config.get('api_key'):
             raise Exception(f"模型 {model_key} 的API密钥未配置")
         
-        client = AIModelClient(model_config, self.retry_config)
+        client = AIModelClient(model_config, self.retry_config, refresh_cache=refresh_cache)
         
         # 如果没有传入任务，创建新任务
         if task is None:
@@ -445,7 +706,7 @@ class PodcastSummarizer:
                 segments = self.segmenter.segment_by_topic(text)
                 task.total_segments = len(segments)
                 task.status = "segments_in_progress"
-                self.progress_manager.save_task(task)
+                self.progress_manager.save_task(task, force=True)
             else:
                 # 重新分段（用于恢复任务）
                 segments = self.segmenter.segment_by_topic(text)
@@ -453,57 +714,46 @@ class PodcastSummarizer:
             # 2. 分段总结（支持断点续传）
             remaining_segments = self.progress_manager.get_next_segments_to_process(task, segments)
             total_segments = len(segments)
-            completed_count = len(task.completed_segments)
             
             if progress_callback:
                 progress_callback(0.1, f"准备处理剩余 {len(remaining_segments)} 个分段...")
             
-            for i, segment in enumerate(remaining_segments):
-                try:
-                    if progress_callback:
-                        current_progress = 0.1 + ((completed_count + i) / total_segments) * 0.7  # 10%-80%用于分段总结
-                        progress_callback(current_progress, f"正在总结第 {segment['index']}/{total_segments} 段...")
-                    
-                    # 总结单个分段
-                    summary = self._summarize_segment(client, segment['content'], segment['index'])
-                    keywords = []
-                    
-                    # 提取关键词（如果启用）
-                    if self.config['summarization']['summary']['include_keywords']:
-                        try:
-                            keywords = self._extract_keywords(client, segment['content'])
-                        except Exception as e:
-                            st.warning(f"第{segment['index']}段关键词提取失败: {str(e)}")
-                    
-                    # 保存分段结果
-                    segment_data = {
-                        'index': segment['index'],
-                        'start_time': segment.get('start_time'),
-                        'original_length': segment['length'],
-                        'summary': summary,
-                        'keywords': keywords
-                    }
-                    
-                    task.add_completed_segment(segment_data)
-                    self.progress_manager.save_task(task)  # 立即保存进度
-                    
-                    if progress_callback:
-                        completed_percentage = len(task.completed_segments) / total_segments * 100
-                        progress_callback(current_progress, f"第 {segment['index']} 段完成 ({completed_percentage:.1f}%)")
-                
-                except Exception as e:
-                    error_msg = str(e)
-                    st.error(f"第{segment['index']}段总结失败: {error_msg}")
-                    task.add_failed_segment(segment['index'], error_msg)
-                    self.progress_manager.save_task(task)
-                    
-                    # 继续处理下一个分段，不中断整个流程
-                    continue
+            # 各分段的 API 调用互不依赖，用线程池并发请求；结果在当前线程中按完成顺序记录和保存，
+            # 界面提示和进度回调也只在当前线程中调用
+            # 较短的连续分段打包成一批，用一次请求总结，减少请求次数
+            batch_max_chars = self.config['summarization']['summary'].get('batch_max_chars', 4000)
+            batches = self.segmenter.pack_for_batch(remaining_segments, batch_max_chars)
+            max_concurrency = max(1, self.retry_config.get('max_concurrency', 4))
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                futures = [executor.submit(self._process_batch, client, batch) for batch in batches]
+                for future in as_completed(futures):
+                    for segment, segment_data, error_msg, keyword_error in future.result():
+                        if segment_data is None:
+                            st.error(f"第{segment['index']}段总结失败: {error_msg}")
+                            task.add_failed_segment(segment['index'], error_msg)
+                            self.progress_manager.save_task(task)
+                            
+                            # 继续处理其他分段，不中断整个流程
+                            continue
+                        
+                        if keyword_error:
+                            st.warning(f"第{segment['index']}段关键词提取失败: {keyword_error}")
+                        
+                        task.add_completed_segment(segment_data)
+                        self.progress_manager.save_task(task)  # 立即保存进度
+                        
+                        if progress_callback:
+                            completed_fraction = len(task.completed_segments) / total_segments
+                            current_progress = 0.1 + completed_fraction * 0.7  # 10%-80%用于分段总结
+                            progress_callback(current_progress, f"第 {segment['index']} 段完成 ({completed_fraction * 100:.1f}%)")
             
             # 3. 重试失败的分段
             if task.failed_segments:
                 self._retry_failed_segments(client, task, progress_callback)
             
+            # 并发完成的分段按完成先后记录，恢复为原文顺序
+            task.completed_segments.sort(key=lambda s: s['index'])
+            
             # 4. 检查分段总结是否完成
             all_segments_completed = len(task.completed_segments) == total_segments
             if not all_segments_completed:
@@ -520,7 +770,7 @@ class PodcastSummarizer:
                     if progress_callback:
                         progress_callback(0.8, f"分段总结完成: {completed_count}/{total_segments}")
                 
-                self.progress_manager.save_task(task)
+                self.progress_manager.save_task(task, force=True)
                 
                 # 返回部分结果
                 return self._create_partial_result(task, text)
@@ -531,13 +781,13 @@ class PodcastSummarizer:
                     if progress_callback:
                         progress_callback(0.85, "正在生成总体总结...")
                     
-                    task.overall_summary = self._generate_overall_summary(client, task.completed_segments, text)
-                    self.progress_manager.save_task(task)
+                    task.overall_summary = self._generate_overall_summary(client, task.completed_segments)
+                    self.progress_manager.save_task(task, force=True)
                     
                 except Exception as e:
                     st.error(f"总体总结失败: {str(e)}")
                     task.status = "segments_completed"  # 分段完成但总体总结失败
-                    self.progress_manager.save_task(task)
+                    self.progress_manager.save_task(task, force=True)
                     return self._create_partial_result(task, text)
             
             # 6. 主题分析（如果启用且还没完成）
@@ -547,16 +797,16 @@ class PodcastSummarizer:
                         progress_callback(0.95, "正在进行主题分析...")
                     
                     task.topics = self._analyze_topics(client, text)
-                    self.progress_manager.save_task(task)
+                    self.progress_manager.save_task(task, force=True)
                     
                 except Exception as e:
                     st.warning(f"主题分析失败: {str(e)}")
                     task.topics = []  # 设置为空列表表示已尝试过
-                    self.progress_manager.save_task(task)
+                    self.progress_manager.save_task(task, force=True)
             
             # 7. 完成任务
             task.status = "overall_completed"
-            self.progress_manager.save_task(task)
+            self.progress_manager.save_task(task, force=True)
             
             if progress_callback:
                 progress_callback(1.0, "总结完成！")
@@ -567,8 +817,10 @@ class PodcastSummarizer:
             # 保存错误信息
             task.error_info = str(e)
             task.status = "failed"
-            self.progress_manager.save_task(task)
+            self.progress_manager.save_task(task, force=True)
             raise e
+        finally:
+            client.close()
     
     def _create_partial_result(self, task: TaskProgress, original_text: str) -> Dict:
         """创建部分结果（用于分段总结完成但总体总结未完成的情况）"""
@@ -582,7 +834,7 @@ class PodcastSummarizer:
                 'failed_segments_count': len(task.failed_segments),
                 'original_length': len(original_text),
                 'model_used': self.config['ai_models'][task.model_key]['name'],
-                'generated_at': task.updated_at,
+                'generated_at': datetime.fromtimestamp(task.updated_at).isoformat(),
                 'task_id': task.task_id,
                 'progress_percentage': task.get_progress_percentage(),
                 'status': task.status,
@@ -602,7 +854,7 @@ class PodcastSummarizer:
                 'failed_segments_count': len(task.failed_segments),
                 'original_length': len(original_text),
                 'model_used': self.config['ai_models'][task.model_key]['name'],
-                'generated_at': task.updated_at,
+                'generated_at': datetime.fromtimestamp(task.updated_at).isoformat(),
                 'task_id': task.task_id,
                 'progress_percentage': 100.0,
                 'status': task.status,
@@ -610,69 +862,168 @@ class PodcastSummarizer:
             }
         }
     
+    def _process_segment(self, client: AIModelClient, segment: Dict) -> Tuple[Dict, Optional[str]]:
+        """总结单个分段并提取关键词（在线程池中运行，不调用 Streamlit 界面函数）
+        
+        返回 (分段结果, 关键词提取的错误信息)；分段总结失败时直接抛出异常。
+        """
+        summary = self._summarize_segment(client, segment['content'], segment['index'])
+        keywords = []
+        keyword_error = None
+        
+        # 提取关键词（如果启用）
+        if self.config['summarization']['summary']['include_keywords']:
+            try:
+                keywords = self._extract_keywords(client, segment['content'])
+            except Exception as e:
+                keyword_error = str(e)
+        
+        segment_data = {
+            'index': segment['index'],
+            'start_time': segment.get('start_time'),
+            'original_length': segment['length'],
+            'summary': summary,
+            'keywords': keywords
+        }
+        return segment_data, keyword_error
+    
+    def _process_batch(self, client: AIModelClient, batch: List[Dict]) -> List[Tuple[Dict, Optional[Dict], Optional[str], Optional[str]]]:
+        """总结一批分段（在线程池中运行，不调用 Streamlit 界面函数）
+        
+        多段时先用一次请求批量总结、一次请求批量提取关键词，批量结果中缺失的分段退回单段调用。
+        返回 [(分段, 分段结果, 总结失败的错误信息, 关键词提取的错误信息)]，总结失败时分段结果为 None。
+        """
+        include_keywords = self.config['summarization']['summary']['include_keywords']
+        summaries = {}
+        keywords_map = {}
+        if len(batch) > 1:
+            try:
+                summaries = self._summarize_batch(client, batch)
+            except Exception:
+                summaries = {}  # 批量请求失败时逐段重新请求
+            if include_keywords and summaries:
+                keywords_map = self._extract_keywords_batch(client, batch)
+        
+        results = []
+        for segment in batch:
+            if segment['index'] not in summaries:
+                try:
+                    segment_data, keyword_error = self._process_segment(client, segment)
+                    results.append((segment, segment_data, None, keyword_error))
+                except Exception as e:
+                    results.append((segment, None, str(e), None))
+                continue
+            
+            keywords = keywords_map.get(segment['index'])
+            keyword_error = None
+            if include_keywords and keywords is None:
+                try:
+                    keywords = self._extract_keywords(client, segment['content'])
+                except Exception as e:
+                    keyword_error = str(e)
+            segment_data = {
+                'index': segment['index'],
+                'start_time': segment.get('start_time'),
+                'original_length': segment['length'],
+                'summary': summaries[segment['index']],
+                'keywords': keywords or []
+            }
+            results.append((segment, segment_data, None, keyword_error))
+        return results
+    
+    @staticmethod
+    def _format_batch_content(batch: List[Dict]) -> str:
+        """将一批分段拼接为带 ### 第X段 标题的文本"""
+        return "\n\n".join(f"### 第{segment['index']}段\n{segment['content']}" for segment in batch)
+    
+    @staticmethod
+    def _parse_batch_response(response: str, batch: List[Dict]) -> Dict[int, str]:
+        """按 ### 第X段 标题拆分批量请求的响应，返回 {分段索引: 内容}，只保留本批中的非空结果"""
+        expected = {segment['index'] for segment in batch}
+        matches = list(BATCH_SECTION_PATTERN.finditer(response))
+        sections = {}
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+            index = int(match.group(1))
+            content = response[match.end():end].strip()
+            if index in expected and content:
+                sections[index] = content
+        return sections
+    
+    def _summarize_batch(self, client: AIModelClient, batch: List[Dict]) -> Dict[int, str]:
+        """用一次请求分别总结多个分段，返回 {分段索引: 总结}"""
+        messages = [{
+            "role": "user",
+            "content": f"请分别总结以下{len(batch)}段播客片段，按`### 第X段`格式输出：\n\n{self._format_batch_content(batch)}"
+        }]
+        
+        return self._parse_batch_response(client.call_api(messages, BATCH_SUMMARY_PROMPT), batch)
+    
+    def _extract_keywords_batch(self, client: AIModelClient, batch: List[Dict]) -> Dict[int, List[str]]:
+        """用一次请求分别提取多个分段的关键词，返回 {分段索引: 关键词列表}，失败时返回空字典"""
+        messages = [{
+            "role": "user",
+            "content": f"请分别从以下{len(batch)}段文本中提取关键词，按`### 第X段`格式输出：\n\n{self._format_batch_content(batch)}"
+        }]
+        
+        try:
+            sections = self._parse_batch_response(client.call_api(messages, BATCH_KEYWORDS_PROMPT), batch)
+        except Exception:
+            return {}
+        return {index: [kw.strip() for kw in text.split(',') if kw.strip()] for index, text in sections.items()}
+    
     def _summarize_segment(self, client: AIModelClient, content: str, segment_index: int) -> str:
         """总结单个分段"""
-        system_prompt = """你是一个专业的文本总结专家。请对给定的播客转录片段进行简洁总结。
-要求：
-1. 用1-2句话概括主要内容
-2. 保留关键信息和观点
-3. 语言简洁明了
-4. 保持中文输出"""
-        
         messages = [{
             "role": "user",
             "content": f"请总结以下播客片段（第{segment_index}段）：\n\n{content}"
         }]
         
-        return client.call_api(messages, system_prompt)
+        return client.call_api(messages, SEGMENT_SUMMARY_PROMPT)
     
     def _extract_keywords(self, client: AIModelClient, content: str) -> List[str]:
         """提取关键词"""
-        system_prompt = """你是一个关键词提取专家。请从给定文本中提取3-5个最重要的关键词。
-要求：
-1. 只输出关键词，用逗号分隔
-2. 关键词应该是名词或专业术语
-3. 按重要性排序"""
-        
         messages = [{
             "role": "user",
             "content": f"请从以下文本中提取关键词：\n\n{content}"
         }]
         
         try:
-            result = client.call_api(messages, system_prompt)
+            result = client.call_api(messages, KEYWORDS_PROMPT)
             return [kw.strip() for kw in result.split(',') if kw.strip()]
         except:
             return []
     
-    def _generate_overall_summary(self, client: AIModelClient, segment_summaries: List[Dict], original_text: str) -> str:
+    def _generate_overall_summary(self, client: AIModelClient, segment_summaries: List[Dict]) -> str:
         """生成总体总结"""
-        summaries_text = "\n".join([f"{i+1}. {summary['summary']}" for i, summary in enumerate(segment_summaries)])
-        
-        system_prompt = """你是一个专业的内容总结专家。基于各个分段的总结，生成一个整体的综合总结。
-要求：
-1. 200-300字的总结
-2. 概括全文的主要主题和观点
-3. 保持逻辑清晰，结构完整
-4. 突出最重要的见解和结论
-5. 使用中文输出"""
+        lines = [f"{i+1}. {summary['summary']}" for i, summary in enumerate(segment_summaries)]
+        max_chars = self.config['summarization']['summary'].get('overall_input_max_chars', 8000)
+        summaries_text = "\n".join(self._trim_summary_lines(lines, max_chars))
         
         messages = [{
             "role": "user",
             "content": f"基于以下分段总结，请生成一个整体总结：\n\n{summaries_text}"
         }]
         
-        return client.call_api(messages, system_prompt)
+        return client.call_api(messages, OVERALL_SUMMARY_PROMPT)
+    
+    @staticmethod
+    def _trim_summary_lines(lines: List[str], max_chars: int) -> List[str]:
+        """分段总结总字数超过 max_chars 时只保留最长的若干条（通常信息量最大），按原顺序返回；max_chars 为 0 时不截断"""
+        if not max_chars or sum(len(line) + 1 for line in lines) <= max_chars:
+            return lines
+        
+        kept = []
+        total = 0
+        for i in sorted(range(len(lines)), key=lambda i: len(lines[i]), reverse=True):
+            if kept and total + len(lines[i]) + 1 > max_chars:
+                break
+            kept.append(i)
+            total += len(lines[i]) + 1
+        return [lines[i] for i in sorted(kept)]
     
     def _analyze_topics(self, client: AIModelClient, content: str) -> List[str]:
         """分析主要主题"""
-        system_prompt = """你是一个主题分析专家。请分析给定文本的主要主题。
-要求：
-1. 识别3-5个主要主题
-2. 每个主题用简短的词组表示
-3. 按重要性排序
-4. 只输出主题列表，用换行符分隔"""
-        
         # 为避免文本过长，取前2000字进行主题分析
         content_sample = content[:2000] if len(content) > 2000 else content
         
@@ -682,13 +1033,16 @@ class PodcastSummarizer:
         }]
         
         try:
-            result = client.call_api(messages, system_prompt)
+            result = client.call_api(messages, TOPICS_PROMPT)
             return [topic.strip() for topic in result.split('\n') if topic.strip()]
         except:
             return []
     
-    def deep_analysis(self, text: str, model_key: str) -> str:
-        """基于prompt.txt进行深度分析，支持分块处理"""
+    def deep_analysis(self, text: str, model_key: str, refresh_cache: bool = False) -> str:
+        """基于prompt.txt进行深度分析，支持分块处理
+
+        refresh_cache 为 True 时不使用已缓存的AI响应，重新调用模型生成。
+        """
         # 首先检查prompt.txt文件是否存在（优先级最高）
         prompt_file = "prompt.txt"  # 默认路径
         
@@ -712,8 +1066,7 @@ class PodcastSummarizer:
             raise Exception("深度分析功能在配置文件中被禁用，如需使用请在config.yaml中设置 advanced_features.deep_analysis.enabled: true")
         
         try:
-            with open(prompt_file, 'r', encoding='utf-8') as f:
-                custom_prompt = f.read()
+            custom_prompt = _read_prompt(prompt_file, os.path.getmtime(prompt_file))
         except Exception as e:
             raise Exception(f"读取深度分析模板文件失败：{str(e)}")
         
@@ -721,7 +1074,7 @@ class PodcastSummarizer:
             raise Exception("深度分析模板文件内容为空")
         
         model_config = self.config['ai_models'][model_key]
-        client = AIModelClient(model_config, self.retry_config)
+        client = AIModelClient(model_config, self.retry_config, refresh_cache=refresh_cache)
         
         # 检查是否启用分块处理
         enable_chunking = (self.config and 
@@ -770,7 +1123,7 @@ class PodcastSummarizer:
                         "content": f"请对以下播客内容片段进行分析，这是第{i+1}部分，共{len(chunks)}部分：\n\n【分析指导】\n{custom_prompt}\n\n【播客内容片段】\n{chunk}"
                     }]
                     
-                    chunk_result = client.call_api(messages, f"你是一个专业的内容分析专家。这是多段内容中的第{i+1}段，请按照指导原则进行分析。")
+                    chunk_result = client.call_api(messages, DEEP_ANALYSIS_CHUNK_PROMPT.format(index=i+1))
                     chunk_results.append(f"## 第{i+1}部分分析\n\n{chunk_result}")
                     
                 except Exception as e:
@@ -790,7 +1143,7 @@ class PodcastSummarizer:
                             "content": f"请基于以下各部分的分析，生成一篇完整统一的深度分析文章：\n\n{final_result}"
                         }]
                         
-                        overall_summary = client.call_api(summary_messages, "你是一个专业的内容整合专家，请将分段分析整合为一篇连贯的完整文章。")
+                        overall_summary = client.call_api(summary_messages, DEEP_ANALYSIS_MERGE_PROMPT)
                         return overall_summary
                         
                     except Exception as e:
@@ -807,22 +1160,24 @@ class PodcastSummarizer:
                 "content": f"请根据以下指导原则对播客内容进行深度分析：\n\n【分析指导】\n{custom_prompt}\n\n【播客内容】\n{text}"
             }]
             
-            return client.call_api(messages, "你是一个专业的内容分析专家，请严格按照给定的指导原则进行分析。")
+            return client.call_api(messages, DEEP_ANALYSIS_PROMPT)
     
     def export_summary(self, summary_data: Dict, format_type: str, filename: str) -> str:
         """导出总结到不同格式"""
         if format_type == "markdown":
             return self._export_to_markdown(summary_data, filename)
         elif format_type == "pdf":
-            return self._export_to_pdf(summary_data, filename)
+            return _PDF_POOL.submit(self._export_to_pdf, summary_data, filename).result()
         elif format_type == "txt":
             return self._export_to_txt(summary_data, filename)
         else:
             raise ValueError(f"不支持的导出格式: {format_type}")
     
     def _export_to_markdown(self, summary_data: Dict, filename: str) -> str:
-        """导出为Markdown格式"""
-        md_content = f"""# 播客总结报告
+        """导出为Markdown格式，边生成边写入文件"""
+        output_path = f"{filename}_summary.md"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(f"""# 播客总结报告
 
 ## 基本信息
 - **生成时间**: {summary_data['metadata']['generated_at']}
@@ -835,36 +1190,33 @@ class PodcastSummarizer:
 {summary_data['overall_summary']}
 
 ## 主要主题
-"""
-        
-        if summary_data['topics']:
-            for i, topic in enumerate(summary_data['topics'], 1):
-                md_content += f"{i}. {topic}\n"
-        else:
-            md_content += "暂无主题分析\n"
-        
-        md_content += "\n## 分段总结\n\n"
-        
-        for segment in summary_data['segments']:
-            md_content += f"### 第{segment['index']}段"
-            if segment['start_time']:
-                md_content += f" ({segment['start_time']})"
-            md_content += "\n\n"
-            md_content += f"{segment['summary']}\n\n"
+""")
             
-            if segment['keywords']:
-                md_content += f"**关键词**: {', '.join(segment['keywords'])}\n\n"
-        
-        # 保存文件
-        output_path = f"{filename}_summary.md"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+            if summary_data['topics']:
+                for i, topic in enumerate(summary_data['topics'], 1):
+                    f.write(f"{i}. {topic}\n")
+            else:
+                f.write("暂无主题分析\n")
+            
+            f.write("\n## 分段总结\n\n")
+            
+            for segment in summary_data['segments']:
+                f.write(f"### 第{segment['index']}段")
+                if segment['start_time']:
+                    f.write(f" ({segment['start_time']})")
+                f.write("\n\n")
+                f.write(f"{segment['summary']}\n\n")
+                
+                if segment['keywords']:
+                    f.write(f"**关键词**: {', '.join(segment['keywords'])}\n\n")
         
         return output_path
     
     def _export_to_txt(self, summary_data: Dict, filename: str) -> str:
-        """导出为纯文本格式"""
-        txt_content = f"""播客总结报告
+        """导出为纯文本格式，边生成边写入文件"""
+        output_path = f"{filename}_summary.txt"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(f"""播客总结报告
 
 基本信息：
 生成时间: {summary_data['metadata']['generated_at']}
@@ -876,31 +1228,26 @@ class PodcastSummarizer:
 {summary_data['overall_summary']}
 
 主要主题：
-"""
-        
-        if summary_data['topics']:
-            for i, topic in enumerate(summary_data['topics'], 1):
-                txt_content += f"{i}. {topic}\n"
-        else:
-            txt_content += "暂无主题分析\n"
-        
-        txt_content += "\n分段总结：\n\n"
-        
-        for segment in summary_data['segments']:
-            txt_content += f"第{segment['index']}段"
-            if segment['start_time']:
-                txt_content += f" ({segment['start_time']})"
-            txt_content += "：\n"
-            txt_content += f"{segment['summary']}\n"
+""")
             
-            if segment['keywords']:
-                txt_content += f"关键词: {', '.join(segment['keywords'])}\n"
-            txt_content += "\n"
-        
-        # 保存文件
-        output_path = f"{filename}_summary.txt"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(txt_content)
+            if summary_data['topics']:
+                for i, topic in enumerate(summary_data['topics'], 1):
+                    f.write(f"{i}. {topic}\n")
+            else:
+                f.write("暂无主题分析\n")
+            
+            f.write("\n分段总结：\n\n")
+            
+            for segment in summary_data['segments']:
+                f.write(f"第{segment['index']}段")
+                if segment['start_time']:
+                    f.write(f" ({segment['start_time']})")
+                f.write("：\n")
+                f.write(f"{segment['summary']}\n")
+                
+                if segment['keywords']:
+                    f.write(f"关键词: {', '.join(segment['keywords'])}\n")
+                f.write("\n")
         
         return output_path
     
@@ -947,7 +1294,7 @@ class PodcastSummarizer:
         if summary_data['topics']:
             topics_title = Paragraph("主要主题", styles['Heading2'])
             story.append(topics_title)
-            topics_text = "<br/>".join([f"{i}. {topic}" for i, topic in enumerate(summary_data['topics'], 1)])
+            topics_text = "<br/>".join(f"{i}. {topic}" for i, topic in enumerate(summary_data['topics'], 1))
             topics_content = Paragraph(topics_text, styles['Normal'])
             story.append(topics_content)
             story.append(Spacer(1, 12))
@@ -1,23 +1,25 @@
 import argparse
-from faster_whisper import WhisperModel
+import functools
+from faster_whisper import WhisperModel, BatchedInferencePipeline
 from fpdf import FPDF
 import os
-import glob
 import platform
 import re  # <-- 新增导入
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from datetime import timedelta
+
+# 文件名中 Windows 不允许的字符：< > : " | ? * \ /
+ILLEGAL_FILENAME_CHARS_PATTERN = re.compile(r'[<>:"|?*\\/]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
 
 
 def sanitize_filename(filename):
     """清理文件名，移除或替换不合法的字符"""
-    # Windows 不允许的字符：< > : " | ? * \ /
-    # 同时处理其他可能有问题的字符
-    illegal_chars = r'[<>:"|?*\\/]'
     # 替换为下划线
-    clean_name = re.sub(illegal_chars, '_', filename)
+    clean_name = ILLEGAL_FILENAME_CHARS_PATTERN.sub('_', filename)
     # 移除多余的空格和点
-    clean_name = re.sub(r'\s+', ' ', clean_name).strip()
+    clean_name = WHITESPACE_PATTERN.sub(' ', clean_name).strip()
     # 移除结尾的点（Windows不允许）
     clean_name = clean_name.rstrip('.')
     return clean_name
@@ -25,171 +27,339 @@ def sanitize_filename(filename):
 
 def format_timestamp(seconds):
     """将秒转换为 SRT 时间格式：HH:MM:SS,mmm"""
-    millisec = int((seconds - int(seconds)) * 1000)
-    return str(timedelta(seconds=int(seconds))) + f",{millisec:03d}"
+    hours, millisec = divmod(round(seconds * 1000), 3_600_000)
+    minutes, millisec = divmod(millisec, 60_000)
+    secs, millisec = divmod(millisec, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millisec:03d}"
+
+
+def write_segments(segments, output_file, output_format="txt"):
+    """边转录边将片段逐条写入文件，不在内存中拼接完整文本
+
+    output_format 为 srt 时写入 SRT 字幕，否则写入纯文本（每个片段一行）。
+    先写入同目录下的临时文件，完成后再重命名，避免中断时留下不完整的转录结果。
+    """
+    base, extension = os.path.splitext(output_file)
+    partial_file = f"{base}.partial{extension}"
+    with open(partial_file, "w", encoding="utf-8") as f:
+        for i, segment in enumerate(segments, start=1):
+            text = segment.text.strip()
+            if i > 1:
+                f.write("\n")  # 片段之间的分隔：srt 为空行，txt 为换行
+            if output_format == "srt":
+                start_time = format_timestamp(segment.start)
+                end_time = format_timestamp(segment.end)
+                f.write(f"{i}\n{start_time} --> {end_time}\n{text}\n")
+            else:
+                f.write(text)
+    os.replace(partial_file, output_file)
+
+
+@functools.lru_cache(maxsize=1)
+def find_chinese_fonts():
+    """查找系统中可用于 PDF 的中文字体，返回存在的 (字体名, 字体路径) 元组，按优先级排序
+
+    字体文件在进程运行期间基本不变，只在第一次生成 PDF 时扫描一次。
+    """
+    candidates = []
+
+    # 1. Windows 系统字体
+    if os.name == 'nt':
+        candidates = [
+            ("simhei", "C:/Windows/Fonts/simhei.ttf"),  # 黑体
+            ("simsun", "C:/Windows/Fonts/simsun.ttc"),  # 宋体
+            ("msyh", "C:/Windows/Fonts/msyh.ttf"),      # 微软雅黑
+            ("msyhbd", "C:/Windows/Fonts/msyhbd.ttf"),  # 微软雅黑粗体
+        ]
+
+    # 2. macOS 系统字体
+    elif platform.system() == 'Darwin':
+        candidates = [
+            ("pingfang", "/System/Library/Fonts/PingFang.ttc"),           # 苹方
+            ("pingfang_sc", "/System/Library/Fonts/Supplemental/Songti.ttc"), # 宋体
+            ("hiragino", "/System/Library/Fonts/Hiragino Sans GB.ttc"),  # 冬青黑体
+            ("stheiti", "/System/Library/Fonts/STHeiti Light.ttc"),      # 华文黑体
+            ("stsong", "/Library/Fonts/Songti.ttc"),                     # 华文宋体
+            ("arial_unicode", "/Library/Fonts/Arial Unicode.ttf"),       # Arial Unicode MS
+        ]
+
+        # 检查用户字体目录：一次遍历，按 chinese、song、hei 的优先级收集文件名中含这些关键词的 TTF 字体
+        user_font_dir = os.path.expanduser("~/Library/Fonts")
+        keywords = ("chinese", "song", "hei")
+        user_fonts = {keyword: [] for keyword in keywords}
+        try:
+            with os.scandir(user_font_dir) as entries:
+                for entry in entries:
+                    name = entry.name.lower()
+                    if not name.endswith(".ttf"):
+                        continue
+                    for keyword in keywords:
+                        if keyword in name:
+                            user_fonts[keyword].append(entry)
+                            break
+        except OSError:
+            pass
+        for keyword in keywords:
+            for entry in user_fonts[keyword]:
+                candidates.append((os.path.splitext(entry.name)[0].lower(), entry.path))
+
+    return tuple((font_name, font_path) for font_name, font_path in candidates if os.path.exists(font_path))
+
+
+def detect_device():
+    """检测可用于 faster-whisper 的设备：有 CTranslate2 可用的 CUDA GPU 时返回 cuda，否则返回 cpu
+
+    直接询问 CTranslate2 而不是 torch，结果与 faster-whisper 实际能使用的设备一致，也不必加载 torch。
+    CTranslate2 没有 MPS 后端，Apple Silicon 同样返回 cpu。
+    """
+    try:
+        import ctranslate2
+        if ctranslate2.get_cuda_device_count() > 0:
+            return "cuda"
+    except Exception as e:
+        print(f"检测 CUDA 设备失败，使用 CPU：{e}")
+    return "cpu"
+
 
+# 未指定计算类型时各设备的默认值：GPU 用 int8 权重 + float16 计算，CPU 用 int8
+DEFAULT_COMPUTE_TYPES = {"cuda": "int8_float16", "cpu": "int8"}
+COMPUTE_TYPE_CHOICES = ["int8", "int8_float16", "float16", "float32"]
 
-def generate_srt(segments):
-    """将转录片段转换为 SRT 格式"""
-    srt = []
-    for i, segment in enumerate(segments, start=1):
-        start_time = format_timestamp(segment.start)
-        end_time = format_timestamp(segment.end)
-        text = segment.text.strip()
-        srt.append(f"{i}\n{start_time} --> {end_time}\n{text}\n")
-    return "\n".join(srt)
 
+def resolve_device(device_option, compute_type=None):
+    """将设备选项解析为 faster-whisper 的 (device, device_index, compute_type)"""
+    # CTranslate2 没有 MPS 后端，Apple Silicon 回退到 CPU 运行
+    if device_option == "mps":
+        print("faster-whisper 不支持 MPS，自动回退使用 CPU")
+        device_option = "cpu"
 
-def generate_txt(segments):
-    """将转录片段转换为纯文本格式"""
-    return "\n".join(segment.text.strip() for segment in segments)
+    # 支持 cuda:N 形式指定具体的 GPU
+    device, _, device_index = device_option.partition(":")
+    device_index = int(device_index) if device_index else 0
+
+    if compute_type is None:
+        compute_type = DEFAULT_COMPUTE_TYPES.get(device, "int8")
+
+    return device, device_index, compute_type
+
+
+def default_cpu_threads():
+    """CPU 推理的线程数：保留一个核心给界面和音频解码，其余用于 CTranslate2 的并行矩阵运算"""
+    return max(1, (os.cpu_count() or 4) - 1)
+
+
+def load_model(model_size='base', device_option='cpu', compute_type=None, cpu_threads=None):
+    """加载 Whisper 模型
+
+    cpu_threads 为 CPU 推理使用的线程数，未指定时在 CPU 上使用 default_cpu_threads()，GPU 上使用 CTranslate2 的默认值。
+    """
+    device, device_index, compute_type = resolve_device(device_option, compute_type)
+    if cpu_threads is None:
+        cpu_threads = default_cpu_threads() if device == "cpu" else 0
+    model = WhisperModel(model_size, device=device, device_index=device_index, compute_type=compute_type,
+                         cpu_threads=cpu_threads)
+    print(f"Whisper {model_size} 模型已加载（device={device}:{device_index}, compute_type={compute_type}, cpu_threads={cpu_threads}）。")
+    return model
+
+
+def report_segment_progress(segments, total_duration, progress_callback):
+    """包装转录片段生成器，每产出一个片段就按音频位置报告进度"""
+    for segment in segments:
+        if total_duration:
+            progress_callback(min(segment.end / total_duration, 1.0), f"转录中... {format_timestamp(segment.end)}")
+        yield segment
+
+
+def save_transcript_pdf(txt_path):
+    """将 txt 转录文件另存为同名 PDF，返回 PDF 文件路径，生成失败时返回 None
+
+    长转录逐行排版较慢，调用方按需调用（例如命令行的 --pdf 或界面上的生成按钮）。
+    """
+    pdf_file_path = None
+    pdf_output_file = os.path.splitext(txt_path)[0] + ".pdf"
+    try:
+        pdf = FPDF()
+        pdf.add_page()
+        
+        # 依次尝试系统中可用的中文字体
+        font_loaded = False
+        for font_name, font_path in find_chinese_fonts():
+            try:
+                pdf.add_font(font_name, "", font_path)
+                pdf.set_font(font_name, size=12)
+                font_loaded = True
+                print(f"成功加载字体：{font_name} ({font_path})")
+                break
+            except Exception as e:
+                print(f"尝试加载字体 {font_name} 失败：{e}")
+                continue
+        
+        # 是否加载了可排版中文的 TTF 字体
+        unicode_font = font_loaded
+
+        # 备选方案（其他系统或字体加载失败）
+        if not font_loaded:
+            try:
+                pdf.set_font("Arial", size=12)
+                font_loaded = True
+                print("使用 Arial 字体（可能无法正确显示中文）")
+            except Exception:
+                pdf.set_font("helvetica", size=12)
+                font_loaded = True
+                print("使用 helvetica 字体（可能无法正确显示中文）")
+
+        with open(txt_path, "r", encoding="utf-8") as f:
+            if unicode_font:
+                # TTF 字体可排版任意字符：所有非空行合并为一次 multi_cell，省去逐行调用的排版开销
+                text = "\n".join(line.rstrip('\n') for line in f if line.strip())
+                pdf.multi_cell(0, 10, text=text, align='L')
+            else:
+                # 内置字体只支持 Latin-1，逐行写入，编码失败的行用替换字符
+                for line in f:
+                    line = line.rstrip('\n')
+                    if line.strip():  # 跳过空行
+                        try:
+                            pdf.multi_cell(0, 10, text=line, align='L')
+                        except UnicodeEncodeError:
+                            # 如果字符编码有问题，尝试用替换字符
+                            safe_line = line.encode('ascii', 'replace').decode('ascii')
+                            pdf.multi_cell(0, 10, text=f"[包含特殊字符] {safe_line}", align='L')
+                    pdf.ln(3)  # 添加行间距
 
+        pdf.output(pdf_output_file)
+        if os.path.exists(pdf_output_file):
+            pdf_file_path = pdf_output_file
+            print(f"转录文本已额外保存到 PDF 文件：{pdf_output_file}")
+            print(f"PDF 文件完整路径：{os.path.abspath(pdf_output_file)}")
+        else:
+            print(f"警告：PDF 文件可能因文件名特殊字符而保存失败：{pdf_output_file}")
+        
+    except Exception as e:
+        print(f"错误：无法生成 PDF 文件 {pdf_output_file}: {e}")
+        print("提示：txt 文件已正常生成，PDF 生成失败不影响主要功能。")
 
-def transcribe_audio(audio_path, output_file, output_format="txt", device_option='cpu', model_size='base'):
-    print(f"audio path: {audio_path}, output file: {output_file}, output format: {output_format}, device option: {device_option}, model: {model_size}")
+    return pdf_file_path
 
-    # 根据设备设置计算类型：GPU 使用 float16，其它使用 int8
-    compute_type = "float16" if device_option == "cuda" else "int8"
 
-    # 加载指定大小的模型
-    model = WhisperModel(model_size, device=device_option, compute_type=compute_type)
-    print(f"Whisper {model_size} 模型已加载。")
+def transcribe_audio(audio_path, output_file, output_format="txt", device_option='cpu', model_size='base',
+                     compute_type=None, batch_size=1, model=None, progress_callback=None, beam_size=1,
+                     cpu_threads=None, emit_pdf=False):
+    """转录音频并保存结果
+
+    model 为已加载的 WhisperModel 时直接复用（例如由调用方缓存），否则按参数加载模型。
+    beam_size 默认为 1（贪心解码），中文转录准确率与束搜索相差无几，解码速度快数倍。
+    progress_callback(progress, message) 用于报告转录进度（progress 为 0-1 的小数）。
+    emit_pdf 为 True 且输出格式为 txt 时额外生成 PDF，默认不生成，可之后再调用 save_transcript_pdf。
+    """
+    print(f"audio path: {audio_path}, output file: {output_file}, output format: {output_format}, device option: {device_option}, model: {model_size}, batch size: {batch_size}")
+
+    if model is None:
+        model = load_model(model_size, device_option, compute_type, cpu_threads)
 
     # 优化转录参数，特别是对中文的支持
-    segments, info = model.transcribe(
-        audio_path, 
-        beam_size=5,
+    transcribe_options = dict(
+        beam_size=beam_size,
         language="zh",  # 明确指定中文
         task="transcribe",
         temperature=0.0,  # 降低随机性
         compression_ratio_threshold=2.4,
         log_prob_threshold=-1.0,
         no_speech_threshold=0.6,
+        # 不以上一窗口的文本作为提示：减少解码的上下文长度，也避免一段出错后重复输出的连锁幻觉
+        condition_on_previous_text=False,
         vad_filter=True,  # 启用语音活动检测
-        vad_parameters=dict(min_silence_duration_ms=500)
+        # 语音片段两侧只保留 200ms 的静音（默认 400ms），送入编码器的非语音音频更少
+        vad_parameters=dict(min_silence_duration_ms=500, speech_pad_ms=200)
     )
+
+    if batch_size > 1:
+        # 批量推理：先按 VAD 切分语音片段，再将多个片段组成一批送入编码器
+        batched_model = BatchedInferencePipeline(model=model)
+        segments, info = batched_model.transcribe(audio_path, batch_size=batch_size, **transcribe_options)
+    else:
+        segments, info = model.transcribe(audio_path, **transcribe_options)
     print("音频转录完成。")
     print("检测到语言：%s (概率: %f)" % (info.language, info.language_probability))
 
-    # 根据输出格式生成内容
-    if output_format.lower() == "srt":
-        content = generate_srt(segments)
-    else:  # 默认为 txt 格式
-        content = generate_txt(segments)
+    if progress_callback:
+        segments = report_segment_progress(segments, info.duration, progress_callback)
 
     # 清理输出文件名
     clean_output_file = sanitize_filename(output_file)
     
-    # 将内容保存到文件
-    with open(clean_output_file, "w", encoding="utf-8") as f:
-        f.write(content)
+    # 按输出格式（srt，默认为 txt）边转录边保存到文件
+    write_segments(segments, clean_output_file, output_format.lower())
 
     print(f"转录文本已保存到文件：{clean_output_file}")
 
-    # 如果输出格式是 txt，额外生成 PDF
+    # 需要时额外将 txt 转录生成 PDF
     pdf_file_path = None
-    if output_format.lower() == "txt":
-        pdf_output_file = os.path.splitext(clean_output_file)[0] + ".pdf"
-        try:
-            pdf = FPDF()
-            pdf.add_page()
-            
-            # 改进的字体处理逻辑
-            font_loaded = False
-            
-            # 1. Windows 系统字体
-            if os.name == 'nt':  # Windows 系统
-                windows_fonts = [
-                    ("simhei", "C:/Windows/Fonts/simhei.ttf"),  # 黑体
-                    ("simsun", "C:/Windows/Fonts/simsun.ttc"),  # 宋体
-                    ("msyh", "C:/Windows/Fonts/msyh.ttf"),      # 微软雅黑
-                    ("msyhbd", "C:/Windows/Fonts/msyhbd.ttf"),  # 微软雅黑粗体
-                ]
-                for font_name, font_path in windows_fonts:
-                    if os.path.exists(font_path):
-                        try:
-                            pdf.add_font(font_name, "", font_path, uni=True)
-                            pdf.set_font(font_name, size=12)
-                            font_loaded = True
-                            print(f"成功加载字体：{font_name}")
-                            break
-                        except Exception as e:
-                            print(f"尝试加载字体 {font_name} 失败：{e}")
-                            continue
-            
-            # 2. macOS 系统字体
-            elif platform.system() == 'Darwin':  # macOS 系统
-                macos_fonts = [
-                    ("pingfang", "/System/Library/Fonts/PingFang.ttc"),           # 苹方
-                    ("pingfang_sc", "/System/Library/Fonts/Supplemental/Songti.ttc"), # 宋体
-                    ("hiragino", "/System/Library/Fonts/Hiragino Sans GB.ttc"),  # 冬青黑体
-                    ("stheiti", "/System/Library/Fonts/STHeiti Light.ttc"),      # 华文黑体
-                    ("stsong", "/Library/Fonts/Songti.ttc"),                     # 华文宋体
-                    ("arial_unicode", "/Library/Fonts/Arial Unicode.ttf"),       # Arial Unicode MS
-                ]
-                
-                # 检查用户字体目录
-                user_font_dir = os.path.expanduser("~/Library/Fonts")
-                if os.path.exists(user_font_dir):
-                    user_fonts = glob.glob(f"{user_font_dir}/*[Cc]hinese*.ttf") + \
-                                glob.glob(f"{user_font_dir}/*[Ss]ong*.ttf") + \
-                                glob.glob(f"{user_font_dir}/*[Hh]ei*.ttf")
-                    for user_font in user_fonts:
-                        font_name = os.path.splitext(os.path.basename(user_font))[0].lower()
-                        macos_fonts.append((font_name, user_font))
-                
-                for font_name, font_path in macos_fonts:
-                    if os.path.exists(font_path):
-                        try:
-                            pdf.add_font(font_name, "", font_path, uni=True)
-                            pdf.set_font(font_name, size=12)
-                            font_loaded = True
-                            print(f"成功加载字体：{font_name} ({font_path})")
-                            break
-                        except Exception as e:
-                            print(f"尝试加载字体 {font_name} 失败：{e}")
-                            continue
-            
-            # 3. 备选方案（其他系统或字体加载失败）
-            if not font_loaded:
-                try:
-                    pdf.set_font("Arial", size=12)
-                    font_loaded = True
-                    print("使用 Arial 字体（可能无法正确显示中文）")
-                except Exception:
-                    pdf.set_font("helvetica", size=12)
-                    font_loaded = True
-                    print("使用 helvetica 字体（可能无法正确显示中文）")
-
-            # 将文本写入 PDF，按行分割以支持换行
-            lines = content.split('\n')
-            for line in lines:
-                if line.strip():  # 跳过空行
-                    try:
-                        pdf.multi_cell(0, 10, txt=line, align='L')
-                    except UnicodeEncodeError:
-                        # 如果字符编码有问题，尝试用替换字符
-                        safe_line = line.encode('ascii', 'replace').decode('ascii')
-                        pdf.multi_cell(0, 10, txt=f"[包含特殊字符] {safe_line}", align='L')
-                pdf.ln(3)  # 添加行间距
-
-            pdf.output(pdf_output_file)
-            if os.path.exists(pdf_output_file):
-                pdf_file_path = pdf_output_file
-                print(f"转录文本已额外保存到 PDF 文件：{pdf_output_file}")
-                print(f"PDF 文件完整路径：{os.path.abspath(pdf_output_file)}")
-            else:
-                print(f"警告：PDF 文件可能因文件名特殊字符而保存失败：{pdf_output_file}")
-            
-        except Exception as e:
-            print(f"错误：无法生成 PDF 文件 {pdf_output_file}: {e}")
-            print("提示：txt 文件已正常生成，PDF 生成失败不影响主要功能。")
+    if emit_pdf and output_format.lower() == "txt":
+        pdf_file_path = save_transcript_pdf(clean_output_file)
 
     # 返回文件路径，供 Streamlit 使用
     return clean_output_file, pdf_file_path
 
 
-if __name__ == "__main__":
+def unique_output_files(output_files):
+    """为重名的输出文件名依次加上 _2、_3 等序号（按清理后的文件名比较，不区分大小写），返回新的列表
+
+    例如 a.mp3 和 a.wav 都对应 a.txt，并行转录时会同时写入同一个文件。
+    """
+    used = set()
+    unique_files = []
+    for output_file in output_files:
+        base, extension = os.path.splitext(sanitize_filename(output_file))
+        candidate, index = f"{base}{extension}", 1
+        while candidate.lower() in used:
+            index += 1
+            candidate = f"{base}_{index}{extension}"
+        used.add(candidate.lower())
+        unique_files.append(candidate)
+    return unique_files
+
+
+def transcribe_files(audio_files, devices, output_format="txt", model_size='base', compute_type=None,
+                     batch_size=1, models=None, progress_callback=None, beam_size=1):
+    """将多个音频文件轮流分配到多个设备上并行转录
+
+    audio_files 为 (音频路径, 输出文件名) 列表，devices 为设备字符串列表（例如 ["cuda:0", "cuda:1"]），
+    每个设备一个工作线程，依次转录分配给它的文件。models 可传入 {设备: 已加载的模型}，
+    未提供的设备在工作线程中自行加载。重名的输出文件名会加上序号（见 unique_output_files）。
+    返回 {音频路径: (txt_path, pdf_path)}。
+    """
+    models = models or {}
+    audio_files = list(zip([audio_path for audio_path, _ in audio_files],
+                           unique_output_files([output_file for _, output_file in audio_files])))
+    total = len(audio_files)
+    completed = 0
+    lock = threading.Lock()
+
+    def worker(device, files):
+        nonlocal completed
+        model = models.get(device) or load_model(model_size, device, compute_type)
+        results = {}
+        for audio_path, output_file in files:
+            results[audio_path] = transcribe_audio(audio_path, output_file, output_format, device, model_size,
+                                                   compute_type=compute_type, batch_size=batch_size, model=model,
+                                                   beam_size=beam_size)
+            if progress_callback:
+                with lock:
+                    completed += 1
+                    progress_callback(completed / total, f"已完成 {completed}/{total} 个文件")
+        return results
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(devices)) as executor:
+        futures = [executor.submit(worker, device, audio_files[i::len(devices)])
+                   for i, device in enumerate(devices) if audio_files[i::len(devices)]]
+        for future in futures:
+            results.update(future.result())
+    return results
+
+
+def build_arg_parser():
+    """构建命令行参数解析器"""
     parser = argparse.ArgumentParser(description="使用 faster‑whisper 模型进行音频转录。")
     parser.add_argument(
         "-i", "--input",
@@ -205,13 +375,53 @@ if __name__ == "__main__":
         "-f", "--format",
         choices=["txt", "srt"],
         default="txt",
-        help="输出文件格式，支持 txt（纯文本）或 srt（字幕文件格式），默认为 txt。选择 txt 会同时生成 PDF。"
+        help="输出文件格式，支持 txt（纯文本）或 srt（字幕文件格式），默认为 txt。"
+    )
+    parser.add_argument(
+        "--pdf",
+        action="store_true",
+        help="输出格式为 txt 时额外生成 PDF（长音频排版较慢，默认不生成）"
     )
     parser.add_argument(
         "-d", "--device",
         default=None,
-        help="指定使用的设备，例如：cuda、cpu 或 mps（MPS 可能因部分算子不支持而自动回退使用 CPU）"
+        help="指定使用的设备，例如：cuda、cuda:1、cpu 或 mps（MPS 会自动回退使用 CPU），默认自动检测，有 CUDA GPU 时使用 cuda"
+    )
+    parser.add_argument(
+        "-c", "--compute-type",
+        choices=COMPUTE_TYPE_CHOICES,
+        default=None,
+        help="faster-whisper 计算类型，默认 GPU 使用 int8_float16，CPU 使用 int8"
+    )
+    parser.add_argument(
+        "-b", "--batch-size",
+        type=int,
+        default=None,
+        help="批量推理大小，大于 1 时按 VAD 切分语音片段后成批推理（BatchedInferencePipeline），"
+             "默认 GPU 为 16，CPU 为 4；设为 1 则逐段顺序转录"
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--beam-size",
+        type=int,
+        default=1,
+        help="解码束宽，默认为 1（贪心解码，速度最快）；增大可能略微提高准确率，但解码更慢"
+    )
+    parser.add_argument(
+        "-t", "--threads",
+        type=int,
+        default=None,
+        help="CPU 推理使用的线程数，默认为 CPU 核心数减一"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
 
-    transcribe_audio(args.input, args.output, args.format, args.device)
+    device = args.device or detect_device()
+    batch_size = args.batch_size
+    if batch_size is None:
+        batch_size = 16 if device.startswith("cuda") else 4
+    transcribe_audio(args.input, args.output, args.format, device,
+                     compute_type=args.compute_type, batch_size=batch_size, beam_size=args.beam_size,
+                     cpu_threads=args.threads, emit_pdf=args.pdf)
@@ -0,0 +1,33 @@
+import hashlib
+import json
+import os
+
+TRANSCRIPT_CACHE_DIR = os.path.join("temp_uploads", "transcripts")  # 转录结果缓存索引目录
+
+
+def cache_path_for_digest(audio_digest: str, *settings, cache_dir: str = TRANSCRIPT_CACHE_DIR) -> str:
+    """返回 (音频内容哈希, 转录设置) 对应的转录结果缓存索引文件路径"""
+    key = repr((audio_digest,) + settings)
+    return os.path.join(cache_dir, hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest() + ".json")
+
+
+def load_cached_transcript(cache_path: str):
+    """读取缓存的 (txt_path, pdf_path)，没有缓存或转录文件已被删除、修改时返回 None"""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if os.path.getmtime(cached["txt_path"]) != cached["txt_mtime"]:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    pdf_path = cached["pdf_path"]
+    if pdf_path and not os.path.exists(pdf_path):
+        pdf_path = None
+    return cached["txt_path"], pdf_path
+
+
+def save_cached_transcript(cache_path: str, txt_path: str, pdf_path):
+    """记录转录结果，相同音频和设置再次转录时直接复用"""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({"txt_path": txt_path, "pdf_path": pdf_path, "txt_mtime": os.path.getmtime(txt_path)}, f, ensure_ascii=False)
@@ -5,9 +5,18 @@
 用于验证配置和API连接是否正常
 """
 
+import os
+import sys
 import yaml
 import time
-from src.summarize import AIModelClient, PodcastSummarizer
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 添加src目录到Python路径（pytest 运行时已由 conftest.py 添加，直接运行脚本时在此添加）
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from summarize import AIModelClient, PodcastSummarizer
 
 def load_config():
     """加载配置文件"""
@@ -44,7 +53,7 @@ def test_api_connection(config, model_key):
 
 def test_deep_analysis_simple(config, model_key):
     """测试简化的深度分析"""
-    print(f"\n🧠 测试简化深度分析...")
+    print(f"\n🧠 测试 {model_key} 简化深度分析...")
     
     try:
         summarizer = PodcastSummarizer()
@@ -101,16 +110,21 @@ def main():
     print(f"\n⚙️ 当前超时配置：{retry_config.get('timeout_seconds', 60)}秒")
     print(f"⚙️ 最大重试次数：{retry_config.get('max_attempts', 3)}")
     
-    # 4. 测试每个模型
+    # 4. 并发测试每个模型：测试都在等待网络响应，总耗时取决于最慢的模型而不是各模型之和
+    def test_model(model_key):
+        # 测试API连接，成功后再测试深度分析
+        connected = test_api_connection(config, model_key)
+        return connected, connected and test_deep_analysis_simple(config, model_key)
+    
+    with ThreadPoolExecutor(max_workers=len(model_keys)) as executor:
+        futures = {executor.submit(test_model, model_key): model_key for model_key in model_keys}
+        results = {futures[future]: future.result() for future in as_completed(futures)}
+    
+    print(f"\n{'='*20} 测试结果 {'='*20}")
     for model_key in model_keys:
-        print(f"\n{'='*20} 测试 {model_key} {'='*20}")
-        
-        # 测试API连接
-        if test_api_connection(config, model_key):
-            # 测试深度分析
-            test_deep_analysis_simple(config, model_key)
-        
-        print()
+        connected, analyzed = results[model_key]
+        print(f"{model_key}: API连接{'✅' if connected else '❌'}  深度分析{'✅' if analyzed else '❌'}")
+    print()
     
     print("🎉 测试完成")
     print("\n💡 使用建议：")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+媒体处理和转录缓存测试脚本
+使用临时生成的 WAV 文件验证时长探测、音频格式探测和转录结果缓存
+"""
+
+import os
+import sys
+import tempfile
+import time
+import wave
+
+# 添加src目录到Python路径（pytest 运行时已由 conftest.py 添加，直接运行脚本时在此添加）
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from media_utils import WHISPER_SAMPLE_RATE, normalize_pcm_audio, probe_audio_format, probe_duration
+from transcript_cache import cache_path_for_digest, load_cached_transcript, save_cached_transcript
+
+
+def write_silence_wav(path, seconds, sample_rate=WHISPER_SAMPLE_RATE, channels=1):
+    """生成指定时长的静音 16 位 PCM WAV 文件"""
+    with wave.open(path, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(b"\0\0" * channels * int(seconds * sample_rate))
+
+
+def test_probe_duration():
+    """测试读取媒体时长"""
+    print("🧪 测试时长探测...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_path = os.path.join(tmp_dir, "silence.wav")
+        write_silence_wav(audio_path, 2.5)
+        assert abs(probe_duration(audio_path) - 2.5) < 0.01
+
+        stereo_path = os.path.join(tmp_dir, "stereo.wav")
+        write_silence_wav(stereo_path, 1.0, sample_rate=44100, channels=2)
+        assert abs(probe_duration(stereo_path) - 1.0) < 0.01
+    print("✅ 时长探测正常")
+
+
+def test_probe_audio_format():
+    """测试读取音频格式，已是 16kHz 单声道的 PCM 音频无需重采样"""
+    print("🧪 测试音频格式探测...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_path = os.path.join(tmp_dir, "mono.wav")
+        write_silence_wav(audio_path, 0.5)
+        assert probe_audio_format(audio_path) == ("pcm_s16le", WHISPER_SAMPLE_RATE, 1)
+        assert normalize_pcm_audio(audio_path, tmp_dir) == audio_path
+        assert not os.path.exists(os.path.join(tmp_dir, "normalized.wav"))
+
+        # 无法读取的文件保持原路径，不做转换
+        broken_path = os.path.join(tmp_dir, "broken.wav")
+        with open(broken_path, "wb") as f:
+            f.write(b"not audio")
+        assert normalize_pcm_audio(broken_path, tmp_dir) == broken_path
+    print("✅ 音频格式探测正常")
+
+
+def test_transcript_cache():
+    """测试转录结果缓存的保存、读取和失效"""
+    print("🧪 测试转录结果缓存...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = os.path.join(tmp_dir, "transcripts")
+        cache_path = cache_path_for_digest("digest", "base", "cpu", "int8", 4, "txt", cache_dir=cache_dir)
+        # 相同音频和设置对应同一个缓存文件，任一设置不同时对应不同的缓存文件
+        assert cache_path == cache_path_for_digest("digest", "base", "cpu", "int8", 4, "txt", cache_dir=cache_dir)
+        assert cache_path != cache_path_for_digest("digest", "base", "cpu", "int8", 4, "srt", cache_dir=cache_dir)
+        assert cache_path != cache_path_for_digest("other", "base", "cpu", "int8", 4, "txt", cache_dir=cache_dir)
+        assert load_cached_transcript(cache_path) is None
+
+        txt_path = os.path.join(tmp_dir, "out.txt")
+        pdf_path = os.path.join(tmp_dir, "out.pdf")
+        for path in (txt_path, pdf_path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("转录内容")
+        save_cached_transcript(cache_path, txt_path, pdf_path)
+        assert load_cached_transcript(cache_path) == (txt_path, pdf_path)
+
+        # PDF 被删除后只返回 txt
+        os.remove(pdf_path)
+        assert load_cached_transcript(cache_path) == (txt_path, None)
+
+        # 转录文件被修改或删除后缓存失效
+        new_mtime = os.path.getmtime(txt_path) + 10
+        os.utime(txt_path, (time.time(), new_mtime))
+        assert load_cached_transcript(cache_path) is None
+        save_cached_transcript(cache_path, txt_path, None)
+        assert load_cached_transcript(cache_path) == (txt_path, None)
+        os.remove(txt_path)
+        assert load_cached_transcript(cache_path) is None
+    print("✅ 转录结果缓存正常")
+
+
+def main():
+    """主测试函数"""
+    test_probe_duration()
+    test_probe_audio_format()
+    test_transcript_cache()
+    print("🎉 媒体处理测试完成！")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,17 @@
 测试进度管理器功能的脚本
 """
 
+import json
 import os
 import sys
+import tempfile
 import yaml
 from datetime import datetime
 
-# 添加src目录到Python路径
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+# 添加src目录到Python路径（pytest 运行时已由 conftest.py 添加，直接运行脚本时在此添加）
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
 from progress_manager import ProgressManager, TaskProgress
 
@@ -63,7 +67,12 @@ def test_progress_manager():
     manager.save_task(task)
     print(f"✅ 添加失败分段，失败数量: {len(task.failed_segments)}")
     
-    # 8. 测试任务加载
+    # 8. 测试合并保存：间隔内的保存只标记为待保存，flush 后写盘
+    pending = task.task_id in manager._pending_tasks
+    manager.flush()
+    print(f"✅ 合并保存: 待保存={pending}, flush 后待保存数量: {len(manager._pending_tasks)}")
+    
+    # 9. 测试任务加载
     loaded_task = manager.load_task(task_id)
     if loaded_task:
         print(f"✅ 加载任务成功: {loaded_task.media_title}")
@@ -73,16 +82,16 @@ def test_progress_manager():
     else:
         print("❌ 加载任务失败")
     
-    # 9. 测试未完成任务列表
+    # 10. 测试未完成任务列表
     incomplete_tasks = manager.list_incomplete_tasks()
     print(f"✅ 未完成任务数量: {len(incomplete_tasks)}")
     
-    # 10. 测试任务显示信息格式化
+    # 11. 测试任务显示信息格式化
     if incomplete_tasks:
         info = manager.format_task_display_info(incomplete_tasks[0])
         print(f"✅ 任务显示信息: {info}")
     
-    # 11. 清理测试数据
+    # 12. 清理测试数据
     manager.delete_task(task_id)
     print(f"✅ 清理测试任务")
     
@@ -95,6 +104,134 @@ def test_progress_manager():
     print("🎉 进度管理器测试完成！")
 
 
+def make_manager(progress_dir, save_interval_s=0):
+    """创建使用临时目录的进度管理器"""
+    return ProgressManager({'progress': {'save_directory': progress_dir, 'save_interval_s': save_interval_s}})
+
+
+def add_segment(task, index):
+    """添加一个已完成的测试分段"""
+    task.add_completed_segment({'index': index, 'summary': f"第{index}段总结", 'keywords': [f"关键词{index}"]})
+
+
+def test_event_log_replay():
+    """测试快照之后的增量事件写入进度日志，重新加载时重放得到相同的任务状态"""
+    print("\n🧪 测试进度日志重放...")
+    with tempfile.TemporaryDirectory() as progress_dir:
+        manager = make_manager(progress_dir)
+        task = TaskProgress("log_task", "日志测试", "custom")
+        task.total_segments = 4
+        assert manager.save_task(task)
+        assert os.path.exists(manager.get_task_file_path(task.task_id))
+        assert not os.path.exists(manager.get_task_log_path(task.task_id))
+
+        # 之后的保存只把增量事件追加到进度日志，不重写快照
+        with open(manager.get_task_file_path(task.task_id), 'rb') as f:
+            snapshot = f.read()
+        add_segment(task, 1)
+        task.status = "segments_in_progress"
+        manager.save_task(task)
+        with open(manager.get_task_file_path(task.task_id), 'rb') as f:
+            assert f.read() == snapshot
+        with open(manager.get_task_log_path(task.task_id), encoding="utf-8") as f:
+            assert [json.loads(line)["event"] for line in f] == ["segment_completed", "task_updated"]
+        assert make_manager(progress_dir).load_task(task.task_id).to_dict() == task.to_dict()
+
+        # 日志超过快照 2 倍大小时会重写快照，无论是否重写，重新加载的结果都与内存中的任务一致
+        add_segment(task, 2)
+        manager.save_task(task)
+        task.add_failed_segment(3, "API超时错误")
+        manager.save_task(task)
+        task.remove_failed_segment(3)
+        add_segment(task, 3)
+        manager.save_task(task)
+
+        loaded = make_manager(progress_dir).load_task(task.task_id)
+        assert loaded.to_dict() == task.to_dict()
+        assert loaded.is_segment_completed(3) and not loaded.failed_segments
+
+        # 合并快照后旧日志被删除，重新加载结果不变
+        assert manager.compact_task(task.task_id)
+        assert not os.path.exists(manager.get_task_log_path(task.task_id))
+        assert make_manager(progress_dir).load_task(task.task_id).to_dict() == task.to_dict()
+    print("✅ 进度日志重放正常")
+
+
+def test_debounced_save():
+    """测试合并保存：间隔内的保存只标记为待保存，flush 或加载时写盘"""
+    print("\n🧪 测试合并保存...")
+    with tempfile.TemporaryDirectory() as progress_dir:
+        manager = make_manager(progress_dir, save_interval_s=60)
+        task = TaskProgress("debounce_task", "合并保存测试", "custom")
+        task.total_segments = 2
+        manager.save_task(task)  # 首次保存立即写盘
+
+        add_segment(task, 1)
+        manager.save_task(task)
+        assert task.task_id in manager._pending_tasks
+        assert make_manager(progress_dir).load_task(task.task_id).completed_segments == []
+
+        manager.flush()
+        assert not manager._pending_tasks
+        assert len(make_manager(progress_dir).load_task(task.task_id).completed_segments) == 1
+
+        # 加载待保存的任务前先写盘；force=True 时立即写盘
+        add_segment(task, 2)
+        manager.save_task(task)
+        assert len(manager.load_task(task.task_id).completed_segments) == 2
+        task.status = "segments_completed"
+        manager.save_task(task, force=True)
+        assert make_manager(progress_dir).load_task(task.task_id).status == "segments_completed"
+    print("✅ 合并保存正常")
+
+
+def test_archive_and_reload():
+    """测试已完成的任务压缩为 zstd 归档，并能从归档重新加载"""
+    print("\n🧪 测试任务归档...")
+    with tempfile.TemporaryDirectory() as progress_dir:
+        manager = make_manager(progress_dir)
+        task = TaskProgress("archive_task", "归档测试", "custom")
+        task.total_segments = 1
+        manager.save_task(task)
+        add_segment(task, 1)
+        manager.save_task(task)
+        task.overall_summary = "总体总结"
+        task.status = "overall_completed"
+        manager.save_task(task)
+
+        assert os.path.exists(manager.get_task_archive_path(task.task_id))
+        assert not os.path.exists(manager.get_task_file_path(task.task_id))
+        assert not os.path.exists(manager.get_task_log_path(task.task_id))
+
+        reloaded_manager = make_manager(progress_dir)
+        loaded = reloaded_manager.load_task(task.task_id)
+        assert loaded.to_dict() == task.to_dict()
+        assert task.task_id not in [t.task_id for t in reloaded_manager.list_incomplete_tasks()]
+
+        assert reloaded_manager.delete_task(task.task_id)
+        assert reloaded_manager.load_task(task.task_id) is None
+    print("✅ 任务归档正常")
+
+
+def test_loaded_task_is_copy():
+    """测试重复加载同一任务得到独立的副本，修改一个不影响之后的加载结果"""
+    print("\n🧪 测试任务缓存副本...")
+    with tempfile.TemporaryDirectory() as progress_dir:
+        manager = make_manager(progress_dir)
+        task = TaskProgress("copy_task", "副本测试", "custom")
+        task.total_segments = 2
+        manager.save_task(task)
+
+        loaded = manager.load_task(task.task_id)
+        add_segment(loaded, 1)
+        loaded.status = "failed"
+        reloaded = manager.load_task(task.task_id)
+        assert reloaded is not loaded
+        assert reloaded.completed_segments == [] and not reloaded.is_segment_completed(1)
+        assert reloaded.status == "initialized"
+    print("✅ 任务缓存副本正常")
+
+
 def test_config_loading():
     """测试配置文件加载"""
     print("\n🧪 测试配置文件加载...")
@@ -145,6 +282,10 @@ def main():
     try:
         test_config_loading()
         test_progress_manager()
+        test_event_log_replay()
+        test_debounced_save()
+        test_archive_and_reload()
+        test_loaded_task_is_copy()
         
         print("\n" + "=" * 50)
         print("🎉 所有测试通过！容错机制已成功实现：")
@@ -8,10 +8,12 @@ import os
 import sys
 from pathlib import Path
 
-# 添加src目录到路径
-sys.path.append('src')
+# 添加src目录到Python路径（pytest 运行时已由 conftest.py 添加，直接运行脚本时在此添加）
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
-from summarize import PodcastSummarizer
+from summarize import PodcastSummarizer, TextSegmenter
 
 def test_configuration():
     """测试配置文件加载"""
@@ -71,6 +73,45 @@ def test_segmentation():
         print(f"❌ 分段测试失败：{e}")
         return False
 
+def test_pack_for_batch():
+    """测试连续分段按字数上限打包成批（不需要配置和网络）"""
+    print("\n📦 测试分段打包...")
+    segmenter = TextSegmenter()
+    overhead = TextSegmenter.BATCH_ITEM_OVERHEAD
+    segments = [{'index': i, 'content': "字" * length} for i, length in enumerate([100, 100, 300, 50], 1)]
+
+    # 上限恰好容纳前两段：第三段另起一批，第四段与第三段合并
+    batches = segmenter.pack_for_batch(segments, 200 + 2 * overhead)
+    assert [[s['index'] for s in batch] for batch in batches] == [[1, 2], [3], [4]]
+
+    batches = segmenter.pack_for_batch(segments, 350 + 2 * overhead)
+    assert [[s['index'] for s in batch] for batch in batches] == [[1, 2], [3, 4]]
+
+    # 超过上限的单个分段单独成批，上限不大于 0 时每段各自成批
+    assert [[s['index'] for s in batch] for batch in segmenter.pack_for_batch(segments, 10)] == [[1], [2], [3], [4]]
+    assert segmenter.pack_for_batch(segments, 0) == [[segment] for segment in segments]
+    assert segmenter.pack_for_batch([], 1000) == []
+    print("✅ 分段打包正常")
+
+def test_parse_batch_response():
+    """测试按 ### 第X段 标题拆分批量请求的响应（不需要配置和网络）"""
+    print("\n🧩 测试批量响应解析...")
+    batch = [{'index': 3, 'content': "甲"}, {'index': 4, 'content': "乙"}, {'index': 5, 'content': "丙"}]
+    assert PodcastSummarizer._format_batch_content(batch[:2]) == "### 第3段\n甲\n\n### 第4段\n乙"
+
+    response = (
+        "前言会被忽略\n"
+        "### 第3段\n第三段的总结\n第二行\n\n"
+        "## 第 4 段（讨论部分）\n第四段的总结\n"
+        "### 第9段\n不属于本批的分段\n"
+        "### 第5段\n   \n"
+    )
+    sections = PodcastSummarizer._parse_batch_response(response, batch)
+    # 只保留本批中内容非空的分段，缺失的分段由调用方单独重试
+    assert sections == {3: "第三段的总结\n第二行", 4: "第四段的总结"}
+    assert PodcastSummarizer._parse_batch_response("没有任何标题", batch) == {}
+    print("✅ 批量响应解析正常")
+
 def test_api_connection(summarizer, model_key):
     """测试API连接"""
     print(f"\n🌐 测试 {model_key} API连接...")
@@ -99,6 +140,10 @@ def test_api_connection(summarizer, model_key):
 def main():
     print("🚀 开始AI总结功能测试\n")
     
+    # 测试不依赖配置的分段打包和批量响应解析
+    test_pack_for_batch()
+    test_parse_batch_response()
+    
     # 测试配置加载
     config_result = test_configuration()
     if not config_result:
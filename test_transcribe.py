@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+转录模块测试脚本
+验证命令行参数解析、设备解析和转录结果写入（不加载 Whisper 模型）
+"""
+
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+# 添加src目录到Python路径（pytest 运行时已由 conftest.py 添加，直接运行脚本时在此添加）
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from transcribe import (COMPUTE_TYPE_CHOICES, build_arg_parser, format_timestamp, resolve_device,
+                        unique_output_files, write_segments)
+
+
+def test_arg_parser():
+    """测试命令行参数解析器可以构建，并能解析所有参数"""
+    print("🧪 测试命令行参数解析...")
+    parser = build_arg_parser()
+
+    args = parser.parse_args(["-i", "a.wav", "-o", "out.txt"])
+    assert args.device is None
+    assert args.compute_type is None
+    assert args.batch_size is None
+    assert args.beam_size == 1
+    assert args.threads is None
+    assert args.pdf is False
+
+    args = parser.parse_args(["-i", "a.wav", "-f", "srt", "-d", "cuda:1", "-c", "int8_float16",
+                              "-b", "8", "--beam-size", "5", "-t", "2", "--pdf"])
+    assert (args.format, args.device, args.compute_type) == ("srt", "cuda:1", "int8_float16")
+    assert (args.batch_size, args.beam_size, args.threads, args.pdf) == (8, 5, 2, True)
+    print("✅ 命令行参数解析正常")
+
+
+def test_resolve_device():
+    """测试未指定计算类型时各设备的默认值"""
+    print("🧪 测试设备解析...")
+    assert resolve_device("cpu", None) == ("cpu", 0, "int8")
+    assert resolve_device("cuda", None) == ("cuda", 0, "int8_float16")
+    assert resolve_device("cuda:1", None) == ("cuda", 1, "int8_float16")
+    assert resolve_device("mps", None) == ("cpu", 0, "int8")
+    assert resolve_device("cuda", "float16") == ("cuda", 0, "float16")
+    for compute_type in COMPUTE_TYPE_CHOICES:
+        assert resolve_device("cpu", compute_type)[2] == compute_type
+    print("✅ 设备解析正常")
+
+
+def test_format_timestamp():
+    """测试 SRT 时间戳格式"""
+    assert format_timestamp(0) == "00:00:00,000"
+    assert format_timestamp(61.5) == "00:01:01,500"
+    assert format_timestamp(3725.0004) == "01:02:05,000"
+    assert format_timestamp(59.9996) == "00:01:00,000"
+
+
+def test_write_segments():
+    """测试转录片段写入 txt 和 srt，且不留下临时文件"""
+    print("🧪 测试转录结果写入...")
+    segments = [
+        SimpleNamespace(start=0.0, end=1.5, text=" 第一句 "),
+        SimpleNamespace(start=1.5, end=62.25, text="第二句"),
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        txt_path = os.path.join(tmp_dir, "out.txt")
+        write_segments(iter(segments), txt_path, "txt")
+        with open(txt_path, encoding="utf-8") as f:
+            assert f.read() == "第一句\n第二句"
+
+        srt_path = os.path.join(tmp_dir, "out.srt")
+        write_segments(iter(segments), srt_path, "srt")
+        with open(srt_path, encoding="utf-8") as f:
+            assert f.read() == ("1\n00:00:00,000 --> 00:00:01,500\n第一句\n"
+                                "\n2\n00:00:01,500 --> 00:01:02,250\n第二句\n")
+
+        empty_path = os.path.join(tmp_dir, "empty.txt")
+        write_segments(iter([]), empty_path, "txt")
+        with open(empty_path, encoding="utf-8") as f:
+            assert f.read() == ""
+
+        assert sorted(os.listdir(tmp_dir)) == ["empty.txt", "out.srt", "out.txt"]
+    print("✅ 转录结果写入正常")
+
+
+def test_unique_output_files():
+    """测试重名的输出文件名加上序号"""
+    assert unique_output_files(["a.txt", "b.txt"]) == ["a.txt", "b.txt"]
+    assert unique_output_files(["a.txt", "a.txt", "A.txt"]) == ["a.txt", "a_2.txt", "A_3.txt"]
+    # 按清理非法字符后的文件名比较
+    assert unique_output_files(["x?.srt", "x_.srt"]) == ["x_.srt", "x__2.srt"]
+
+
+def main():
+    """主测试函数"""
+    test_arg_parser()
+    test_resolve_device()
+    test_format_timestamp()
+    test_write_segments()
+    test_unique_output_files()
+    print("🎉 转录模块测试完成！")
+
+
+if __name__ == "__main__":
+    main()